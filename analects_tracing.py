@@ -3,18 +3,35 @@
 논어 필사 PDF 생성기 (Analects Tracing PDF Generator)
 
 한자 원문이 희미하게(Ghost Text) 인쇄된 습자(Tracing)용 PDF 필사 노트를 생성합니다.
+
+fpdf2 2.8.6 이상 2.9 미만이 필요합니다(requirements.txt). 아래 기능은 fpdf2의 비공개 API에 의존합니다.
+- 격자 셀 템플릿: `fpdf.enums.PDFResourceType`(2.8.3부터), `FPDF._resource_catalog`의
+  `next_xobject_index` / `form_xobjects` / `add()`, `FPDF._out()`, `fpdf.syntax.PDFContentStream`
+- `export_pages()`: `FPDF.pages[n].contents`, `_resource_catalog.resources_per_page`
+- `import_pages()`: `FPDF.pages[n].contents` 교체, `_resource_catalog.add()`
 """
 
 import argparse
+import itertools
 import json
-import math
 import re
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
 from fpdf import FPDF
+from fpdf.enums import PDFResourceType
+from fpdf.syntax import Name, PDFArray, PDFContentStream
+
+from drawing_context import DrawingContext
+from font_registry import get_font_registry
+from font_subset import find_compact_font
+from layout_plan import Glyph, GridCell, LayoutPlanner, PassagePlan, Rule, TextCell
+from metrics import stage
+
 
-from hanja_dictionary import get_hanja_meaning
+_XOBJECT_REF = re.compile(rb"/I(\d+) Do")
 
 
 # ---------------------------------------------------------------------------
@@ -71,6 +88,12 @@ class Config:
     # 훈음 표시 여부
     show_meaning: bool = True
 
+    # 격자 셀(테두리 + 십자 점선 + 훈음 칸)을 Form XObject 하나로 그려 참조할지 여부
+    use_cell_template: bool = True
+
+    # 미리 빌드한 축소 폰트(font_subset.py)가 있으면 본문에 사용할지 여부 (없는 글자는 원본 폰트로)
+    use_compact_font: bool = True
+
     # Font size ratio (relative to cell size)
     font_ratio: float = 0.78
     mm_to_pt: float = 1.0 / 0.3528  # mm → pt conversion
@@ -93,6 +116,14 @@ class PassageData:
     reading: str = ""
 
 
+@dataclass
+class RawPage:
+    """다른 문서로 옮길 수 있는 페이지 한 장 (병렬 렌더링 병합, 페이지 캐시에 사용)"""
+    contents: bytes  # 압축 전 콘텐츠 스트림
+    fonts: list[int]  # 사용한 폰트 번호 (/F{i})
+    xobjects: list[int]  # 사용한 XObject 번호 (/I{i})
+
+
 # ---------------------------------------------------------------------------
 # PDF Generator
 # ---------------------------------------------------------------------------
@@ -100,9 +131,11 @@ class PassageData:
 class AnalectsTracingPDF:
     """논어 필사 PDF 생성 엔진"""
 
-    def __init__(self, config: Config, font_path: str):
+    def __init__(self, config: Config, font_path: str, page_cache=None):
         self.cfg = config
         self.font_path = font_path
+        # 구절별 페이지 캐시 (page_cache.PageCache). 있으면 캐시된 구절은 렌더링하지 않고 페이지를 붙입니다.
+        self.page_cache = page_cache
 
         self.pdf = FPDF(unit="mm", format="A4")
         self.pdf.set_auto_page_break(auto=False)
@@ -112,250 +145,254 @@ class AnalectsTracingPDF:
             right=self.cfg.margin_right,
         )
 
-        # Register CJK font
-        self.pdf.add_font("CJK", "", self.font_path)
-        self.pdf.add_font("CJK", "B", self.font_path)
+        # Register CJK font (프로세스 전역 레지스트리에서 파싱 결과 재사용)
+        # 축소 폰트가 있으면 본문에 쓰고, 원본 폰트는 축소 폰트에 없는 글자가 나올 때만 등록합니다.
+        # 등록된 폰트는 쓰이지 않아도 output()에서 서브셋이 만들어지므로 필요한 폰트만 등록합니다.
+        self.text_font_path = self.font_path
+        if self.cfg.use_compact_font:
+            self.text_font_path = find_compact_font(self.font_path) or self.font_path
+        get_font_registry().add_font(self.pdf, "CJK", "", self.text_font_path)
+        self._text_cmap = self.pdf.fonts["cjk"].cmap
+        self._has_fallback = False
+
+        # 마지막으로 적용한 글꼴·색·선 상태를 기억해 바뀐 것만 fpdf에 넘기는 그리기 계층
+        self.ctx = DrawingContext(self.pdf)
+
+        # cell_size → Form XObject 인덱스
+        self._cell_templates: dict[float, int] = {}
+
+        # 레이아웃 계산 (fpdf 호출과 분리, 계획은 캐시됨)
+        self.planner = LayoutPlanner(self.cfg, self.font_path)
 
     # ----- Layout calculation -----
 
     def calculate_layout(self, n_chars: int) -> tuple[float, int]:
-        """
-        한자의 크기를 일정하게 유지하기 위해 고정된 레이아웃을 사용합니다.
-        셀 크기: 25mm, 줄당 글자 수: 7자
-        """
-        return 22.0, 8
+        return self.planner.calculate_layout(n_chars)
 
     def calculate_font_size(self, cell_size: float) -> float:
-        """셀 크기에 맞는 폰트 크기(pt)를 계산합니다."""
-        return cell_size * self.cfg.font_ratio * self.cfg.mm_to_pt
+        return self.planner.calculate_font_size(cell_size)
 
     # ----- Drawing primitives -----
 
     def draw_dashed_cross(self, x: float, y: float, size: float):
         """셀 내부에 십자(+) 점선 가이드를 그립니다."""
         cfg = self.cfg
-        self.pdf.set_draw_color(*cfg.color_cross)
-        self.pdf.set_line_width(cfg.dash_width)
-        self.pdf.set_dash_pattern(dash=cfg.dash_length, gap=cfg.dash_gap)
+        self.ctx.stroke(cfg.color_cross, cfg.dash_width, cfg.dash_length, cfg.dash_gap)
 
         mid_y = y + size / 2
-        self.pdf.line(x, mid_y, x + size, mid_y)
+        self.ctx.line(x, mid_y, x + size, mid_y)
         mid_x = x + size / 2
-        self.pdf.line(mid_x, y, mid_x, y + size)
-        self.pdf.set_dash_pattern()
+        self.ctx.line(mid_x, y, mid_x, y + size)
 
     def draw_grid_cell(self, x: float, y: float, size: float):
         """정사각형 격자 셀(테두리 + 십자 점선)을 그립니다."""
         cfg = self.cfg
         self.draw_dashed_cross(x, y, size)
-        self.pdf.set_draw_color(*cfg.color_border)
-        self.pdf.set_line_width(cfg.border_width)
-        self.pdf.rect(x, y, size, size)
+        self.ctx.stroke(cfg.color_border, cfg.border_width)
+        self.ctx.rect(x, y, size, size)
 
     def draw_meaning_box(self, x: float, y: float, width: float, height: float):
         """훈음을 직접 쓸 수 있는 빈 상자를 그립니다."""
-        cfg = self.cfg
-        self.pdf.set_draw_color(*cfg.color_meaning_box)
-        self.pdf.set_line_width(0.2)
-        self.pdf.rect(x, y, width, height)
-
-    # ----- Row renderers -----
-
-    def _start_x(self, chars_in_line: int, cell_size: float) -> float:
-        """줄의 시작 x 좌표 (왼쪽 정렬)"""
-        return self.cfg.margin_left
-
-    def render_original_row(
-        self, chars: list[str], interpretation: str,
-        cell_size: float, chars_per_line: int, y_start: float,
-        reading: str = "",
-        sounds: list[str] = None,
-    ) -> float:
+        self.ctx.stroke(self.cfg.color_meaning_box, 0.2)
+        self.ctx.rect(x, y, width, height)
+
+    def draw_cells(self, cells: list[GridCell]):
         """
-        Row 1: 진한 원문 글자 + 음독 + 한글 해석 (간격 및 레이아웃 최적화)
+        한 페이지의 격자 셀들을 그립니다. 템플릿을 쓰지 않을 때는 선 스타일별로 모아
+        (십자 점선 → 테두리 → 훈음 칸) 셀마다 세 번씩 바뀌던 선 상태를 페이지당 세 번만 바꿉니다.
         """
         cfg = self.cfg
-        font_size = self.calculate_font_size(cell_size)
-        y = y_start
-        
-        row_height = cell_size + (cfg.meaning_height if cfg.show_meaning else 0)
-        if not sounds:
-            sounds = [None] * len(chars)
-
-        lines_chars = [chars[i:i + chars_per_line] for i in range(0, len(chars), chars_per_line)]
-        lines_sounds = [sounds[i:i + chars_per_line] for i in range(0, len(sounds), chars_per_line)]
-
-        for line_chars, line_sounds in zip(lines_chars, lines_sounds):
-            x = self._start_x(len(line_chars), cell_size)
-            for ch, sound in zip(line_chars, line_sounds):
-                # 1. Original Hanja
-                self.pdf.set_font("CJK", "", font_size)
-                self.pdf.set_text_color(*cfg.color_original)
-                self.pdf.text(
-                    x + (cell_size - self.pdf.get_string_width(ch)) / 2,
-                    y + cell_size * 0.82,
-                    ch,
-                )
-                
-                # 2. Meaning below
-                if cfg.show_meaning:
-                    meaning = get_hanja_meaning(ch, preferred_sound=sound)
-                    if meaning:
-                        self.pdf.set_font("CJK", "", 7)
-                        self.pdf.set_text_color(*cfg.color_interpretation)
-                        m_width = self.pdf.get_string_width(meaning)
-                        m_x = x + (cell_size - m_width) / 2
-                        m_y = y + cell_size + cfg.meaning_height * 0.7
-                        if m_width > cell_size + 2:
-                            self.pdf.set_font("CJK", "", 5)
-                            m_width = self.pdf.get_string_width(meaning)
-                            m_x = x + (cell_size - m_width) / 2
-                        self.pdf.text(m_x, m_y, meaning)
-                x += cell_size
-            y += row_height
-
-        # --- 음독 및 해석 간격 조정 ---
-        y += 2
-        text_x = cfg.margin_left + 1
-
-        # 3. Reading (음독)
-        if reading:
-            self.pdf.set_font("CJK", "", 10)
-            self.pdf.set_text_color(*cfg.color_original)
-            self.pdf.set_xy(text_x, y)
-            self.pdf.cell(0, 8, reading, border=0, ln=1)
-            y = self.pdf.get_y()
-
-        # 4. Interpretation (해석)
-        self.pdf.set_font("CJK", "", 9)
-        self.pdf.set_text_color(*cfg.color_interpretation)
-        self.pdf.set_xy(text_x, y)
-        self.pdf.multi_cell(cfg.usable_width - 2, 5, interpretation, border=0, align='L')
-        y = self.pdf.get_y() + 4
-
-        return y
-
-    def render_ghost_row(
-        self, chars: list[str], cell_size: float,
-        chars_per_line: int, y_start: float,
-    ) -> float:
+        if cfg.use_cell_template:
+            for cell in cells:
+                self.draw_cell_with_box(cell.x, cell.y, cell.size)
+            return
+        for cell in cells:
+            self.draw_dashed_cross(cell.x, cell.y, cell.size)
+        self.ctx.stroke(cfg.color_border, cfg.border_width)
+        for cell in cells:
+            self.ctx.rect(cell.x, cell.y, cell.size, cell.size)
+        self.ctx.stroke(cfg.color_meaning_box, 0.2)
+        for cell in cells:
+            self.ctx.rect(cell.x, cell.y + cell.size, cell.size, cfg.meaning_box_height)
+
+    def draw_cell_with_box(self, x: float, y: float, size: float):
+        """격자 셀과 그 아래 훈음 쓰기 칸을 그립니다."""
+        cfg = self.cfg
+        if not cfg.use_cell_template:
+            self.draw_grid_cell(x, y, size)
+            self.draw_meaning_box(x, y + size, size, cfg.meaning_box_height)
+            return
+
+        index = self._cell_template_index(size)
+        k = self.pdf.k
+        self.pdf._resource_catalog.add(PDFResourceType.X_OBJECT, index, self.pdf.page)
+        self.pdf._out(f"q 1 0 0 1 {x * k:.2f} {(self.pdf.h - y) * k:.2f} cm /I{index} Do Q")
+
+    # ----- Cell template (Form XObject) -----
+
+    def _cell_template_index(self, size: float) -> int:
+        """셀 크기별 템플릿을 처음 사용할 때 한 번만 등록합니다."""
+        index = self._cell_templates.get(size)
+        if index is None:
+            index = self._register_cell_template(size)
+            self._cell_templates[size] = index
+        return index
+
+    def _register_cell_template(self, size: float) -> int:
         """
-        Row 2: 연한 회색 글자 + 격자 + 훈음 쓰기 빈 칸
+        draw_grid_cell + draw_meaning_box 와 같은 그림을 Form XObject로 만듭니다.
+        원점은 셀의 왼쪽 위 모서리이며, 단위는 pt 입니다.
         """
         cfg = self.cfg
-        font_size = self.calculate_font_size(cell_size)
-        y = y_start
-        row_height = cell_size + cfg.meaning_box_height
-        n_rows = math.ceil(len(chars) / chars_per_line)
-        if y + (n_rows * row_height) > cfg.page_height - cfg.margin_bottom:
-            self.pdf.add_page()
-            y = cfg.margin_top
-
-        lines = [chars[i:i + chars_per_line] for i in range(0, len(chars), chars_per_line)]
-        for line_chars in lines:
-            x = self._start_x(len(line_chars), cell_size)
-            for ch in line_chars:
-                self.draw_grid_cell(x, y, cell_size)
-                self.pdf.set_font("CJK", "", font_size)
-                self.pdf.set_text_color(*cfg.color_ghost)
-                self.pdf.text(
-                    x + (cell_size - self.pdf.get_string_width(ch)) / 2,
-                    y + cell_size * 0.82,
-                    ch,
+        k = self.pdf.k
+        s = size * k
+        m = cfg.meaning_box_height * k
+        half = s / 2
+
+        def rgb(color: tuple) -> str:
+            return " ".join(f"{c / 255:.3f}" for c in color)
+
+        ops = [
+            # 십자 점선
+            f"{rgb(cfg.color_cross)} RG",
+            f"{cfg.dash_width * k:.2f} w",
+            f"[{cfg.dash_length * k:.3f} {cfg.dash_gap * k:.3f}] 0 d",
+            f"0 {-half:.2f} m {s:.2f} {-half:.2f} l S",
+            f"{half:.2f} 0 m {half:.2f} {-s:.2f} l S",
+            "[] 0 d",
+            # 셀 테두리
+            f"{rgb(cfg.color_border)} RG",
+            f"{cfg.border_width * k:.2f} w",
+            f"0 {-s:.2f} {s:.2f} {s:.2f} re S",
+            # 훈음 쓰기 칸
+            f"{rgb(cfg.color_meaning_box)} RG",
+            f"{0.2 * k:.2f} w",
+            f"0 {-(s + m):.2f} {s:.2f} {m:.2f} re S",
+        ]
+        xobject = PDFContentStream(
+            contents="\n".join(ops).encode("latin-1"), compress=self.pdf.compress
+        )
+        xobject.type = Name("XObject")
+        xobject.subtype = Name("Form")
+        pad = max(cfg.border_width, 0.2) * k
+        xobject.b_box = PDFArray(
+            [round(-pad, 2), round(-(s + m) - pad, 2), round(s + pad, 2), round(pad, 2)]
+        )
+
+        # fpdf2의 blend group Form XObject와 같은 경로로 등록 (이미지와 같은 /I 이름 공간)
+        catalog = self.pdf._resource_catalog
+        index = catalog.next_xobject_index
+        catalog.next_xobject_index += 1
+        catalog.form_xobjects.append((index, xobject))
+        return index
+
+    # ----- Raw page transfer -----
+
+    def export_pages(self, first: int = 1) -> list[RawPage]:
+        """first 페이지부터 마지막 페이지까지의 콘텐츠 스트림과 사용한 리소스 번호를 꺼냅니다."""
+        catalog = self.pdf._resource_catalog
+        pages = []
+        for number in range(first, self.pdf.page + 1):
+            pages.append(RawPage(
+                contents=bytes(self.pdf.pages[number].contents),
+                fonts=sorted(catalog.resources_per_page.get((number, PDFResourceType.FONT), ())),
+                xobjects=sorted(catalog.resources_per_page.get((number, PDFResourceType.X_OBJECT), ())),
+            ))
+        return pages
+
+    def template_sizes(self) -> dict[int, float]:
+        """등록된 격자 셀 템플릿의 XObject 번호 → 셀 크기"""
+        return {index: size for size, index in self._cell_templates.items()}
+
+    def import_pages(self, pages: Iterable[RawPage], templates: dict[int, float]):
+        """
+        다른 문서에서 꺼낸 페이지를 이 문서 끝에 추가합니다.
+        격자 셀 템플릿 참조는 이 문서의 번호로 바꿉니다. 텍스트의 글리프 번호는 호출하는 쪽이 맞춰야 합니다.
+        """
+        pdf = self.pdf
+        catalog = pdf._resource_catalog
+        remap = {index: self._cell_template_index(size) for index, size in templates.items()}
+        renumber = any(old != new for old, new in remap.items())
+        for page in pages:
+            contents = page.contents
+            if renumber:
+                contents = _XOBJECT_REF.sub(
+                    lambda m: b"/I%d Do" % remap.get(int(m.group(1)), int(m.group(1))), contents
                 )
-                self.draw_meaning_box(x, y + cell_size, cell_size, cfg.meaning_box_height)
-                x += cell_size
-            y += row_height
-        return y
-
-    def render_practice_row(
-        self, n_chars: int, cell_size: float,
-        chars_per_line: int, y_start: float,
-    ) -> float:
+            pdf.add_page()
+            pdf.pages[pdf.page].contents = bytearray(contents)
+            for font in page.fonts:
+                catalog.add(PDFResourceType.FONT, font, pdf.page)
+            for index in page.xobjects:
+                catalog.add(PDFResourceType.X_OBJECT, remap.get(index, index), pdf.page)
+
+    # ----- Font fallback -----
+
+    def _font_family_for(self, text: str) -> str:
+        """본문 폰트에 없고 원본 폰트에는 있는 글자가 있으면 원본 폰트("CJKFull")를 등록하고 그 이름을 반환합니다."""
+        if self.text_font_path == self.font_path:
+            return "CJK"
+        missing = [ch for ch in text if ord(ch) not in self._text_cmap]
+        if not missing:
+            return "CJK"
+        full_cmap = get_font_registry().cmap(self.font_path)
+        if not any(ord(ch) in full_cmap for ch in missing):
+            return "CJK"  # 원본에도 없는 글자 (어느 폰트로 그려도 같음)
+        if not self._has_fallback:
+            get_font_registry().add_font(self.pdf, "CJKFull", "", self.font_path)
+            self.pdf.set_fallback_fonts(["CJKFull"])
+            self._has_fallback = True
+        return "CJKFull"
+
+    # ----- Plan emitter -----
+
+    def emit_plan(self, plan: PassagePlan):
         """
-        Row 3: 빈 격자 + 훈음 쓰기 빈 칸
+        레이아웃 계획을 fpdf 호출로 옮깁니다. 계획의 페이지마다 새 페이지를 시작합니다.
+        페이지마다 격자 셀을 먼저 모아 그리고, 나머지 항목은 계획 순서대로 그립니다.
+        (격자와 글자가 겹치는 곳은 원래도 글자가 위에 그려지므로 모양은 같습니다.)
         """
-        cfg = self.cfg
-        y = y_start
-        row_height = cell_size + cfg.meaning_box_height
-        n_rows = math.ceil(n_chars / chars_per_line)
-        if y + (n_rows * row_height) > cfg.page_height - cfg.margin_bottom:
-            self.pdf.add_page()
-            y = cfg.margin_top
-
-        remaining = n_chars
-        for _ in range(n_rows):
-            n_in_line = min(remaining, chars_per_line)
-            x = self._start_x(n_in_line, cell_size)
-            for _ in range(n_in_line):
-                self.draw_grid_cell(x, y, cell_size)
-                self.draw_meaning_box(x, y + cell_size, cell_size, cfg.meaning_box_height)
-                x += cell_size
-            remaining -= n_in_line
-            y += row_height
-        return y
-
-    def render_interp_practice(self, y_start: float) -> float:
-        """해석 필사 라인"""
-        cfg = self.cfg
-        y = y_start
-        needed_h = cfg.interp_practice_lines * cfg.interp_practice_height
-        if y + needed_h > cfg.page_height - cfg.margin_bottom:
-            self.pdf.add_page()
-            y = cfg.margin_top
-        self.pdf.set_draw_color(*cfg.color_border)
-        self.pdf.set_line_width(0.2)
-        self.pdf.set_font("CJK", "", 7)
-        self.pdf.set_text_color(*cfg.color_label)
-        self.pdf.text(cfg.margin_left, y + 4, "[해석 필사]")
-        y += 6
-        for _ in range(cfg.interp_practice_lines):
-            y += cfg.interp_practice_height
-            self.pdf.line(cfg.margin_left, y, cfg.page_width - cfg.margin_right, y)
-        return y
+        pdf = self.pdf
+        ctx = self.ctx
+        for items in plan.pages:
+            pdf.add_page()
+            self.draw_cells([item for item in items if isinstance(item, GridCell)])
+            for item in items:
+                if isinstance(item, Glyph):
+                    ctx.text(item.x, item.y, item.text, self._font_family_for(item.text), item.size, item.color)
+                elif isinstance(item, TextCell):
+                    # cell()은 본문 폰트에 없는 글자만 대체 폰트(원본)로 그립니다.
+                    self._font_family_for(item.text)
+                    ctx.cell(item.x, item.y, item.w, item.h, item.text, "CJK", item.size, item.color)
+                elif isinstance(item, Rule):
+                    ctx.stroke(item.color, item.width)
+                    ctx.line(item.x1, item.y1, item.x2, item.y2)
+                elif not isinstance(item, GridCell):
+                    raise TypeError(f"알 수 없는 레이아웃 항목: {item!r}")
 
     # ----- Passage renderer -----
 
     def render_passage(self, passage: PassageData):
-        """구절 렌더링"""
-        cfg = self.cfg
-        chars = list(passage.original)
-        n = len(chars)
-        cell_size, cpl = self.calculate_layout(n)
-
-        sounds = []
-        if passage.reading:
-            extracted_sounds = list(_extract_hangul(passage.reading))
-            if len(extracted_sounds) == n:
-                sounds = extracted_sounds
-            else:
-                sounds = [None] * n
-        else:
-            sounds = [None] * n
-
-        if self.pdf.page == 0:
-            self.pdf.add_page()
-        else:
-            self.pdf.add_page()
-        
-        y = cfg.margin_top
-        self.pdf.set_font("CJK", "", 9)
-        self.pdf.set_text_color(*cfg.color_label)
-        self.pdf.text(cfg.margin_left, y + cfg.label_height * 0.65, passage.label)
-        y += cfg.label_height
-
-        y = self.render_original_row(chars, passage.interpretation, cell_size, cpl, y, reading=passage.reading, sounds=sounds)
-        y += cfg.row_gap
-        y = self.render_ghost_row(chars, cell_size, cpl, y)
-        y += cfg.row_gap
-        y = self.render_practice_row(n, cell_size, cpl, y)
-        y += cfg.row_gap
-        y = self.render_interp_practice(y)
-
-    def generate(self, passages: list[PassageData], output_path: str):
-        for passage in passages:
-            self.render_passage(passage)
-        self.pdf.output(output_path)
+        """구절 렌더링 (레이아웃 계획 → PDF, 페이지 캐시가 있으면 캐시된 페이지 사용)"""
+        if self.page_cache is not None:
+            self.page_cache.render_passage(self, passage)
+            return
+        self.emit_plan(self.planner.plan_passage(passage))
+
+    def generate_bytes(self, passages: Iterable[PassageData]) -> bytes:
+        """
+        PDF를 파일로 쓰지 않고 메모리상의 바이트로 반환합니다.
+        passages는 iter_passages() 같은 이터레이터여도 되며, 구절을 받는 대로 렌더링합니다.
+        (이터레이터를 넘기면 파싱 시간도 render 단계에 포함됩니다.)
+        """
+        with stage("render"):
+            for passage in passages:
+                self.render_passage(passage)
+        with stage("output"):
+            return bytes(self.pdf.output())
+
+    def generate(self, passages: Iterable[PassageData], output_path: str):
+        Path(output_path).write_bytes(self.generate_bytes(passages))
 
 
 # ---------------------------------------------------------------------------
@@ -374,46 +411,85 @@ def _extract_cjk(text: str) -> str:
 def _extract_hangul(text: str) -> str:
     return "".join(ch for ch in text if "\uac00" <= ch <= "\ud7a3")
 
-def parse_text_input(text: str) -> list[PassageData]:
-    lines = text.strip().split("\n")
-    passages = []
+def iter_passages(lines: Iterable[str]) -> Iterator[PassageData]:
+    """
+    줄 단위 입력(파일 객체, 줄 목록 등)을 한 줄씩 읽으면서 구절이 완성될 때마다 PassageData를 내보냅니다.
+    입력 전체를 메모리에 올리지 않으므로 큰 코퍼스도 일정한 메모리로 처리할 수 있습니다.
+    """
     chapter_num, chapter_name = "", ""
     verse_num, original, reading, interp_lines = "", "", "", []
 
-    def flush():
+    def flush() -> Optional[PassageData]:
         nonlocal verse_num, original, reading, interp_lines
-        if not original: return
+        if not original: return None
         name = chapter_name.rstrip("편")
         label = f"{name} {chapter_num}-{verse_num}" if chapter_num else verse_num
-        passages.append(PassageData(label=label, original=original, interpretation=" ".join(interp_lines).strip(), reading=reading))
+        passage = PassageData(label=label, original=original, interpretation=" ".join(interp_lines).strip(), reading=reading)
         verse_num, original, reading, interp_lines = "", "", "", []
+        return passage
 
     for raw_line in lines:
         line = raw_line.strip()
         if not line or re.match(r"^\d{6}$", line) or line.startswith("http"): continue
         m = re.match(r"^(\d+)\.\s*(.+)$", line)
         if m and not _contains_cjk(line):
-            flush(); chapter_num, chapter_name = m.group(1), m.group(2).strip(); continue
+            passage = flush()
+            if passage: yield passage
+            chapter_num, chapter_name = m.group(1), m.group(2).strip(); continue
         if m and _contains_cjk(line):
-            flush(); verse_num, original = m.group(1), _extract_cjk(m.group(2)); continue
+            passage = flush()
+            if passage: yield passage
+            verse_num, original = m.group(1), _extract_cjk(m.group(2)); continue
         if line.startswith("(") and line.endswith(")"):
             reading = line[1:-1].strip(); continue
         interp_lines.append(line)
-    flush()
-    return passages
+    passage = flush()
+    if passage: yield passage
+
+def parse_text_input(text: str) -> list[PassageData]:
+    return list(iter_passages(text.strip().split("\n")))
 
 def main():
+    from batch_render import SPLIT_MODES, run_batch
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--font", required=True)
-    parser.add_argument("--input")
+    parser.add_argument("--input", nargs="+", required=True, help="입력 파일 또는 디렉토리 (여러 개 가능)")
     parser.add_argument("--output", default="analects_tracing.pdf")
+    parser.add_argument("--output-dir", help="일괄 생성 모드: PDF 여러 개와 manifest.json을 저장할 디렉토리")
+    parser.add_argument("--split", choices=SPLIT_MODES, default="document",
+                        help="일괄 생성 시 나누는 단위 (문서/편/구절/N구절, document 외에는 일괄 생성, 기본 출력 디렉토리 output)")
+    parser.add_argument("--chunk-size", type=int, default=10, help="--split chunk일 때 파일당 구절 수")
+    parser.add_argument("--workers", type=int,
+                        help="워커 프로세스 수 (일괄 생성 기본값: CPU 코어 수, 단일 문서는 2 이상일 때 구절을 나눠 병렬 렌더링)")
     args = parser.parse_args()
-    if not Path(args.font).exists(): return
-    text = Path(args.input).read_text(encoding="utf-8")
-    passages = parse_text_input(text)
-    config = Config()
-    generator = AnalectsTracingPDF(config, str(args.font))
-    generator.generate(passages, args.output)
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    # 문서를 나누는 분할 방식은 PDF가 여러 개 나오므로 파일 하나를 넣어도 일괄 생성으로 처리합니다.
+    if args.output_dir or args.split != "document" or len(args.input) > 1 or Path(args.input[0]).is_dir():
+        sys.exit(run_batch(
+            args.input, args.output_dir or "output", args.font,
+            split=args.split, chunk_size=args.chunk_size, workers=args.workers,
+        ))
+
+    with open(args.input[0], encoding="utf-8") as f:
+        # 파일을 한 줄씩 읽으며 구절이 완성되는 대로 렌더링합니다.
+        passages = iter_passages(f)
+        first = next(passages, None)
+        if first is None:
+            print(f"구절을 찾지 못했습니다: {args.input[0]}")
+            sys.exit(1)
+        config = Config()
+        if args.workers and args.workers > 1:
+            # 구절을 여러 프로세스로 나눠 렌더링하고 한 PDF로 합칩니다. (구절 목록 전체가 필요)
+            from parallel_render import render_sharded
+            pdf_bytes = render_sharded([first, *passages], config, str(args.font), workers=args.workers)
+            Path(args.output).write_bytes(pdf_bytes)
+            return
+        generator = AnalectsTracingPDF(config, str(args.font))
+        generator.generate(itertools.chain([first], passages), args.output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
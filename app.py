@@ -1,12 +1,20 @@
 import streamlit as st
 from pathlib import Path
-import tempfile
-import subprocess
+from datetime import datetime
 from analects_tracing import Config, AnalectsTracingPDF, parse_text_input
 from hanja_dictionary import get_custom_dict, save_custom_meaning
-from challenge_manager import add_log, get_user_stats, get_leaderboard
-from pdf2image import convert_from_path
+from challenge_manager import DB_FILE, add_log, get_user_stats, get_leaderboard
+from font_registry import warm_font
+from git_sync import get_sync_worker
+from memo_cache import clear_all_caches
+from notebook_cache import PDF_NAME, get_notebook_cache, notebook_key, preview_name
+from page_cache import get_page_cache
+from preview import PreviewConfig, count_pages, render_previews
+from native_preview import PREVIEW_BACKEND, render_plan_previews
+from session_store import SessionStore, memory_report
+from metrics import collect_stages, get_metrics, record_request, register_default_metrics, set_default_source, stage, start_metrics_server
 import os
+import time
 import pandas as pd
 
 # 페이지 설정
@@ -30,6 +38,50 @@ def get_css():
 
 st.markdown(get_css(), unsafe_allow_html=True)
 
+def clear_caches():
+    """Streamlit 캐시와 사전/출석 모듈의 메모 캐시를 함께 비웁니다."""
+    st.cache_data.clear()
+    clear_all_caches()
+
+FONT_PATH = Path("fonts/NotoSerifCJKkr-Regular.otf")
+PREVIEW_PAGES_PER_VIEW = 3  # 한 번에 래스터화해서 보여줄 페이지 수
+
+# 폰트는 프로세스당 한 번만 파싱됩니다 (이후 rerun에서는 즉시 반환)
+if FONT_PATH.exists():
+    warm_font(str(FONT_PATH))
+
+# 단계별 처리 시간 지표 (Prometheus 형식). 서버는 프로세스당 한 번만 열립니다. (APP_METRICS_PORT=0이면 끔)
+set_default_source("app")
+register_default_metrics()
+get_metrics().callback(
+    "analects_session_preview_bytes", "Preview bytes held in Streamlit session state across all sessions",
+    lambda: memory_report()["bytes"])
+get_metrics().callback(
+    "analects_sessions", "Streamlit sessions holding a preview store", lambda: memory_report()["sessions"])
+start_metrics_server(int(os.getenv("APP_METRICS_PORT", "9109")))
+
+
+def notebook_pdf_loader(cache_key: str, notebook):
+    """
+    노트 PDF를 읽는 함수를 반환합니다. 세션에는 PDF를 두지 않고 노트 캐시(디스크)에서 읽으며,
+    캐시에서 지워졌으면 (구절 목록, Config)로 다시 만듭니다.
+    다시 만든 PDF는 지금의 사용자 사전으로 그려지므로 키도 지금 상태로 다시 계산해 저장합니다.
+    (훈음을 고친 뒤 예전 키에 다른 내용의 PDF가 저장되지 않도록)
+    """
+    def load() -> bytes:
+        notebook_cache = get_notebook_cache()
+        pdf_data = notebook_cache.peek(cache_key, PDF_NAME)
+        if pdf_data is None:
+            passages, config = notebook
+            current_key = notebook_key(passages, config, str(FONT_PATH))
+            if current_key != cache_key:
+                pdf_data = notebook_cache.peek(current_key, PDF_NAME)
+            if pdf_data is None:
+                pdf_data = AnalectsTracingPDF(config, str(FONT_PATH), page_cache=get_page_cache()).generate_bytes(passages)
+                notebook_cache.put(current_key, PDF_NAME, pdf_data)
+        return pdf_data
+    return load
+
 st.title("📝 논어 필사 PDF 생성기")
 
 # ---------------------------------------------------------------------------
@@ -37,10 +89,14 @@ st.title("📝 논어 필사 PDF 생성기")
 # ---------------------------------------------------------------------------
 if 'user_name' not in st.session_state:
     st.session_state.user_name = None
-if 'pdf_data' not in st.session_state:
-    st.session_state.pdf_data = None
+if 'cache_key' not in st.session_state:
+    st.session_state.cache_key = None
+if 'page_count' not in st.session_state:
+    st.session_state.page_count = 0
+if 'notebook' not in st.session_state:
+    st.session_state.notebook = None  # (구절 목록, Config): PDF 없이 미리보기를 그릴 때 사용
 if 'preview_images' not in st.session_state:
-    st.session_state.preview_images = []
+    st.session_state.preview_images = SessionStore()  # (page, dpi) → 이미지 바이트 (크기 제한, LRU)
 
 # ---------------------------------------------------------------------------
 # 로그인 화면
@@ -90,16 +146,34 @@ with st.sidebar:
                 st.rerun()
 
     st.caption("서버 데이터 보존")
+    sync_worker = get_sync_worker()
     if st.button("서버 DB에 최종 저장", use_container_width=True, type="primary"):
-        try:
-            with st.spinner("동기화 중..."):
-                subprocess.run(["git", "add", "custom_meanings.json", "challenge_db.json"], timeout=10, check=False)
-                try: subprocess.run(["git", "commit", "-m", "chore: sync"], timeout=5, capture_output=True, check=False)
-                except: pass
-                subprocess.run(["git", "push", "origin", "master"], timeout=30, check=True)
-                st.cache_data.clear()
+        with st.spinner("동기화 중..."):
+            # 대기 중인 출석 기록과 사전 변경을 함께 바로 커밋/푸시합니다.
+            sync_worker.enqueue(["custom_meanings.json", DB_FILE], "chore: sync")
+            if sync_worker.flush(timeout=60):
+                clear_caches()
                 st.success("완료!")
-        except Exception as e: st.error(f"실패: {e}")
+            else:
+                st.error(f"실패: {sync_worker.status().last_error or '시간 초과'}")
+
+    sync_status = sync_worker.status()
+    if sync_status.last_error:
+        last_sync = f"실패 ({sync_status.failures}회 연속): {sync_status.last_error}"
+    elif sync_status.last_success:
+        last_sync = "성공 " + datetime.fromtimestamp(sync_status.last_success).strftime("%H:%M:%S")
+    else:
+        last_sync = "없음"
+    st.caption(f"동기화 대기 {sync_status.queue_depth}건 · 마지막 동기화: {last_sync}")
+
+    cache_stats = get_notebook_cache().stats()
+    st.caption(f"노트 캐시 적중 {cache_stats['hits']}회 / 실패 {cache_stats['misses']}회")
+    page_stats = get_page_cache().stats()
+    st.caption(f"구절 페이지 캐시 적중 {page_stats['hits']}회 / 실패 {page_stats['misses']}회")
+    memory = memory_report()
+    rss = f"{memory['rss_bytes'] / 2**20:.0f}MB" if memory["rss_bytes"] else "알 수 없음"
+    st.caption(
+        f"미리보기 메모리 {memory['bytes'] / 2**20:.1f}MB (세션 {memory['sessions']}개) · 프로세스 RSS {rss}")
 
     st.markdown("---")
     if st.button("다른 이름으로 시작하기 (로그아웃)"):
@@ -124,34 +198,92 @@ with col_left:
 
     if submitted and user_input.strip():
         try:
-            with st.spinner("PDF 제작 중..."):
-                passages = parse_text_input(user_input)
-                if passages:
-                    font_path = Path("fonts/NotoSerifCJKkr-Regular.otf")
-                    with tempfile.TemporaryDirectory() as tmpdir:
-                        pdf_path = Path(tmpdir) / "output.pdf"
+            with st.spinner("PDF 제작 중..."), collect_stages("app") as stages:
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    with stage("parse"):
+                        passages = parse_text_input(user_input)
+                    outcome = "empty"
+                    if passages:
                         config = Config(show_meaning=show_meaning)
-                        generator = AnalectsTracingPDF(config, str(font_path))
-                        generator.generate(passages, str(pdf_path))
+                        notebook_cache = get_notebook_cache()
+                        cache_key = notebook_key(passages, config, str(FONT_PATH))
+                        pdf_data = notebook_cache.get(cache_key, PDF_NAME)
+                        if pdf_data is None:
+                            generator = AnalectsTracingPDF(config, str(FONT_PATH), page_cache=get_page_cache())
+                            pdf_data = generator.generate_bytes(passages)
+                            notebook_cache.put(cache_key, PDF_NAME, pdf_data)
 
                         # 챌린지 기록 (구절 수 없이 이름만 전달)
-                        result = add_log(user_name)
+                        with stage("add_log"):
+                            result = add_log(user_name)
+                        outcome = "ok"
+                finally:
+                    record_request("app", outcome, time.perf_counter() - started, stages)
 
-                        with open(pdf_path, "rb") as f:
-                            st.session_state.pdf_data = f.read()
-                        st.session_state.preview_images = convert_from_path(str(pdf_path))
-                        st.rerun()
+                if passages:
+                    st.session_state.cache_key = cache_key
+                    st.session_state.page_count = count_pages(pdf_data)
+                    st.session_state.notebook = (passages, config)
+                    st.session_state.preview_images.clear()
+                    st.rerun()
         except Exception as e: st.error(f"오류: {e}")
 
 with col_right:
     tab_p, tab_g = st.tabs(["👀 미리보기 & 다운로드", "📖 사용 가이드"])
     with tab_p:
-        if st.session_state.pdf_data:
+        if st.session_state.cache_key:
             st.success(f"🎉 **{user_name}**님, 필사 노트 생성 완료! (오늘 출석했습니다 ✅)")
-            st.download_button("📥 PDF 다운로드", data=st.session_state.pdf_data, file_name="analects_tracing.pdf", mime="application/pdf", use_container_width=True)
+            # 누를 때 읽으므로 PDF 바이트가 세션에 남지 않습니다.
+            load_pdf = notebook_pdf_loader(st.session_state.cache_key, st.session_state.notebook)
+            st.download_button("📥 PDF 다운로드", data=load_pdf, file_name="analects_tracing.pdf", mime="application/pdf", use_container_width=True)
+            n_pages = st.session_state.page_count
+            c1, c2 = st.columns([2, 1])
+            preview_dpi = c1.select_slider("미리보기 해상도 (DPI)", options=[50, 75, 100, 150, 200], value=100)
+            first_page = 1
+            if n_pages > PREVIEW_PAGES_PER_VIEW:
+                first_page = c2.number_input("시작 페이지", min_value=1, max_value=n_pages, value=1)
+            pages = list(range(first_page, min(n_pages, first_page + PREVIEW_PAGES_PER_VIEW - 1) + 1))
+
             with st.container(height=600, border=True):
-                for img in st.session_state.preview_images:
-                    st.image(img, use_container_width=True)
+                # 보이는 페이지만 래스터화: 썸네일을 먼저 보여준 뒤 본 해상도로 교체
+                slots = {page: st.empty() for page in pages}
+                cache = st.session_state.preview_images
+                preview_cfg = PreviewConfig(dpi=preview_dpi)
+                notebook_cache = get_notebook_cache()
+                cache_key = st.session_state.cache_key
+                missing = []
+                for page in pages:
+                    if (page, preview_dpi) in cache:
+                        continue
+                    img = notebook_cache.get(cache_key, preview_name(page, preview_dpi, preview_cfg.fmt))
+                    if img is None:
+                        missing.append(page)
+                    else:
+                        cache.put((page, preview_dpi), img)
+                if missing and PREVIEW_BACKEND == "native" and st.session_state.notebook:
+                    # 레이아웃 계획을 바로 그리므로 썸네일 단계 없이 본 해상도로 그립니다.
+                    passages, config = st.session_state.notebook
+                    with stage("rasterize"):
+                        images = render_plan_previews(passages, config, str(FONT_PATH), missing, preview_cfg)
+                elif missing:
+                    pdf_data = load_pdf()
+                    with stage("rasterize"):
+                        thumbs = render_previews(pdf_data, missing, preview_cfg, thumbnail=True)
+                    for page, img in thumbs.items():
+                        slots[page].image(img, use_container_width=True)
+                    with stage("rasterize"):
+                        images = render_previews(pdf_data, missing, preview_cfg)
+                if missing:
+                    for page, img in images.items():
+                        cache.put((page, preview_dpi), img)
+                        notebook_cache.put(cache_key, preview_name(page, preview_dpi, preview_cfg.fmt), img)
+                for page in pages:
+                    # 세션 한도를 넘어 지워진 페이지는 방금 그린 결과(images)로 보여줍니다.
+                    img = cache.get((page, preview_dpi)) or (images.get(page) if missing else None)
+                    if img is not None:
+                        slots[page].image(img, caption=f"{page} / {n_pages}", use_container_width=True)
         else:
             with st.container(height=600, border=True):
                 st.info("👈 왼쪽에서 입력 후 생성 버튼을 눌러주세요.")
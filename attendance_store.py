@@ -0,0 +1,183 @@
+"""
+출석 기록 저장소 모듈 (추가 전용 로그 + 색인)
+
+출석 기록을 JSON Lines 파일(한 줄에 기록 하나)에 덧붙이기만 하고,
+메모리에 (이름, 날짜) 색인과 사용자별 출석 일수를 유지합니다.
+
+- 출석 추가: 파일 끝에 한 줄을 덧붙임 (전체 파일 재작성 없음)
+- 중복 확인 / 사용자 통계: 색인 조회 O(1)
+- 순위: 사용자 수 U에 대해 O(U log U) (전체 기록을 다시 훑지 않음)
+- 다른 프로세스나 git pull로 파일이 바뀌면 새로 추가된 줄만 읽고,
+  이미 읽은 부분의 끝(마지막 TAIL_BYTES 바이트)이 달라졌으면 색인을 다시 만듭니다.
+  (git rebase는 파일을 지우고 다시 만드는데 같은 inode를 다시 쓸 수 있으므로 inode가 아니라 내용으로 판단)
+
+줄 단위 텍스트 파일이므로 Git으로 동기화할 때 변경분이 한 줄씩만 보입니다.
+
+기존 challenge_db.json에서 한 번 옮기기:
+    python attendance_store.py --migrate [--json challenge_db.json] [--log challenge_log.jsonl]
+"""
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from git_sync import path_lock
+
+# 재작성 판단에 쓰는, 이미 색인한 부분의 끝 바이트 수
+TAIL_BYTES = 4096
+
+
+class AttendanceStore:
+    """추가 전용 출석 로그와 메모리 색인"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0  # 색인에 반영한 파일 위치 (완전한 줄 끝)
+        self._tail = b""  # _offset 바로 앞의 바이트 (최대 TAIL_BYTES)
+        self._signature = None  # 마지막으로 읽은 파일의 (inode, 크기, mtime)
+        self._days: dict[str, set[str]] = {}
+        self._rows = 0
+
+    def _index(self, entry: dict) -> None:
+        name, date = entry.get("name"), entry.get("date")
+        if not name or not date:
+            return
+        self._days.setdefault(name, set()).add(date)
+        self._rows += 1
+
+    def _refresh(self) -> None:
+        """파일에서 아직 색인하지 않은 줄을 읽습니다. (잠금을 잡은 상태에서 호출)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            return
+
+        with open(self.path, "rb") as f:
+            if stat.st_size < self._offset or not self._same_tail(f):
+                # 파일이 줄었거나 다시 쓰임(git checkout/rebase) → 처음부터 다시 색인
+                self._reset()
+            f.seek(self._offset)
+            chunk = f.read()
+        self._signature = signature
+        end = chunk.rfind(b"\n") + 1  # 쓰는 중인 마지막 줄은 다음 번에 읽음
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._index(json.loads(line))
+            except ValueError:
+                print(f"출석 로그의 잘못된 줄을 건너뜁니다: {line[:80]!r}")
+        self._offset += end
+        self._tail = (self._tail + chunk[:end])[-TAIL_BYTES:]
+
+    def _same_tail(self, f) -> bool:
+        """이미 색인한 부분의 끝 바이트가 그대로인지 확인합니다."""
+        if not self._tail:
+            return True
+        f.seek(self._offset - len(self._tail))
+        return f.read(len(self._tail)) == self._tail
+
+    def append(self, entry: dict) -> bool:
+        """
+        기록 한 줄을 덧붙입니다. 같은 (이름, 날짜)가 이미 있으면 추가하지 않고 False를 반환합니다.
+        """
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._refresh()
+            if entry["date"] in self._days.get(entry["name"], ()):
+                return False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Git 동기화의 pull --rebase가 파일을 바꾸는 동안에는 기다립니다 (git_sync.path_lock).
+            with path_lock(str(self.path)):
+                self._refresh()  # 기다리는 동안 rebase로 들어온 줄 반영
+                if entry["date"] in self._days.get(entry["name"], ()):
+                    return False
+                # O_APPEND: 한 번의 write로 줄 전체가 파일 끝에 붙습니다.
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+            self._refresh()
+            return True
+
+    def user_days(self, name: str) -> int:
+        """사용자의 출석 일수"""
+        with self._lock:
+            self._refresh()
+            return len(self._days.get(name, ()))
+
+    def leaderboard(self) -> list[tuple[str, int]]:
+        """(이름, 출석 일수) 목록을 출석 일수 내림차순으로 반환합니다."""
+        with self._lock:
+            self._refresh()
+            counts = [(name, len(days)) for name, days in self._days.items()]
+        return sorted(counts, key=lambda x: x[1], reverse=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._rows
+
+
+def migrate_json(json_path: str, log_path: str) -> Optional[int]:
+    """
+    기존 JSON DB({"logs": [...]})를 출석 로그로 한 번 옮깁니다.
+    로그 파일이 이미 있거나 JSON 파일이 없으면 아무것도 하지 않고 None을 반환합니다.
+    같은 (이름, 날짜)의 중복 기록은 처음 것만 남기며, 옮긴 기록 수를 반환합니다.
+    """
+    log_path, json_path = Path(log_path), Path(json_path)
+    if log_path.exists() or not json_path.exists():
+        return None
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            logs = json.load(f).get("logs", [])
+    except (OSError, ValueError) as e:
+        print(f"출석 DB 마이그레이션 실패: {e}")
+        return None
+
+    seen = set()
+    lines = []
+    for log in logs:
+        key = (log.get("name"), log.get("date"))
+        if not all(key) or key in seen:
+            continue
+        seen.add(key)
+        lines.append(json.dumps(log, ensure_ascii=False) + "\n")
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = log_path.with_name(f".{log_path.name}.{os.getpid()}.tmp")
+    tmp.write_text("".join(lines), encoding="utf-8")
+    os.replace(tmp, log_path)
+    return len(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="출석 기록 저장소 관리")
+    parser.add_argument("--migrate", action="store_true", help="JSON DB를 출석 로그로 옮깁니다.")
+    parser.add_argument("--json", default="challenge_db.json")
+    parser.add_argument("--log", default="challenge_log.jsonl")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrated = migrate_json(args.json, args.log)
+        if migrated is None:
+            print(f"마이그레이션하지 않았습니다. ({args.log} 파일이 이미 있거나 {args.json} 파일이 없음)")
+        else:
+            print(f"{args.json} → {args.log}: {migrated}건")
+    store = AttendanceStore(args.log)
+    print(f"{args.log}: 기록 {len(store)}건, 사용자 {len(store.leaderboard())}명")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+여러 필사 노트를 한 번에 만드는 일괄(batch) 생성 모듈
+
+입력(파일 여러 개 또는 디렉토리의 *.txt)을 문서 / 편 / 구절 / N구절 단위로 나누고,
+프로세스 풀에서 병렬로 PDF를 만든 뒤 manifest.json에 결과를 기록합니다.
+
+    python analects_tracing.py --font fonts/NotoSerifCJKkr-Regular.otf \\
+        --input weekly/ --output-dir packets/ --split book --workers 8
+
+manifest.json 항목: 파일 이름, 구절 수, 페이지 수, 바이트 수, 렌더링/출력 시간(ms), 오류
+하나라도 실패하면 종료 코드 1을 반환합니다.
+"""
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData, parse_text_input
+from font_registry import warm_font
+from preview import count_pages
+
+SPLIT_MODES = ("document", "book", "passage", "chunk")
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class BatchJob:
+    """PDF 한 개로 만들 구절 묶음"""
+    name: str  # 출력 파일 이름 (확장자 제외)
+    source: str  # 입력 문서 경로
+    passages: list[PassageData] = field(default_factory=list)
+
+
+def collect_inputs(paths: list[str]) -> list[Path]:
+    """입력 경로 목록을 문서 파일 목록으로 펼칩니다. 디렉토리는 안의 *.txt를 이름순으로 사용합니다."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.glob("*.txt") if p.is_file()))
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"입력을 찾을 수 없습니다: {path}")
+    return files
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", text).strip("_") or "untitled"
+
+
+def _book_of(passage: PassageData) -> str:
+    """라벨("학이 1-3")에서 편 부분("1_학이")을 뽑습니다. 편 정보가 없으면 빈 문자열"""
+    name, _, verse = passage.label.rpartition(" ")
+    chapter = verse.split("-")[0] if "-" in verse else ""
+    return f"{chapter.zfill(2)}_{name}" if name else ""
+
+
+def split_jobs(source: Path, passages: list[PassageData], mode: str, chunk_size: int, prefix: str) -> list[BatchJob]:
+    """한 문서의 구절을 분할 방식에 따라 작업 목록으로 나눕니다."""
+    src = str(source)
+    if mode == "document":
+        return [BatchJob(prefix or _safe_name(source.stem), src, passages)]
+
+    jobs: list[BatchJob] = []
+    if mode == "book":
+        for passage in passages:
+            name = _safe_name(f"{prefix}{_book_of(passage) or 'book'}")
+            if not jobs or jobs[-1].name != name:
+                jobs.append(BatchJob(name, src))
+            jobs[-1].passages.append(passage)
+    elif mode == "passage":
+        for i, passage in enumerate(passages, start=1):
+            jobs.append(BatchJob(_safe_name(f"{prefix}{i:04d}_{passage.label}"), src, [passage]))
+    elif mode == "chunk":
+        size = max(1, chunk_size)
+        for start in range(0, len(passages), size):
+            part = start // size + 1
+            jobs.append(BatchJob(_safe_name(f"{prefix}part{part:03d}"), src, passages[start:start + size]))
+    else:
+        raise ValueError(f"알 수 없는 분할 방식: {mode}")
+    return jobs
+
+
+def render_job(job: BatchJob, config: Config, font_path: str, output_dir: str) -> dict:
+    """워커 프로세스에서 작업 하나를 PDF로 만들어 저장하고 manifest 항목을 반환합니다."""
+    entry = {"name": job.name, "source": job.source, "passages": len(job.passages), "worker": os.getpid()}
+    try:
+        start = time.perf_counter()
+        generator = AnalectsTracingPDF(config, font_path)
+        for passage in job.passages:
+            generator.render_passage(passage)
+        render_done = time.perf_counter()
+        pdf_data = bytes(generator.pdf.output())
+        output_done = time.perf_counter()
+
+        target = Path(output_dir) / f"{job.name}.pdf"
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(pdf_data)
+        os.replace(tmp, target)
+        entry.update(
+            file=target.name,
+            pages=count_pages(pdf_data),
+            bytes=len(pdf_data),
+            render_ms=round((render_done - start) * 1000, 1),
+            output_ms=round((output_done - render_done) * 1000, 1),
+        )
+    except Exception as e:
+        entry["error"] = f"{e.__class__.__name__}: {e}"
+        entry["traceback"] = traceback.format_exc(limit=5)
+    return entry
+
+
+def run_batch(
+    inputs: list[str],
+    output_dir: str,
+    font_path: str,
+    split: str = "document",
+    chunk_size: int = 10,
+    workers: Optional[int] = None,
+    config: Optional[Config] = None,
+) -> int:
+    """일괄 생성을 실행하고 종료 코드(0 = 모두 성공, 1 = 실패 있음)를 반환합니다."""
+    if not Path(font_path).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {font_path}")
+        return 1
+    try:
+        files = collect_inputs(inputs)
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+    if not files:
+        print("처리할 입력 문서가 없습니다.")
+        return 1
+
+    config = config or Config()
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    wall_start = time.perf_counter()
+
+    jobs: list[BatchJob] = []
+    failures: list[dict] = []
+    parse_ms = 0.0
+    for path in files:
+        start = time.perf_counter()
+        passages = parse_text_input(path.read_text(encoding="utf-8"))
+        parse_ms += (time.perf_counter() - start) * 1000
+        if not passages:
+            failures.append({"name": path.stem, "source": str(path), "error": "구절을 찾지 못했습니다."})
+            continue
+        prefix = f"{_safe_name(path.stem)}_" if len(files) > 1 and split != "document" else ""
+        jobs.extend(split_jobs(path, passages, split, chunk_size, prefix))
+
+    # 이름이 겹치면 번호를 붙여 덮어쓰기를 막습니다.
+    # 붙인 이름도 기록해, 원래 이름이 a_2인 작업과 새로 붙인 a_2가 겹치지 않게 합니다.
+    seen: dict[str, int] = {}
+    for job in jobs:
+        if job.name in seen:
+            base = job.name
+            while job.name in seen:
+                seen[base] += 1
+                job.name = f"{base}_{seen[base]}"
+        seen[job.name] = 1
+
+    results: list[dict] = []
+    if jobs:
+        # 구절이 많은 작업부터 제출해 마지막에 긴 작업 하나만 남는 일을 줄입니다.
+        ordered = sorted(jobs, key=lambda j: sum(len(p.original) for p in j.passages), reverse=True)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)), initializer=warm_font, initargs=(font_path,)
+        ) as pool:
+            futures = [pool.submit(render_job, job, config, font_path, str(out)) for job in ordered]
+            for future in as_completed(futures):
+                entry = future.result()
+                results.append(entry)
+                status = f"실패: {entry['error']}" if "error" in entry else f"{entry['pages']}쪽, {entry['bytes']:,} bytes"
+                print(f"[{len(results)}/{len(jobs)}] {entry['name']}: {status}")
+
+    order = {job.name: i for i, job in enumerate(jobs)}
+    results.sort(key=lambda e: order[e["name"]])
+    failures.extend(e for e in results if "error" in e)
+    succeeded = [e for e in results if "error" not in e]
+
+    manifest = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "font": Path(font_path).name,
+        "config": asdict(config),
+        "split": split,
+        "chunk_size": chunk_size if split == "chunk" else None,
+        "workers": workers,
+        "inputs": [str(p) for p in files],
+        "files": succeeded,
+        "failures": failures,
+        "totals": {
+            "files": len(succeeded),
+            "failed": len(failures),
+            "passages": sum(e["passages"] for e in succeeded),
+            "pages": sum(e["pages"] for e in succeeded),
+            "bytes": sum(e["bytes"] for e in succeeded),
+            "parse_ms": round(parse_ms, 1),
+            "render_ms": round(sum(e["render_ms"] for e in succeeded), 1),
+            "output_ms": round(sum(e["output_ms"] for e in succeeded), 1),
+            "wall_ms": round((time.perf_counter() - wall_start) * 1000, 1),
+        },
+    }
+    (out / MANIFEST_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    totals = manifest["totals"]
+    print(
+        f"완료: {totals['files']}개 파일, {totals['pages']}쪽, {totals['bytes']:,} bytes, "
+        f"{totals['wall_ms'] / 1000:.1f}초 (워커 {workers}개) → {out / MANIFEST_NAME}"
+    )
+    if failures:
+        print(f"실패 {len(failures)}건:")
+        for entry in failures:
+            print(f"  {entry['name']}: {entry['error']}")
+        return 1
+    return 0
@@ -0,0 +1,131 @@
+"""
+출석 기록 저장소 벤치마크
+
+- legacy: 기존 challenge_db.json 방식 (출석마다 전체 JSON 로드 + any() 중복 검사 +
+          indent=4 전체 재작성, 통계/순위는 전체 기록을 다시 훑음)
+- store:  추가 전용 로그 + (이름, 날짜) 색인 (attendance_store.py)
+
+측정 항목: 출석 추가 1건, 사용자 통계, 순위, JSON → 로그 마이그레이션 시간
+Git 동기화는 포함하지 않습니다.
+
+사용법:
+    python benchmarks/attendance_bench.py [--rows 100000] [--users 200]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from attendance_store import AttendanceStore, migrate_json  # noqa: E402
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def make_logs(rows: int, users: int) -> list[dict]:
+    """사용자별로 서로 다른 날짜에 출석한 합성 기록"""
+    rng = random.Random(0)
+    start = date(2020, 1, 1)
+    names = [f"user{i:04d}" for i in range(users)]
+    logs = []
+    for i in range(rows):
+        day = (start + timedelta(days=i // users)).isoformat()
+        name = names[i % users]
+        logs.append({"name": name, "date": day, "timestamp": f"{day} {rng.randint(0, 23):02d}:00:00"})
+    return logs
+
+
+def legacy_add(path: Path, name: str, today: str) -> bool:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if any(log["name"] == name and log["date"] == today for log in data["logs"]):
+        return False
+    data["logs"].append({"name": name, "date": today, "timestamp": f"{today} 00:00:00"})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    return True
+
+
+def legacy_stats(path: Path, name: str) -> int:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return len(set(log["date"] for log in data["logs"] if log["name"] == name))
+
+
+def legacy_leaderboard(path: Path) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    stats = {}
+    for log in data["logs"]:
+        stats.setdefault(log["name"], set()).add(log["date"])
+    return sorted(((n, len(d)) for n, d in stats.items()), key=lambda x: x[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--adds", type=int, default=20, help="측정할 출석 추가 횟수")
+    args = parser.parse_args()
+
+    logs = make_logs(args.rows, args.users)
+    new_day = date(2100, 1, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "challenge_db.json"
+        log_path = Path(tmp) / "challenge_log.jsonl"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"logs": logs}, f, ensure_ascii=False, indent=4)
+
+        start = time.perf_counter()
+        migrated = migrate_json(str(json_path), str(log_path))
+        migrate_ms = _ms(start)
+
+        store = AttendanceStore(str(log_path))
+        start = time.perf_counter()
+        len(store)
+        index_ms = _ms(start)
+
+        results = {}
+        start = time.perf_counter()
+        for i in range(args.adds):
+            legacy_add(json_path, f"new{i}", (new_day + timedelta(days=i)).isoformat())
+        results["legacy"] = [_ms(start) / args.adds]
+        start = time.perf_counter()
+        for i in range(args.adds):
+            store.append({"name": f"new{i}", "date": (new_day + timedelta(days=i)).isoformat(),
+                          "timestamp": "2100-01-01 00:00:00"})
+        results["store"] = [_ms(start) / args.adds]
+
+        start = time.perf_counter()
+        legacy_stats(json_path, "user0001")
+        results["legacy"].append(_ms(start))
+        start = time.perf_counter()
+        store.user_days("user0001")
+        results["store"].append(_ms(start))
+
+        start = time.perf_counter()
+        legacy_leaderboard(json_path)
+        results["legacy"].append(_ms(start))
+        start = time.perf_counter()
+        store.leaderboard()
+        results["store"].append(_ms(start))
+
+        assert legacy_leaderboard(json_path) == store.leaderboard()
+
+    print(f"rows={args.rows:,} users={args.users}")
+    print(f"migration: {migrated:,} rows in {migrate_ms:.1f} ms, initial index build {index_ms:.1f} ms")
+    print(f"{'':8s} {'add (ms)':>10s} {'stats (ms)':>11s} {'leaderboard (ms)':>17s}")
+    for label, (add_ms, stats_ms, board_ms) in results.items():
+        print(f"{label:8s} {add_ms:10.3f} {stats_ms:11.3f} {board_ms:17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+격자 셀 템플릿(Form XObject) 벤치마크
+
+긴 구절로 노트를 만들어 두 모드를 비교합니다.
+- direct:   셀마다 draw_grid_cell + draw_meaning_box 연산자를 반복 출력 (기존 방식)
+- template: 셀 그림을 Form XObject 하나로 만들고 셀마다 참조만 출력
+
+측정 항목: 렌더링 시간, 페이지 콘텐츠 스트림 크기(압축 전), 출력 PDF 크기,
+poppler(pdftoppm) 래스터화 시간(설치된 경우).
+
+사용법:
+    python benchmarks/cell_template_bench.py --font fonts/NotoSerifCJKkr-Regular.otf
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData  # noqa: E402
+from preview import render_preview_pages  # noqa: E402
+
+LONG_ORIGINAL = "子曰學而時習之不亦說乎有朋自遠方來不亦樂乎人不知而不慍不亦君子乎" * 4
+
+
+def _build(font_path: str, use_template: bool, n_passages: int):
+    passages = [
+        PassageData(label=f"학이 1-{i + 1}", original=LONG_ORIGINAL, interpretation="공자께서 말씀하셨다.")
+        for i in range(n_passages)
+    ]
+    generator = AnalectsTracingPDF(Config(use_cell_template=use_template), font_path)
+    start = time.perf_counter()
+    for passage in passages:
+        generator.render_passage(passage)
+    render_ms = (time.perf_counter() - start) * 1000
+    stream_bytes = sum(len(page.contents) for page in generator.pdf.pages.values())
+    start = time.perf_counter()
+    pdf_bytes = bytes(generator.pdf.output())
+    output_ms = (time.perf_counter() - start) * 1000
+    return render_ms, output_ms, stream_bytes, pdf_bytes
+
+
+def _rasterize_ms(pdf_bytes: bytes):
+    try:
+        start = time.perf_counter()
+        render_preview_pages(pdf_bytes)
+        return (time.perf_counter() - start) * 1000
+    except (OSError, RuntimeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--passages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    for name, use_template in (("direct", False), ("template", True)):
+        runs = [_build(args.font, use_template, args.passages) for _ in range(args.repeat)]
+        render_ms = statistics.median(r[0] for r in runs)
+        output_ms = statistics.median(r[1] for r in runs)
+        stream_bytes, pdf_bytes = runs[-1][2], runs[-1][3]
+        raster_ms = _rasterize_ms(pdf_bytes)
+        raster = f"{raster_ms:8.1f} ms" if raster_ms is not None else "   (poppler 없음)"
+        print(f"{name:<9} render {render_ms:8.1f} ms  output {output_ms:8.1f} ms  "
+              f"stream {stream_bytes:>9,} B  pdf {len(pdf_bytes):>9,} B  rasterize {raster}")
+
+
+if __name__ == "__main__":
+    main()
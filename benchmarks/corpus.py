@@ -0,0 +1,76 @@
+"""
+벤치마크용 합성 논어 코퍼스
+
+논어 20편의 실제 구절 수(총 505구절)에 맞춰 결정적(seed 고정)으로 구절을 만들고,
+긴 구절 경계 사례(150/300/600자)를 담은 부록 편을 덧붙입니다.
+원문 한자와 음독은 같은 (한자, 음) 쌍에서 뽑으므로 음독 글자 수가 원문과 일치합니다.
+
+    from corpus import corpus_text, corpus_passages
+    text = corpus_text()            # parse_text_input 입력 형식의 문자열
+    passages = corpus_passages()    # PassageData 목록
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import PassageData, parse_text_input  # noqa: E402
+
+# (편 이름, 구절 수)
+BOOKS = [
+    ("학이", 16), ("위정", 24), ("팔일", 26), ("이인", 26), ("공야장", 27),
+    ("옹야", 28), ("술이", 37), ("태백", 21), ("자한", 30), ("향당", 27),
+    ("선진", 25), ("안연", 24), ("자로", 30), ("헌문", 44), ("위령공", 41),
+    ("계씨", 14), ("양화", 26), ("미자", 11), ("자장", 25), ("요왈", 3),
+]
+
+# 긴 구절 경계 사례 (글자 수)
+LONG_PASSAGES = (150, 300, 600)
+
+_PAIRS = (
+    "子자 曰왈 學학 而이 時시 習습 之지 不불 亦역 說열 乎호 有유 朋붕 自자 遠원 方방 來래 樂락 "
+    "人인 知지 慍온 君군 孝효 弟제 其기 為위 也야 好호 犯범 上상 者자 鮮선 矣의 作작 亂란 "
+    "未미 本본 立립 道도 生생 仁인 與여 巧교 言언 令령 色색 吾오 日일 三삼 省성 身신 謀모 "
+    "忠충 交교 信신 傳전 國국 敬경 事사 節절 用용 愛애 使사 民민 以이 行행 餘여 力력 則즉 "
+    "文문 賢현 易이 父부 母모 能능 竭갈 致치 友우 雖수 謂위 必필 重중 威위 固고 過과 勿물 憚탄"
+).split()
+_HANJA = [p[0] for p in _PAIRS]
+_SOUND = {p[0]: p[1:] for p in _PAIRS}
+
+_INTERP = "공자께서 말씀하셨다. 배우고 때때로 익히면 또한 기쁘지 아니한가. "
+
+
+def _passage_length(rng: random.Random) -> int:
+    """실제 논어 구절과 비슷한 길이 분포 (대부분 10~60자, 가끔 긴 구절)"""
+    return max(6, min(120, int(rng.lognormvariate(3.3, 0.5))))
+
+
+def _verse(rng: random.Random, n_chars: int) -> tuple[str, str]:
+    chars = [rng.choice(_HANJA) for _ in range(n_chars)]
+    return "".join(chars), "".join(_SOUND[ch] for ch in chars)
+
+
+def corpus_text(seed: int = 0, long_passages: bool = True) -> str:
+    """parse_text_input 입력 형식의 코퍼스 문자열을 만듭니다."""
+    rng = random.Random(seed)
+    lines = ["260101"]
+    books = list(BOOKS)
+    if long_passages:
+        books.append(("부록", len(LONG_PASSAGES)))
+    for book_no, (name, n_verses) in enumerate(books, start=1):
+        lines.append(f"{book_no}.{name}편")
+        for verse_no in range(1, n_verses + 1):
+            if name == "부록":
+                n_chars = LONG_PASSAGES[verse_no - 1]
+            else:
+                n_chars = _passage_length(rng)
+            original, reading = _verse(rng, n_chars)
+            lines.append(f"{verse_no}.{original[:2]}: \"{original[2:]}\"")
+            lines.append(f"({reading})")
+            lines.append(_INTERP * max(1, n_chars // 20))
+    return "\n".join(lines) + "\n"
+
+
+def corpus_passages(seed: int = 0, long_passages: bool = True) -> list[PassageData]:
+    return parse_text_input(corpus_text(seed, long_passages))
@@ -0,0 +1,69 @@
+"""
+폰트 레지스트리 벤치마크: 생성기(AnalectsTracingPDF) 생성 시간 비교
+
+- cold: 기존 방식처럼 매번 FPDF.add_font()로 폰트를 파싱
+- warm: 프로세스 전역 레지스트리에 적재된 폰트를 재사용
+
+사용법:
+    python benchmarks/font_registry_bench.py --font fonts/NotoSerifCJKkr-Regular.otf
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fpdf import FPDF  # noqa: E402
+
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from font_registry import get_font_registry  # noqa: E402
+
+
+def _cold_construct(font_path: str):
+    pdf = FPDF(unit="mm", format="A4")
+    pdf.add_font("CJK", "", font_path)
+    pdf.add_font("CJK", "B", font_path)
+    return pdf
+
+
+def _measure(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list[float]):
+    print(f"{name:<28} mean {statistics.mean(timings):9.2f} ms   "
+          f"median {statistics.median(timings):9.2f} ms   (n={len(timings)})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    config = Config()
+    registry = get_font_registry()
+    registry.clear()
+
+    cold = _measure(lambda: _cold_construct(args.font), args.repeat)
+    first = _measure(lambda: AnalectsTracingPDF(config, args.font), 1)
+    warm = _measure(lambda: AnalectsTracingPDF(config, args.font), args.repeat)
+
+    _report("cold (add_font per request)", cold)
+    _report("registry first (warm-up)", first)
+    _report("registry warm", warm)
+    print(f"speedup (cold / warm): {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+축소 폰트(font_subset.py) 벤치마크: 요청당 서브셋(pdf.output()) 시간, PDF 크기, 메모리
+
+원본 폰트를 임시 디렉토리에 복사해 축소 폰트를 빌드한 뒤, 구절 수별 노트에 대해 세 방식을 비교합니다.
+- full+bold: 이전 방식 (원본 폰트 보통 + 굵게 등록, 굵게는 쓰이지 않지만 매번 서브셋되어 포함됨)
+- full:      원본 폰트만 등록 (Config(use_compact_font=False))
+- compact:   축소 폰트 + 없는 글자만 원본 폰트 (기본값)
+
+측정 항목: output() 중앙값(ms), PDF 바이트, output() 중 tracemalloc 최대 메모리(MB),
+          폰트 적재(파싱) 시 tracemalloc 최대 메모리(MB)
+
+사용법:
+    python benchmarks/font_subset_bench.py --font fonts/NotoSerifCJKkr-Regular.otf [--sizes 1 5 30] [--repeat 5]
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from corpus import corpus_passages  # noqa: E402
+from font_registry import get_font_registry  # noqa: E402
+from font_subset import build_compact_font, compact_charset, compact_font_path  # noqa: E402
+
+MODES = ("full+bold", "full", "compact")
+
+
+def _generator(mode: str, font_path: str) -> AnalectsTracingPDF:
+    generator = AnalectsTracingPDF(Config(use_compact_font=mode == "compact"), font_path)
+    if mode == "full+bold":
+        get_font_registry().add_font(generator.pdf, "CJK", "B", font_path)
+    return generator
+
+
+def _load_peak_mb(font_path: str) -> float:
+    registry = get_font_registry()
+    registry.clear()
+    tracemalloc.start()
+    registry.warm(font_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def measure(mode: str, font_path: str, passages, repeat: int) -> dict:
+    times, peaks, size = [], [], 0
+    for _ in range(repeat):
+        generator = _generator(mode, font_path)
+        for passage in passages:
+            generator.render_passage(passage)
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = bytes(generator.pdf.output())
+        times.append((time.perf_counter() - start) * 1000)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak / 1024 / 1024)
+        size = len(data)
+    return {"output_ms": statistics.median(times), "bytes": size, "peak_mb": max(peaks)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 30], help="노트 하나의 구절 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        font_path = str(Path(tmp) / Path(args.font).name)
+        shutil.copy(args.font, font_path)
+        manifest = build_compact_font(font_path, compact_charset())
+        compact_path = str(compact_font_path(font_path))
+        print(f"compact font: {manifest['chars']:,} chars, {manifest['glyphs']:,} glyphs, "
+              f"{manifest['source_bytes']:,} → {manifest['bytes']:,} bytes, build {manifest['build_ms'] / 1000:.1f}s")
+        print(f"font load peak: full {_load_peak_mb(font_path):.1f} MB, compact {_load_peak_mb(compact_path):.1f} MB")
+
+        get_font_registry().clear()
+        corpus = corpus_passages()
+        print(f"{'passages':>8s} {'mode':>10s} {'output ms':>10s} {'bytes':>11s} {'peak MB':>8s}")
+        for size in args.sizes:
+            passages = corpus[:size]
+            for mode in MODES:
+                result = measure(mode, font_path, passages, args.repeat)
+                print(f"{size:8d} {mode:>10s} {result['output_ms']:10.1f} {result['bytes']:11,d} {result['peak_mb']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+글자 폭 표와 그래픽 상태 중복 제거(drawing_context.py) 벤치마크
+
+긴 구절(benchmarks/corpus.py의 150/300/600자)과 보통 길이 구절을 렌더링해 이전 방식과 비교합니다.
+- plan: 레이아웃 계획 계산. 이전 방식은 글자마다 set_font + get_string_width를 호출하고,
+        새 방식은 폰트별 (텍스트, 크기) 폭 표를 씁니다. 계획 캐시는 매번 비웁니다.
+- emit: 계획 → fpdf 호출. 이전 방식은 항목마다 set_font/set_text_color/set_draw_color 등을 그대로 호출하고
+        셀마다 선 상태를 바꿨습니다. 새 방식은 DrawingContext로 바뀐 상태만 넘기고 격자 셀을 선 스타일별로 모읍니다.
+- stream: 페이지 콘텐츠 스트림 크기(압축 전, KB)
+
+격자 셀 템플릿을 쓰는 경우(기본값)와 쓰지 않는 경우를 모두 측정합니다.
+
+사용법:
+    python benchmarks/graphics_state_bench.py --font fonts/NotoSerifCJKkr-Regular.otf [--repeat 5]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from corpus import LONG_PASSAGES, corpus_passages  # noqa: E402
+from font_registry import warm_font  # noqa: E402
+from layout_plan import Glyph, GridCell, LayoutPlanner, Rule, TextCell, clear_plan_cache, clear_width_cache  # noqa: E402
+
+
+class _UncachedPlanner(LayoutPlanner):
+    """이전 방식: 폭을 잴 때마다 fpdf로 계산"""
+
+    def string_width(self, text: str, size: float) -> float:
+        self._metrics.set_font("CJK", "", size)
+        return self._metrics.get_string_width(text)
+
+
+def _legacy_emit(generator: AnalectsTracingPDF, plan) -> None:
+    """이전 방식의 emit_plan: 항목마다 fpdf 상태 설정을 그대로 호출"""
+    pdf = generator.pdf
+    cfg = generator.cfg
+    for items in plan.pages:
+        pdf.add_page()
+        for item in items:
+            if isinstance(item, Glyph):
+                pdf.set_font(generator._font_family_for(item.text), "", item.size)
+                pdf.set_text_color(*item.color)
+                pdf.text(item.x, item.y, item.text)
+            elif isinstance(item, GridCell):
+                if cfg.use_cell_template:
+                    generator.draw_cell_with_box(item.x, item.y, item.size)
+                    continue
+                pdf.set_draw_color(*cfg.color_cross)
+                pdf.set_line_width(cfg.dash_width)
+                pdf.set_dash_pattern(dash=cfg.dash_length, gap=cfg.dash_gap)
+                mid_y = item.y + item.size / 2
+                pdf.line(item.x, mid_y, item.x + item.size, mid_y)
+                mid_x = item.x + item.size / 2
+                pdf.line(mid_x, item.y, mid_x, item.y + item.size)
+                pdf.set_dash_pattern()
+                pdf.set_draw_color(*cfg.color_border)
+                pdf.set_line_width(cfg.border_width)
+                pdf.rect(item.x, item.y, item.size, item.size)
+                pdf.set_draw_color(*cfg.color_meaning_box)
+                pdf.set_line_width(0.2)
+                pdf.rect(item.x, item.y + item.size, item.size, cfg.meaning_box_height)
+            elif isinstance(item, TextCell):
+                generator._font_family_for(item.text)
+                pdf.set_font("CJK", "", item.size)
+                pdf.set_text_color(*item.color)
+                pdf.set_xy(item.x, item.y)
+                pdf.cell(item.w, item.h, item.text, border=0, align="L")
+            elif isinstance(item, Rule):
+                pdf.set_draw_color(*item.color)
+                pdf.set_line_width(item.width)
+                pdf.line(item.x1, item.y1, item.x2, item.y2)
+
+
+def measure(passages, config: Config, font_path: str, legacy: bool, repeat: int) -> dict:
+    plan_times, emit_times, stream = [], [], 0
+    planner_cls = _UncachedPlanner if legacy else LayoutPlanner
+    for _ in range(repeat):
+        clear_plan_cache()
+        clear_width_cache()
+        planner = planner_cls(config, font_path)
+        start = time.perf_counter()
+        plans = [planner.build_plan(passage) for passage in passages]
+        plan_times.append((time.perf_counter() - start) * 1000)
+
+        generator = AnalectsTracingPDF(config, font_path)
+        start = time.perf_counter()
+        for plan in plans:
+            if legacy:
+                _legacy_emit(generator, plan)
+            else:
+                generator.emit_plan(plan)
+        emit_times.append((time.perf_counter() - start) * 1000)
+        stream = sum(len(page.contents) for page in generator.pdf.pages.values())
+    return {"plan_ms": statistics.median(plan_times), "emit_ms": statistics.median(emit_times), "stream_kb": stream / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    warm_font(args.font)
+    corpus = corpus_passages()
+    long_passages = corpus[-len(LONG_PASSAGES):]
+    cases = [(f"{len(p.original)}자", [p]) for p in long_passages] + [("보통 30구절", corpus[:30])]
+
+    print(f"{'case':>12s} {'template':>8s} {'mode':>7s} {'plan ms':>8s} {'emit ms':>8s} {'stream KB':>10s}")
+    for use_template in (True, False):
+        config = Config(use_cell_template=use_template)
+        for name, passages in cases:
+            for legacy in (True, False):
+                result = measure(passages, config, args.font, legacy, args.repeat)
+                print(f"{name:>12s} {str(use_template):>8s} {'before' if legacy else 'after':>7s} "
+                      f"{result['plan_ms']:8.1f} {result['emit_ms']:8.1f} {result['stream_kb']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
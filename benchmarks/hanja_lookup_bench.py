@@ -0,0 +1,168 @@
+"""
+한자 훈음 조회 벤치마크 (초당 조회 수)
+
+- legacy: 기존 get_hanja_meaning 구현 (글자마다 사용자 사전 캐시 조회 + NFKC 정규화 +
+          hanjadict 조회 + 후보 문자열 분할 + 다음자 집합 비교)
+- scan:   훈음 표 후보를 매번 훑으며 하드코딩된 음 쌍 집합과 비교하는 선택 (색인 도입 전)
+- single: 글자별 음 색인과 두음법칙 규칙표를 쓰는 get_hanja_meaning (캐시를 비운 상태에서 시작)
+- batch:  구절 단위 get_hanja_meanings
+
+--analects를 주면 무작위 글자 대신 합성 논어 코퍼스(benchmarks/corpus.py, 505구절 + 긴 구절)의
+원문과 음독을 구절 단위로 조회합니다. 색인은 같은 음의 후보를 먼저 고르므로, legacy·scan과 다른 결과는
+예시와 함께 출력합니다. (예: 樂을 '요'로 읽을 때 legacy는 첫 후보 '즐거울 락'을 고름)
+
+사용법:
+    python benchmarks/hanja_lookup_bench.py [--chars 200000] [--analects]
+"""
+import argparse
+import random
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hanjadict  # noqa: E402
+
+import hanja_dictionary  # noqa: E402
+from hanja_dictionary import get_custom_dict, get_hanja_meaning, get_hanja_meanings  # noqa: E402
+from hanja_table import load_table  # noqa: E402
+
+PASSAGE_LEN = 40
+
+
+def legacy_get_hanja_meaning(char: str, preferred_sound: str = None) -> str:
+    """변경 전 get_hanja_meaning 과 같은 알고리즘"""
+    if not char or len(char) != 1:
+        return ""
+    custom_dict = get_custom_dict()
+    if char in custom_dict:
+        return custom_dict[char]
+    normalized_char = unicodedata.normalize('NFKC', char)
+    if normalized_char in custom_dict:
+        return custom_dict[normalized_char]
+    result = hanjadict.lookup(normalized_char)
+    if not result:
+        result = hanjadict.lookup(char)
+    if not result:
+        return ""
+    candidates = [c.strip() for c in result.split(',')]
+    if preferred_sound:
+        for cand in candidates:
+            parts = cand.split()
+            if not parts: continue
+            actual_sound = parts[-1]
+            if actual_sound == preferred_sound: return cand
+            if {actual_sound, preferred_sound} <= {"불", "부"}: return cand
+            if {actual_sound, preferred_sound} <= {"락", "낙", "악", "요"}: return cand
+            if {actual_sound, preferred_sound} <= {"륙", "육"}: return cand
+            if {actual_sound, preferred_sound} <= {"례", "예"}: return cand
+    return candidates[0]
+
+
+def scan_select_candidate(candidates, preferred_sound: str = None) -> str:
+    """색인 도입 전 _select_candidate (호출마다 후보를 나누고 음 쌍 집합을 만듦)"""
+    if preferred_sound:
+        for cand in candidates:
+            parts = cand.split()
+            if not parts: continue
+            actual_sound = parts[-1]
+            if actual_sound == preferred_sound: return cand
+            if {actual_sound, preferred_sound} <= {"불", "부"}: return cand
+            if {actual_sound, preferred_sound} <= {"락", "낙", "악", "요"}: return cand
+            if {actual_sound, preferred_sound} <= {"륙", "육"}: return cand
+            if {actual_sound, preferred_sound} <= {"례", "예"}: return cand
+    return candidates[0]
+
+
+def scan_get_hanja_meaning(table, char: str, preferred_sound: str = None) -> str:
+    custom = hanja_dictionary._custom_meaning(get_custom_dict(), char)
+    if custom is not None:
+        return custom
+    candidates = table.candidates(char)
+    return scan_select_candidate(candidates, preferred_sound) if candidates else ""
+
+
+def _analects_corpus() -> tuple[list[list[str]], list[list[str]]]:
+    """합성 논어 코퍼스의 구절별 (원문 글자, 음독 음절)"""
+    from corpus import corpus_passages
+    from layout_plan import passage_sounds
+
+    passages = corpus_passages()
+    return [list(p.original) for p in passages], [passage_sounds(p) for p in passages]
+
+
+def _corpus(n: int) -> tuple[list[str], list[str]]:
+    rng = random.Random(0)
+    pool = [ch for ch in hanjadict.table_data if len(ch) == 1] or [chr(cp) for cp in range(0x4E00, 0x9FA6)]
+    chars = [rng.choice(pool) for _ in range(n)]
+    sounds = []
+    for ch in chars:
+        result = hanjadict.lookup(ch)
+        sounds.append(rng.choice(result.split(","))[-1] if result and rng.random() < 0.8 else None)
+    return chars, sounds
+
+
+def _rate(n: int, start: float) -> str:
+    elapsed = time.perf_counter() - start
+    return f"{n / elapsed:12,.0f} lookups/s  ({elapsed * 1000:8.1f} ms)"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type=int, default=200_000)
+    parser.add_argument("--analects", action="store_true", help="합성 논어 코퍼스를 구절 단위로 조회")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = load_table()
+    print(f"table load: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.analects:
+        passage_chars, passage_sounds = _analects_corpus()
+    else:
+        chars, sounds = _corpus(args.chars)
+        passage_chars = [chars[i:i + PASSAGE_LEN] for i in range(0, len(chars), PASSAGE_LEN)]
+        passage_sounds = [sounds[i:i + PASSAGE_LEN] for i in range(0, len(sounds), PASSAGE_LEN)]
+    chars = [c for p in passage_chars for c in p]
+    sounds = [s for p in passage_sounds for s in p]
+    print(f"{len(passage_chars)} passages, {len(chars)} chars")
+    get_custom_dict()
+
+    start = time.perf_counter()
+    legacy = [legacy_get_hanja_meaning(c, s) for c, s in zip(chars, sounds)]
+    print(f"legacy  {_rate(len(chars), start)}")
+
+    start = time.perf_counter()
+    scan = [scan_get_hanja_meaning(table, c, s) for c, s in zip(chars, sounds)]
+    print(f"scan    {_rate(len(chars), start)}")
+
+    hanja_dictionary._meaning_cache.clear()
+    hanja_dictionary._sound_indexes.clear()
+    start = time.perf_counter()
+    single = [get_hanja_meaning(c, s) for c, s in zip(chars, sounds)]
+    print(f"single  {_rate(len(chars), start)}")
+
+    start = time.perf_counter()
+    batch = []
+    for p_chars, p_sounds in zip(passage_chars, passage_sounds):
+        batch += get_hanja_meanings(p_chars, p_sounds)
+    print(f"batch   {_rate(len(chars), start)}")
+
+    assert single == batch
+    _report_differences("legacy", chars, sounds, legacy, batch)
+    _report_differences("scan", chars, sounds, scan, batch)
+
+
+def _report_differences(name: str, chars, sounds, before: list[str], after: list[str]) -> None:
+    """이전 방식과 색인 조회 결과가 다른 조회 수와 예시를 출력합니다."""
+    differences = {(c, s, a, b) for c, s, a, b in zip(chars, sounds, before, after) if a != b}
+    print(f"differences vs {name}: {sum(a != b for a, b in zip(before, after))} lookups, "
+          f"{len(differences)} distinct (char, sound)")
+    for c, s, a, b in sorted(differences, key=lambda d: (d[0], str(d[1])))[:10]:
+        print(f"  {c} ({s}): {a!r} -> {b!r}")
+
+
+if __name__ == "__main__":
+    main()
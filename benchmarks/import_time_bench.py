@@ -0,0 +1,83 @@
+"""
+진입점별 import 시간 벤치마크
+
+각 진입점(CLI, 텔레그램 봇, Streamlit 앱)이 시작할 때 불러오는 모듈을
+`python -X importtime`으로 새 프로세스에서 측정합니다.
+
+측정 항목: 전체 import 시간(누적 합계), 가장 무거운 모듈, streamlit/hanjadict 로드 여부
+
+사용법:
+    python benchmarks/import_time_bench.py [--repeat 3]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "cli": ["analects_tracing"],
+    "bot": ["dotenv", "telegram", "telegram.ext", "render_queue", "notebook_cache"],
+    "app": ["streamlit", "pandas", "analects_tracing", "hanja_dictionary", "challenge_manager",
+            "notebook_cache", "preview"],
+}
+
+# import time:  self [us] | cumulative | imported package
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(modules: list[str]) -> dict:
+    code = "; ".join(f"import {m}" for m in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        last = result.stderr.strip().splitlines()[-1:] or [""]
+        return {"error": last[0]}
+
+    total_us = 0
+    top_level = []
+    loaded = set()
+    for line in result.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        total_us += self_us
+        loaded.add(name.split(".")[0])
+        if len(indent) <= 1:
+            top_level.append((cumulative_us, name))
+    top_level.sort(reverse=True)
+    return {
+        "total_ms": total_us / 1000,
+        "heaviest": [(name, us / 1000) for us, name in top_level[:3]],
+        "streamlit": "streamlit" in loaded,
+        "hanjadict": "hanjadict" in loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for entry, modules in ENTRY_POINTS.items():
+        runs = [measure(modules) for _ in range(args.repeat)]
+        if "error" in runs[0]:
+            print(f"{entry:4s}  import 실패: {runs[0]['error']}")
+            continue
+        median = statistics.median(r["total_ms"] for r in runs)
+        last = runs[-1]
+        heaviest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in last["heaviest"])
+        print(
+            f"{entry:4s}  {median:8.1f} ms  streamlit={'Y' if last['streamlit'] else 'N'}"
+            f"  hanjadict={'Y' if last['hanjadict'] else 'N'}  [{heaviest}]"
+        )
+
+
+if __name__ == "__main__":
+    main()
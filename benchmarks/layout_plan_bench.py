@@ -0,0 +1,77 @@
+"""
+레이아웃 계획 단계 벤치마크
+
+합성 코퍼스(benchmarks/corpus.py)로 레이아웃 계획과 PDF 출력을 따로 측정합니다.
+- plan (cold):   LayoutPlanner.build_plan — 캐시 없이 계획 계산 (훈음 조회, 글자 폭 측정, 줄바꿈 포함)
+- plan (cached): LayoutPlanner.plan_passage — 같은 구절을 다시 요청할 때 (캐시 적중)
+- emit:          AnalectsTracingPDF.emit_plan — 미리 만든 계획을 fpdf 호출로 옮기기
+- serialize:     plan_to_dict + json.dumps / json.loads + plan_from_dict 왕복
+
+사용법:
+    python benchmarks/layout_plan_bench.py --font fonts/NotoSerifCJKkr-Regular.otf
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from corpus import corpus_passages  # noqa: E402
+from layout_plan import clear_plan_cache, plan_from_dict, plan_to_dict  # noqa: E402
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    passages = corpus_passages()
+    results = {"plan (cold)": [], "plan (cached)": [], "emit": [], "serialize": []}
+    json_bytes = 0
+    for _ in range(args.repeat):
+        clear_plan_cache()
+        generator = AnalectsTracingPDF(Config(), args.font)
+        planner = generator.planner
+
+        start = time.perf_counter()
+        plans = [planner.plan_passage(p) for p in passages]
+        results["plan (cold)"].append(_ms(start))
+
+        start = time.perf_counter()
+        for p in passages:
+            planner.plan_passage(p)
+        results["plan (cached)"].append(_ms(start))
+
+        start = time.perf_counter()
+        for plan in plans:
+            generator.emit_plan(plan)
+        results["emit"].append(_ms(start))
+
+        start = time.perf_counter()
+        raw = json.dumps([plan_to_dict(plan) for plan in plans], ensure_ascii=False)
+        restored = [plan_from_dict(d) for d in json.loads(raw)]
+        results["serialize"].append(_ms(start))
+        assert restored == plans
+        json_bytes = len(raw.encode("utf-8"))
+
+    n_items = sum(len(page) for plan in plans for page in plan.pages)
+    print(f"{len(passages)} passages, {sum(len(p.pages) for p in plans)} pages, {n_items:,} plan items, JSON {json_bytes:,} bytes")
+    for label, values in results.items():
+        median = statistics.median(values)
+        print(f"{label:14s} {median:9.1f} ms  ({median * 1000 / len(passages):7.1f} us/passage)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Pillow 미리보기(native_preview.py)와 poppler(pdftoppm) 미리보기 비교 벤치마크
+
+- first: 봇의 1단계 미리보기. poppler는 첫 구절 PDF 생성 + pdftoppm(200 DPI),
+         native는 첫 구절의 레이아웃 계획을 바로 그립니다. 둘 다 PNG 인코딩 포함.
+- view:  웹 앱의 한 화면(앞 3페이지, 100 DPI JPEG). poppler는 이미 만든 노트 PDF를 변환합니다. (PDF 생성 시간 제외)
+
+메모리는 경우마다 새 프로세스에서 잽니다. 폰트를 적재한 뒤의 최대 RSS를 기준으로 작업 중 늘어난 최대 RSS와,
+poppler는 pdftoppm 자식 프로세스의 최대 RSS를 함께 보여줍니다.
+
+사용법:
+    python benchmarks/native_preview_bench.py --font fonts/NotoSerifCJKkr-Regular.otf [--repeat 5]
+"""
+import argparse
+import json
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData  # noqa: E402
+from font_registry import warm_font  # noqa: E402
+from native_preview import render_plan_png, render_plan_previews  # noqa: E402
+from preview import PreviewConfig, render_preview_png, render_previews  # noqa: E402
+
+ORIGINAL = "子曰學而時習之不亦說乎有朋自遠方來不亦樂乎人不知而不慍不亦君子乎"
+CASES = ("first-poppler", "first-native", "view-poppler", "view-native")
+
+
+def _passages(n: int) -> list[PassageData]:
+    return [PassageData(label=f"학이 1-{i + 1}", original=ORIGINAL, interpretation="공자께서 말씀하셨다. " * 4,
+                        reading="자왈학이시습지불역열호유붕자원방래불역락호인부지이불온불역군자호")
+            for i in range(n)]
+
+
+def _child(case: str, font: str, repeat: int) -> dict:
+    """한 가지 경우를 repeat번 실행하고 시간(ms)과 RSS 증가량(KB)을 반환합니다."""
+    warm_font(font)
+    config = Config(use_compact_font=False)
+    passages = _passages(30)
+    view = PreviewConfig(dpi=100, fmt="jpeg")
+    pdf_bytes = AnalectsTracingPDF(config, font).generate_bytes(passages) if case == "view-poppler" else None
+    jobs = {
+        "first-poppler": lambda: render_preview_png(AnalectsTracingPDF(config, font).generate_bytes(passages[:1])),
+        "first-native": lambda: render_plan_png(passages[:1], config, font),
+        "view-poppler": lambda: render_previews(pdf_bytes, [1, 2, 3], view),
+        "view-native": lambda: render_plan_previews(passages, config, font, [1, 2, 3], view),
+    }
+    job = jobs[case]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        job()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "ms": statistics.median(times),
+        "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline,
+        "child_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", choices=CASES, help=argparse.SUPPRESS)  # 내부용: 자식 프로세스에서 한 경우만 실행
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+    if args.case:
+        print(json.dumps(_child(args.case, args.font, args.repeat)))
+        return
+
+    for case in CASES:
+        if case.endswith("poppler") and not shutil.which("pdftoppm"):
+            print(f"{case:<14} pdftoppm 없음, 건너뜀")
+            continue
+        output = subprocess.run(
+            [sys.executable, __file__, "--font", args.font, "--repeat", str(args.repeat), "--case", case],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        line = f"{case:<14} {result['ms']:9.1f} ms   RSS +{result['rss_kb'] / 1024:7.1f} MB"
+        if case.endswith("poppler"):
+            line += f"   pdftoppm {result['child_rss_kb'] / 1024:7.1f} MB"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
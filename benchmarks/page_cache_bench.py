@@ -0,0 +1,91 @@
+"""
+구절 단위 페이지 캐시 벤치마크
+
+여러 사용자가 인기 구절(앞쪽 구절일수록 자주 선택, Zipf 분포)을 섞어 노트를 만드는 상황을 흉내 내고
+캐시 없음 / 노트 전체 캐시(NotebookCache) / 구절 페이지 캐시(PageCache)의 적중률과
+생성 시간(구절 렌더링, pdf.output())을 비교합니다. 페이지 캐시는 렌더링 단계만 줄이며 출력 단계는 그대로입니다.
+레이아웃 계획 캐시는 노트마다 비워 각 프로세스가 처음 보는 구절을 렌더링하는 경우를 측정합니다.
+
+사용법:
+    python benchmarks/page_cache_bench.py --font fonts/NotoSerifCJKkr-Regular.otf [--notebooks 200] [--size 5]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from corpus import corpus_passages  # noqa: E402
+from font_registry import warm_font  # noqa: E402
+from layout_plan import clear_plan_cache  # noqa: E402
+from notebook_cache import PDF_NAME, NotebookCache, notebook_key  # noqa: E402
+from page_cache import PageCache  # noqa: E402
+
+
+def make_requests(n: int, size: int, seed: int) -> list[list]:
+    """노트 n개의 구절 목록. 구절 선택 확률은 순위에 반비례합니다."""
+    passages = corpus_passages()[:505]
+    weights = [1 / (rank + 1) for rank in range(len(passages))]
+    rng = random.Random(seed)
+    return [rng.choices(passages, weights, k=size) for _ in range(n)]
+
+
+def _generate(config: Config, font_path: str, passages, page_cache, times: dict) -> bytes:
+    generator = AnalectsTracingPDF(config, font_path, page_cache=page_cache)
+    start = time.perf_counter()
+    for passage in passages:
+        generator.render_passage(passage)
+    times["render"] += time.perf_counter() - start
+    start = time.perf_counter()
+    data = bytes(generator.pdf.output())
+    times["output"] += time.perf_counter() - start
+    return data
+
+
+def run(requests, config: Config, font_path: str, mode: str, root: str) -> tuple[dict, dict]:
+    notebooks = NotebookCache(root=f"{root}/notebooks", max_bytes=1 << 30)
+    pages = PageCache(root=f"{root}/pages", max_bytes=1 << 30)
+    times = {"render": 0.0, "output": 0.0}
+    start = time.perf_counter()
+    for passages in requests:
+        clear_plan_cache()
+        if mode == "notebook":
+            key = notebook_key(passages, config, font_path)
+            if notebooks.get(key, PDF_NAME) is None:
+                notebooks.put(key, PDF_NAME, _generate(config, font_path, passages, None, times))
+        else:
+            _generate(config, font_path, passages, pages if mode == "page" else None, times)
+    times["total"] = time.perf_counter() - start
+    stats = {"notebook": notebooks.stats(), "page": pages.stats()}.get(mode, {"hit_rate": 0.0})
+    return times, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--notebooks", type=int, default=200)
+    parser.add_argument("--size", type=int, default=5, help="노트 하나의 구절 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    warm_font(args.font)
+    config = Config()
+    requests = make_requests(args.notebooks, args.size, args.seed)
+    print(f"{args.notebooks} notebooks x {args.size} passages")
+    print(f"{'mode':>9s} {'total s':>8s} {'render s':>9s} {'output s':>9s} {'ms/notebook':>12s} {'hit rate':>9s}")
+    for mode in ("none", "notebook", "page"):
+        with tempfile.TemporaryDirectory() as root:
+            times, stats = run(requests, config, args.font, mode, root)
+        print(f"{mode:>9s} {times['total']:8.2f} {times['render']:9.2f} {times['output']:9.2f} "
+              f"{times['total'] * 1000 / len(requests):12.1f} {stats['hit_rate']:9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+구절 병렬 렌더링 벤치마크 (parallel_render.render_sharded)
+
+합성 코퍼스(benchmarks/corpus.py)를 한 프로세스로 렌더링한 시간과
+워커 1/2/4/8개로 나눠 렌더링한 뒤 합친 시간을 비교합니다.
+레이아웃 계획 캐시는 매 실행 전에 비워 처음 렌더링하는 경우를 측정합니다.
+프로세스 풀은 실행마다 새로 만들므로 워커 기동 비용도 포함됩니다.
+
+--verify: 합친 문서의 페이지 콘텐츠가 같은 글자 목록으로 서브셋을 미리 정한
+한 프로세스 렌더링 결과와 바이트 단위로 같은지 확인합니다.
+묶음의 첫 페이지는 색/선 굵기 설정 연산자의 위치만 다를 수 있습니다.
+(한 프로세스에서는 add_page()가 앞 페이지의 상태를 페이지 머리에 다시 쓰고,
+묶음에서는 처음 필요한 곳에서 씁니다.) 이런 페이지는 그리기 연산자마다
+적용되는 그래픽 상태가 같은지로 비교합니다.
+
+사용법:
+    python benchmarks/parallel_render_bench.py --font fonts/NotoSerifCJKkr-Regular.otf [--workers 1 2 4 8] [--verify]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from corpus import corpus_passages  # noqa: E402
+from font_registry import warm_font  # noqa: E402
+from layout_plan import clear_plan_cache  # noqa: E402
+from parallel_render import _seed_subset, merge_shards, render_shard, render_sharded, seed_characters, split_shards  # noqa: E402
+from preview import count_pages  # noqa: E402
+
+
+# 페이지 최상위에서 그래픽 상태만 바꾸는 연산자 (선 끝 모양, 굵기, 색, 점선, 폰트)
+_STATE_OP = re.compile(rb"^(?:[\d. ]+ (J|j|w|RG|rg|G|g)|\[[\d. ]*\] [\d.]+ (d)|BT /F\d+ [\d.]+ (Tf) ET)$")
+
+
+_STROKE_STATE = (b"J", b"j", b"w", b"RG", b"d")
+_FILL_STATE = (b"rg",)
+_TEXT_STATE = (b"Tf", b"rg")
+
+
+def _effective_ops(contents: bytes) -> list[tuple]:
+    """상태 연산자를 빼고, 나머지 연산자마다 그 연산자가 쓰는 그래픽 상태를 붙입니다."""
+    state: dict[bytes, bytes] = {}
+    ops = []
+    for line in contents.split(b"\n"):
+        m = _STATE_OP.match(line)
+        if m:
+            key = next(g for g in m.groups() if g)
+            state[{b"G": b"RG", b"g": b"rg"}.get(key, key)] = line
+            continue
+        if b" Tj" in line:
+            keys = _TEXT_STATE
+        elif line.endswith((b" S", b" s", b" B", b" b")):
+            keys = _STROKE_STATE + _FILL_STATE
+        elif line.endswith((b" f", b" F")):
+            keys = _FILL_STATE
+        else:
+            keys = ()
+        ops.append((tuple(state.get(k) for k in keys), line))
+    return ops
+
+
+def _time(fn, repeat: int) -> tuple[float, bytes]:
+    values = []
+    result = b""
+    for _ in range(repeat):
+        clear_plan_cache()
+        start = time.perf_counter()
+        result = fn()
+        values.append((time.perf_counter() - start) * 1000)
+    return statistics.median(values), result
+
+
+def verify(passages, config: Config, font_path: str, n_shards: int) -> bool:
+    """병합 결과와 한 프로세스 렌더링 결과의 페이지 콘텐츠를 비교합니다. (같은 프로세스에서 실행)"""
+    seed = seed_characters(passages, config)
+
+    serial = AnalectsTracingPDF(config, font_path)
+    _seed_subset(serial, seed)
+    for passage in passages:
+        serial.render_passage(passage)
+
+    merged = AnalectsTracingPDF(config, font_path)
+    _seed_subset(merged, seed)
+    shards = [render_shard(chunk, config, font_path, seed) for chunk in split_shards(passages, n_shards)]
+    merge_shards(merged, shards)
+
+    a = [bytes(p.contents) for _, p in sorted(serial.pdf.pages.items())]
+    b = [bytes(p.contents) for _, p in sorted(merged.pdf.pages.items())]
+    if len(a) != len(b):
+        print(f"verify ({n_shards} shards): 페이지 수가 다릅니다 ({len(a)} vs {len(b)})")
+        return False
+    identical = sum(x == y for x, y in zip(a, b))
+    equivalent = sum(x != y and _effective_ops(x) == _effective_ops(y) for x, y in zip(a, b))
+    different = len(a) - identical - equivalent
+    print(f"verify ({n_shards} shards): {len(a)} pages, identical {identical}, "
+          f"same drawing state {equivalent}, different {different}")
+    return different == 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120, 508], help="렌더링할 구절 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--verify", action="store_true")
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    config = Config()
+    corpus = corpus_passages()
+    warm_font(args.font)
+    print(f"cpu_count: {os.cpu_count()}")
+
+    if args.verify and not all(verify(corpus[:120], config, args.font, n) for n in (2, 4)):
+        sys.exit(1)
+
+    print(f"{'passages':>8s} {'mode':>10s} {'ms':>9s} {'speedup':>8s} {'pages':>6s} {'bytes':>11s}")
+    for size in args.sizes:
+        passages = (corpus * (size // len(corpus) + 1))[:size]
+        base_ms, data = _time(lambda: AnalectsTracingPDF(config, args.font).generate_bytes(passages), args.repeat)
+        print(f"{size:8d} {'serial':>10s} {base_ms:9.1f} {1.0:7.2f}x {count_pages(data):6d} {len(data):11,d}")
+        for workers in args.workers:
+            ms, data = _time(lambda: render_sharded(passages, config, args.font, workers=workers), args.repeat)
+            print(f"{size:8d} {f'{workers} workers':>10s} {ms:9.1f} {base_ms / ms:7.2f}x "
+                  f"{count_pages(data):6d} {len(data):11,d}")
+
+
+if __name__ == "__main__":
+    main()
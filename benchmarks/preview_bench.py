@@ -0,0 +1,78 @@
+"""
+미리보기 래스터화 벤치마크
+
+- before: 모든 페이지를 pdftoppm 기본 해상도(200 DPI)로 변환해 PIL 이미지로 보관 (기존 convert_from_path 방식)
+- after:  보이는 페이지만 썸네일(저해상도) → 미리보기 DPI 순서로 변환, pdftoppm 병렬 실행, JPEG/WebP 인코딩
+
+측정 항목: 첫 이미지까지 걸린 시간, 전체 시간, 이미지 바이트 크기
+
+사용법:
+    python benchmarks/preview_bench.py --font fonts/NotoSerifCJKkr-Regular.otf --passages 30
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData  # noqa: E402
+from preview import DEFAULT_DPI, PreviewConfig, count_pages, rasterize_pages, render_previews  # noqa: E402
+
+ORIGINAL = "子曰學而時習之不亦說乎有朋自遠方來不亦樂乎"
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--passages", type=int, default=30)
+    parser.add_argument("--view", type=int, default=3, help="한 화면에 보이는 페이지 수")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    passages = [PassageData(label=f"학이 1-{i + 1}", original=ORIGINAL, interpretation="공자께서 말씀하셨다.")
+                for i in range(args.passages)]
+    pdf_bytes = AnalectsTracingPDF(Config(), args.font).generate_bytes(passages)
+    n_pages = count_pages(pdf_bytes)
+    print(f"{args.passages} passages, {n_pages} pages")
+
+    # before: 전 페이지, 기본 DPI, 단일 프로세스
+    start = time.perf_counter()
+    images = rasterize_pages(pdf_bytes, dpi=DEFAULT_DPI)
+    before_ms = _ms(start)
+    before_mem = sum(img.width * img.height * 3 for img in images.values())
+    print(f"before  all pages @ {DEFAULT_DPI} dpi       total {before_ms:9.1f} ms   "
+          f"decoded {before_mem / 1e6:8.1f} MB")
+
+    pages = list(range(1, min(n_pages, args.view) + 1))
+    for fmt in ("jpeg", "webp"):
+        cfg = PreviewConfig(dpi=args.dpi, fmt=fmt, threads=args.threads)
+        start = time.perf_counter()
+        thumbs = render_previews(pdf_bytes, pages, cfg, thumbnail=True)
+        first_ms = _ms(start)
+        previews = render_previews(pdf_bytes, pages, cfg)
+        total_ms = _ms(start)
+        size = sum(len(b) for b in previews.values()) + sum(len(b) for b in thumbs.values())
+        print(f"after   {len(pages)} pages @ {args.dpi} dpi {fmt:<5}  first {first_ms:9.1f} ms   "
+              f"total {total_ms:9.1f} ms   encoded {size / 1e3:8.1f} KB")
+
+    start = time.perf_counter()
+    rasterize_pages(pdf_bytes, dpi=args.dpi, threads=1)
+    serial_ms = _ms(start)
+    start = time.perf_counter()
+    rasterize_pages(pdf_bytes, dpi=args.dpi, threads=args.threads)
+    parallel_ms = _ms(start)
+    print(f"all pages @ {args.dpi} dpi: 1 process {serial_ms:9.1f} ms, "
+          f"{args.threads} processes {parallel_ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
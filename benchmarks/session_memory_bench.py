@@ -0,0 +1,106 @@
+"""
+웹 앱 세션당 상주 메모리(RSS) 벤치마크: 세션 상태에 담는 미리보기/PDF
+
+- before: 예전 웹 앱. 세션마다 노트 PDF 바이트와, 모든 페이지를 디코딩한 PIL 이미지 목록
+          (convert_from_path 결과, 100 DPI)을 st.session_state에 들고 있습니다.
+- after:  세션마다 SessionStore에 본 페이지의 압축 이미지 바이트(100 DPI JPEG)만 담고,
+          한도(SESSION_PREVIEW_MAX_MB)를 넘으면 오래된 페이지부터 지웁니다. PDF는 노트 캐시(디스크)에서 읽습니다.
+
+경우마다 새 프로세스에서 페이지를 한 번 그린 뒤, 세션 수만큼 사본을 만들고 늘어난 현재 RSS를 잽니다.
+(poppler 없이 비교하도록 디코딩된 페이지는 레이아웃 계획을 Pillow로 그린 이미지를 씁니다. 크기는 pdftoppm 결과와 같음)
+
+사용법:
+    python benchmarks/session_memory_bench.py --font fonts/NotoSerifCJKkr-Regular.otf [--sessions 20] [--passages 30]
+"""
+import argparse
+import gc
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData  # noqa: E402
+from font_registry import warm_font  # noqa: E402
+from native_preview import rasterize_plan_pages  # noqa: E402
+from preview import PreviewConfig, encode_image  # noqa: E402
+from session_store import SessionStore, memory_report, process_rss_bytes  # noqa: E402
+
+ORIGINAL = "子曰學而時習之不亦說乎有朋自遠方來不亦樂乎人不知而不慍不亦君子乎"
+CASES = ("before", "after")
+
+
+def _passages(n: int) -> list[PassageData]:
+    return [PassageData(label=f"학이 1-{i + 1}", original=ORIGINAL, interpretation="공자께서 말씀하셨다. " * 4,
+                        reading="자왈학이시습지불역열호유붕자원방래불역락호인부지이불온불역군자호")
+            for i in range(n)]
+
+
+def _child(case: str, font: str, n_sessions: int, n_passages: int) -> dict:
+    warm_font(font)
+    config = Config(use_compact_font=False)
+    passages = _passages(n_passages)
+    view = PreviewConfig(dpi=100, fmt="jpeg")
+    pdf_bytes = AnalectsTracingPDF(config, font).generate_bytes(passages)
+    images = rasterize_plan_pages(passages, config, font, None, view.dpi)
+    encoded = {page: encode_image(image, view.fmt, view.quality) for page, image in images.items()}
+    if case == "after":
+        del images
+    gc.collect()
+
+    baseline = process_rss_bytes()
+    sessions = []
+    for _ in range(n_sessions):
+        if case == "before":
+            sessions.append({
+                "pdf_data": bytes(bytearray(pdf_bytes)),
+                "preview_images": [image.copy() for image in images.values()],
+            })
+        else:
+            store = SessionStore()
+            for page, data in encoded.items():  # 사용자가 모든 페이지를 넘겨 본 경우
+                store.put((page, view.dpi), bytes(bytearray(data)))
+            sessions.append({"preview_images": store})
+    gc.collect()
+    grown = process_rss_bytes() - baseline
+    return {
+        "pages": len(encoded),
+        "pdf_kb": len(pdf_bytes) / 1024,
+        "per_session_mb": grown / n_sessions / 2**20,
+        "store_bytes": memory_report()["bytes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--passages", type=int, default=30)
+    parser.add_argument("--case", choices=CASES, help=argparse.SUPPRESS)  # 내부용: 자식 프로세스에서 한 경우만 실행
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+    if process_rss_bytes() is None:
+        print("/proc/self/statm을 읽을 수 없어 RSS를 잴 수 없습니다.")
+        sys.exit(1)
+    if args.case:
+        print(json.dumps(_child(args.case, args.font, args.sessions, args.passages)))
+        return
+
+    for case in CASES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--font", args.font, "--sessions", str(args.sessions),
+             "--passages", str(args.passages), "--case", case],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        line = f"{case:<7} {result['pages']}페이지, PDF {result['pdf_kb']:.0f} KB   세션당 RSS +{result['per_session_mb']:6.2f} MB"
+        if case == "after":
+            line += f"   (저장소 합계 {result['store_bytes'] / 2**20:.1f} MB / {args.sessions}세션)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
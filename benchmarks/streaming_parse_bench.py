@@ -0,0 +1,76 @@
+"""
+스트리밍 파서 벤치마크 (파싱 단계 최대 메모리)
+
+합성 코퍼스를 --scale배 늘린 입력 파일을 만들어 두 방식을 비교합니다.
+- list:   read_text() + parse_text_input() → 전체 텍스트, 줄 목록, 모든 PassageData를 동시에 보관
+- stream: iter_passages(파일 객체) → 한 줄씩 읽고 구절을 하나씩 소비 (렌더러가 받는 방식)
+
+측정 항목: tracemalloc 최대 메모리, 전체 시간, 첫 구절까지 걸린 시간
+
+사용법:
+    python benchmarks/streaming_parse_bench.py [--scales 1 4 16]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analects_tracing import iter_passages, parse_text_input  # noqa: E402
+from corpus import corpus_text  # noqa: E402
+
+
+def _measure(fn) -> tuple[float, float, float]:
+    """(최대 메모리 MB, 전체 ms, 첫 구절까지 ms)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_ms = fn(start)
+    total_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, total_ms, first_ms
+
+
+def run_list(path: Path):
+    def fn(start):
+        passages = parse_text_input(path.read_text(encoding="utf-8"))
+        first_ms = (time.perf_counter() - start) * 1000
+        for _ in passages:
+            pass
+        return first_ms
+    return _measure(fn)
+
+
+def run_stream(path: Path):
+    def fn(start):
+        first_ms = None
+        with open(path, encoding="utf-8") as f:
+            for _ in iter_passages(f):
+                if first_ms is None:
+                    first_ms = (time.perf_counter() - start) * 1000
+        return first_ms
+    return _measure(fn)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    base = corpus_text()
+    print(f"{'scale':>5s} {'input':>9s} {'mode':>6s} {'peak MB':>8s} {'total ms':>9s} {'first ms':>9s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            path = Path(tmp) / f"corpus_x{scale}.txt"
+            path.write_text(base * scale, encoding="utf-8")
+            size_mb = path.stat().st_size / 1024 / 1024
+            for mode, fn in (("list", run_list), ("stream", run_stream)):
+                peak, total, first = fn(path)
+                print(f"{scale:5d} {size_mb:7.1f}MB {mode:>6s} {peak:8.2f} {total:9.1f} {first:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+단계별 성능 벤치마크 모음
+
+합성 코퍼스(benchmarks/corpus.py: 논어 20편 505구절 + 긴 구절 경계 사례)로
+각 단계를 따로 측정하고 결과를 JSON으로 저장합니다. 저장해 둔 기준(baseline)과 비교해
+느려진 단계를 표시하고, 회귀가 있으면 종료 코드 1로 끝납니다.
+
+측정 단계:
+    parse                  parse_text_input (코퍼스 전체)
+    meaning_lookup         get_hanja_meaning (코퍼스의 모든 글자, 글자 단위 호출)
+    meaning_lookup_batch   get_hanja_meanings (구절 단위 호출)
+    row.original           LayoutPlanner.original_row (훈음 조회 포함, 레이아웃 계획만)
+    row.ghost              LayoutPlanner.ghost_row
+    row.practice           LayoutPlanner.practice_row
+    row.interp             LayoutPlanner.interp_practice
+    emit                   AnalectsTracingPDF.emit_plan (계획 → fpdf 호출)
+    output                 pdf.output()
+    rasterize              preview.rasterize_pages (앞쪽 --raster-pages 페이지, pdftoppm 필요)
+
+사용법:
+    # 기준 저장
+    python benchmarks/suite.py --font fonts/NotoSerifCJKkr-Regular.otf --output benchmarks/baseline.json
+    # 변경 후 비교 (중앙값이 기준보다 15% 이상 느리면 회귀)
+    python benchmarks/suite.py --font fonts/NotoSerifCJKkr-Regular.otf --compare benchmarks/baseline.json
+"""
+import argparse
+import functools
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fpdf  # noqa: E402
+
+from analects_tracing import AnalectsTracingPDF, Config, _extract_hangul, parse_text_input  # noqa: E402
+from corpus import corpus_text  # noqa: E402
+from font_registry import get_font_registry, warm_font  # noqa: E402
+from hanja_dictionary import get_hanja_meaning, get_hanja_meanings  # noqa: E402
+from layout_plan import clear_plan_cache  # noqa: E402
+from preview import DEFAULT_DPI, count_pages, rasterize_pages  # noqa: E402
+
+ROW_RENDERERS = {
+    "row.original": "original_row",
+    "row.ghost": "ghost_row",
+    "row.practice": "practice_row",
+    "row.interp": "interp_practice",
+}
+
+
+def _sounds(passage) -> list:
+    sounds = list(_extract_hangul(passage.reading))
+    return sounds if len(sounds) == len(passage.original) else [None] * len(passage.original)
+
+
+def _instrument(generator: AnalectsTracingPDF, totals: dict) -> None:
+    """생성기 인스턴스의 행 레이아웃 계산과 출력 메서드를 감싸 단계별 누적 시간을 기록합니다."""
+    targets = [(stage, generator.planner, name) for stage, name in ROW_RENDERERS.items()]
+    targets.append(("emit", generator, "emit_plan"))
+    for stage, owner, method_name in targets:
+        method = getattr(owner, method_name)
+
+        @functools.wraps(method)
+        def timed(*args, _method=method, _stage=stage, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                totals[_stage] += time.perf_counter() - start
+
+        setattr(owner, method_name, timed)
+
+
+def run_once(text: str, font_path: str, raster_pages: int, dpi: int) -> tuple[dict, dict]:
+    """모든 단계를 한 번 실행해 {단계: 초}와 부가 정보를 반환합니다."""
+    times = defaultdict(float)
+    clear_plan_cache()  # 매 실행마다 레이아웃을 새로 계산
+
+    start = time.perf_counter()
+    passages = parse_text_input(text)
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for passage in passages:
+        for ch, sound in zip(passage.original, _sounds(passage)):
+            get_hanja_meaning(ch, sound)
+    times["meaning_lookup"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for passage in passages:
+        get_hanja_meanings(list(passage.original), _sounds(passage))
+    times["meaning_lookup_batch"] = time.perf_counter() - start
+
+    generator = AnalectsTracingPDF(Config(), font_path)
+    _instrument(generator, times)
+    for passage in passages:
+        generator.render_passage(passage)
+
+    start = time.perf_counter()
+    pdf_bytes = bytes(generator.pdf.output())
+    times["output"] = time.perf_counter() - start
+
+    info = {
+        "passages": len(passages),
+        "chars": sum(len(p.original) for p in passages),
+        "pages": count_pages(pdf_bytes),
+        "pdf_bytes": len(pdf_bytes),
+    }
+
+    if raster_pages:
+        try:
+            start = time.perf_counter()
+            rasterize_pages(pdf_bytes, range(1, raster_pages + 1), dpi=dpi)
+            times["rasterize"] = time.perf_counter() - start
+        except (OSError, RuntimeError) as e:
+            info["rasterize_error"] = str(e)
+    return dict(times), info
+
+
+def run_suite(font_path: str, repeat: int, raster_pages: int, dpi: int, seed: int) -> dict:
+    text = corpus_text(seed)
+    warm_font(font_path)
+    runs = []
+    info = {}
+    for _ in range(repeat):
+        times, info = run_once(text, font_path, raster_pages, dpi)
+        runs.append(times)
+
+    stages = {}
+    for stage in runs[0]:
+        values = [run[stage] * 1000 for run in runs if stage in run]
+        stages[stage] = {
+            "median_ms": round(statistics.median(values), 3),
+            "min_ms": round(min(values), 3),
+            "max_ms": round(max(values), 3),
+            "runs": len(values),
+        }
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fpdf2": fpdf.__version__,
+            "font": Path(font_path).name,
+            "font_digest": get_font_registry().digest(font_path)[:16],
+            "seed": seed,
+            "repeat": repeat,
+            "raster_pages": raster_pages,
+            "dpi": dpi,
+            **info,
+        },
+        "stages": stages,
+    }
+
+
+def compare(result: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """기준보다 느려진 단계 이름 목록을 반환하고 비교 표를 출력합니다."""
+    regressions = []
+    print(f"{'stage':22s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for stage, current in result["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if base is None:
+            print(f"{stage:22s} {'-':>10s} {current['median_ms']:10.1f} {'new':>8s}")
+            continue
+        ratio = current["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        delta = current["median_ms"] - base["median_ms"]
+        regressed = ratio > 1 + threshold and delta > min_delta_ms
+        mark = "  REGRESSION" if regressed else ""
+        print(f"{stage:22s} {base['median_ms']:10.1f} {current['median_ms']:10.1f} {ratio - 1:+8.1%}{mark}")
+        if regressed:
+            regressions.append(stage)
+    for key in ("font_digest", "fpdf2", "passages", "raster_pages", "dpi"):
+        if baseline.get("meta", {}).get(key) != result["meta"].get(key):
+            print(f"주의: 기준과 {key} 값이 다릅니다 ({baseline.get('meta', {}).get(key)} → {result['meta'].get(key)})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--font", default="fonts/NotoSerifCJKkr-Regular.otf")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--raster-pages", type=int, default=20, help="래스터화할 앞쪽 페이지 수 (0이면 생략)")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 기준 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.15, help="회귀로 판단할 중앙값 증가율")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="이보다 작은 차이는 잡음으로 무시")
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    result = run_suite(args.font, args.repeat, args.raster_pages, args.dpi, args.seed)
+    meta = result["meta"]
+    print(f"corpus: {meta['passages']} passages, {meta['chars']:,} chars → {meta['pages']} pages, {meta['pdf_bytes']:,} bytes")
+    if "rasterize_error" in meta:
+        print(f"rasterize 생략: {meta['rasterize_error']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"결과 저장: {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"회귀 {len(regressions)}건: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        for stage, stats in result["stages"].items():
+            print(f"{stage:22s} {stats['median_ms']:10.1f} ms (min {stats['min_ms']:.1f}, max {stats['max_ms']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
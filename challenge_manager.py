@@ -1,110 +1,60 @@
 """
 챌린지 데이터 관리 및 Git 동기화 모듈 (출석 중심)
 """
-import json
-import os
-import subprocess
 from datetime import datetime
-import streamlit as st
 
-DB_FILE = "challenge_db.json"
+from attendance_store import AttendanceStore, migrate_json
+from git_sync import get_sync_worker
 
-def _init_db():
-    """DB 파일이 없으면 초기화"""
-    if not os.path.exists(DB_FILE):
-        with open(DB_FILE, "w", encoding="utf-8") as f:
-            json.dump({"logs": []}, f, ensure_ascii=False, indent=4)
+# 출석 기록: 추가 전용 로그 (attendance_store.py 참고)
+DB_FILE = "challenge_log.jsonl"
+# 이전 형식의 전체 JSON DB. 로그 파일이 없으면 처음 사용할 때 한 번 옮겨 옵니다.
+LEGACY_DB_FILE = "challenge_db.json"
 
-@st.cache_data
-def load_logs():
-    """로그 데이터를 불러옵니다."""
-    _init_db()
-    try:
-        with open(DB_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"logs": []}
+_store = None
+
+def _get_store() -> AttendanceStore:
+    """프로세스 전역 출석 저장소 (처음 호출 시 JSON DB 마이그레이션)"""
+    global _store
+    if _store is None:
+        migrated = migrate_json(LEGACY_DB_FILE, DB_FILE)
+        if migrated is not None:
+            print(f"출석 기록 {migrated}건을 {LEGACY_DB_FILE}에서 {DB_FILE}로 옮겼습니다.")
+        _store = AttendanceStore(DB_FILE)
+    return _store
 
 def add_log(name: str):
     """
-    새로운 출석 기록을 추가하고 GitHub에 동기화합니다.
+    새로운 출석 기록을 추가하고 GitHub 동기화를 예약합니다.
+    로컬 기록이 끝나면 바로 반환하며, 커밋/푸시는 백그라운드 작업자(git_sync.py)가 묶어서 처리합니다.
     """
     if not name:
         return
 
-    # 1. 최신 상태 Pull
-    try:
-        subprocess.run(["git", "pull", "origin", "master", "--rebase"], check=False)
-    except Exception as e:
-        print(f"Git pull warning: {e}")
-
-    # 2. 데이터 로드 (캐시되지 않은 원본 읽기)
-    _init_db()
-    try:
-        with open(DB_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except:
-        data = {"logs": []}
-    
     today = datetime.now().strftime("%Y-%m-%d")
-    
-    # 중복 출석 방지 (하루에 한 번만 기록)
-    already_checked = any(log["name"] == name and log["date"] == today for log in data["logs"])
-    if already_checked:
-        return False # 이미 출석함
-
     new_entry = {
         "name": name,
         "date": today,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
-    
-    data["logs"].append(new_entry)
 
-    # 3. 파일 저장
-    with open(DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-    
-    # 4. 캐시 초기화
-    st.cache_data.clear()
+    # 1. 중복 출석 방지 (하루에 한 번만 기록) + 로그 끝에 한 줄 추가
+    # 저장소가 (동기화 작업자의) pull로 바뀐 부분만 다시 읽으므로 전체 파일을 읽거나 다시 쓰지 않습니다.
+    # 통계와 순위도 저장소의 색인에서 바로 계산하므로 따로 비울 캐시가 없습니다.
+    if not _get_store().append(new_entry):
+        return False # 이미 출석함
 
-    # 5. GitHub Push
-    try:
-        subprocess.run(["git", "add", DB_FILE], check=True)
-        subprocess.run(["git", "commit", "-m", f"chore: add attendance log for {name}"], check=True)
-        subprocess.run(["git", "push", "origin", "master"], check=True)
-        return True
-    except Exception as e:
-        print(f"Git sync failed: {e}")
-        return False
+    # 2. GitHub 동기화 예약
+    get_sync_worker().enqueue([DB_FILE], f"chore: add attendance log for {name}")
+    return True
 
-@st.cache_data
 def get_user_stats(name: str):
     """특정 사용자의 출석 일수를 반환합니다."""
-    data = load_logs()
-    user_logs = [log for log in data["logs"] if log["name"] == name]
-    total_days = len(set(log["date"] for log in user_logs))
-    return total_days
+    return _get_store().user_days(name)
 
-@st.cache_data
 def get_leaderboard():
     """전체 출석 순위를 반환합니다."""
-    data = load_logs()
-    stats = {}
-    
-    for log in data["logs"]:
-        name = log["name"]
-        if name not in stats:
-            stats[name] = set()
-        stats[name].add(log["date"])
-        
-    # 리스트로 변환
-    leaderboard = []
-    for name, days in stats.items():
-        leaderboard.append({
-            "이름": name,
-            "출석 일수": len(days)
-        })
-    
-    # 출석 일수 순으로 정렬
-    return sorted(leaderboard, key=lambda x: x["출석 일수"], reverse=True)
\ No newline at end of file
+    return [
+        {"이름": name, "출석 일수": days}
+        for name, days in _get_store().leaderboard()
+    ]
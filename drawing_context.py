@@ -0,0 +1,97 @@
+"""
+그래픽 상태를 기억하는 그리기 계층 모듈
+
+fpdf2의 set_draw_color() 등은 값이 같아도 매번 색 변환과 비교를 거치고, text()는 글자색과
+채움색이 다르면 글자마다 `q <색> rg BT ... ET Q`로 감쌉니다. 필사 노트는 같은 크기·색의 글자와
+같은 선 스타일의 격자를 수백 번 반복해서 그리므로, 이 계층이 마지막으로 적용한 상태를 기억해 두고
+바뀐 것만 fpdf에 넘깁니다.
+
+- 글자색을 바꿀 때 채움색도 같은 색으로 맞춥니다. (노트에는 채운 도형이 없음)
+  text()/cell()이 글자마다 색을 감싸지 않고, 색이 바뀔 때만 `rg` 한 번을 씁니다.
+- 페이지가 바뀌어도 기억한 상태는 그대로 유효합니다. fpdf의 add_page()가 현재 상태를 새 페이지에 다시 씁니다.
+- 상태는 이 계층을 거쳐서만 바꿔야 합니다. fpdf 문서의 상태를 직접 바꿨다면 reset()을 호출합니다.
+"""
+from typing import Optional
+
+from fpdf import FPDF
+
+
+class DrawingContext:
+    """fpdf 문서의 글꼴, 색, 선 스타일을 기억해 바뀌지 않는 설정 호출을 건너뜁니다."""
+
+    def __init__(self, pdf: FPDF):
+        self.pdf = pdf
+        self.applied = 0  # fpdf에 넘긴 상태 변경 수
+        self.skipped = 0  # 이미 같은 상태라서 건너뛴 호출 수
+        self.reset()
+
+    def reset(self) -> None:
+        """기억한 상태를 버립니다. 다음 설정 호출은 모두 fpdf에 전달됩니다."""
+        self._font: Optional[tuple] = None
+        self._color: Optional[tuple] = None
+        self._draw_color: Optional[tuple] = None
+        self._line_width: Optional[float] = None
+        self._dash: Optional[tuple] = None
+
+    # ----- State -----
+
+    def font(self, family: str, size: float) -> None:
+        key = (family, size)
+        if key == self._font:
+            self.skipped += 1
+            return
+        self.pdf.set_font(family, "", size)
+        self._font = key
+        self.applied += 1
+
+    def color(self, color: tuple) -> None:
+        """글자색(과 채움색)"""
+        if color == self._color:
+            self.skipped += 1
+            return
+        self.pdf.set_text_color(*color)
+        self.pdf.set_fill_color(*color)
+        self._color = color
+        self.applied += 1
+
+    def stroke(self, color: tuple, width: float, dash: float = 0, gap: float = 0) -> None:
+        """선 색, 굵기, 점선 패턴 (dash=0이면 실선)"""
+        if color != self._draw_color:
+            self.pdf.set_draw_color(*color)
+            self._draw_color = color
+            self.applied += 1
+        else:
+            self.skipped += 1
+        if width != self._line_width:
+            self.pdf.set_line_width(width)
+            self._line_width = width
+            self.applied += 1
+        else:
+            self.skipped += 1
+        pattern = (dash, gap)
+        if pattern != self._dash:
+            self.pdf.set_dash_pattern(dash=dash, gap=gap)
+            self._dash = pattern
+            self.applied += 1
+        else:
+            self.skipped += 1
+
+    # ----- Drawing -----
+
+    def text(self, x: float, y: float, text: str, family: str, size: float, color: tuple) -> None:
+        self.font(family, size)
+        self.color(color)
+        self.pdf.text(x, y, text)
+
+    def cell(self, x: float, y: float, w: float, h: float, text: str, family: str, size: float, color: tuple) -> None:
+        """(x, y)에서 시작하는 한 줄 텍스트 칸 (왼쪽 정렬, 테두리 없음)"""
+        self.font(family, size)
+        self.color(color)
+        self.pdf.set_xy(x, y)
+        self.pdf.cell(w, h, text, border=0, align="L")
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        self.pdf.line(x1, y1, x2, y2)
+
+    def rect(self, x: float, y: float, w: float, h: float) -> None:
+        self.pdf.rect(x, y, w, h)
@@ -0,0 +1,172 @@
+"""
+프로세스 전역 폰트 레지스트리 모듈
+
+수 MB 크기의 CJK 폰트를 프로세스당 한 번만 파싱하고,
+새로 만들어지는 FPDF 문서에는 파싱 결과(cmap, 글자 폭 표 등)를 공유해 등록합니다.
+
+문서별 폰트는 fpdf2의 비공개 구조(`TTFFont.__slots__`, `SubsetMap`)를 복제해 만들므로
+requirements.txt의 fpdf2 버전 범위(2.8.6 이상 2.9 미만)에 맞춰져 있습니다. 복제할 속성이
+빠져 있으면 공유하지 않고 `FPDF.add_font()`로 폰트를 등록합니다.
+"""
+import copy
+import hashlib
+import threading
+from io import BytesIO
+from pathlib import Path
+
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.enums import TextEmphasis
+from fpdf.fonts import SubsetMap, TTFFont
+
+# add_font()의 인자로만 정해지는 슬롯 (템플릿에는 값이 없을 수 있음)
+_OPTIONAL_SLOTS = frozenset({"unicode_range"})
+
+
+class _ParsedFont:
+    """한 번 파싱된 폰트 파일 (원본 바이트 + 템플릿 TTFFont)"""
+
+    def __init__(self, font_path: Path):
+        self.path = font_path
+        self.data = font_path.read_bytes()
+        # 템플릿 생성용 임시 문서 (fonts 개수와 color font 설정만 참조됨)
+        self.template = TTFFont(FPDF(), font_path, "template", "")
+        self.shareable = self._check_shareable()
+        self.digest = hashlib.sha256(self.data).hexdigest()
+
+    def _check_shareable(self) -> bool:
+        """
+        .notdef 글리프가 없는 TrueType 폰트는 fpdf2가 파싱 중 글리프를 보충하므로
+        원본 바이트만으로 복제할 수 없습니다. 이 경우 공유하지 않습니다.
+        """
+        if self.missing_slots():
+            return False
+        if self.template.color_font is not None:
+            return False
+        ttfont = self.open_ttfont()
+        try:
+            return "glyf" not in ttfont or ".notdef" in ttfont.getGlyphOrder()
+        finally:
+            ttfont.close()
+
+    def missing_slots(self) -> list[str]:
+        """
+        템플릿에서 복제할 수 없는 속성 목록. fpdf2 버전마다 TTFFont의 슬롯이 달라지므로
+        값이 없는 슬롯이나 슬롯 밖에 둔 속성이 있으면 복제본이 반쯤 만들어진 채로 남습니다.
+        """
+        slots = getattr(TTFFont, "__slots__", ())
+        missing = [
+            slot for slot in slots
+            if slot not in _OPTIONAL_SLOTS and not hasattr(self.template, slot)
+        ]
+        missing += [name for name in getattr(self.template, "__dict__", {}) if name not in slots]
+        if not slots:
+            missing.append("__slots__")
+        return missing
+
+    def open_ttfont(self) -> ttLib.TTFont:
+        """메모리 상의 원본 바이트로부터 lazy TTFont를 새로 엽니다 (디스크 I/O 없음)."""
+        return ttLib.TTFont(
+            BytesIO(self.data),
+            recalcTimestamp=False,
+            fontNumber=self.template.collection_font_number,
+            lazy=True,
+        )
+
+
+class FontRegistry:
+    """폰트 파일 경로별로 파싱 결과를 보관하는 스레드 안전 레지스트리"""
+
+    def __init__(self):
+        self._fonts: dict[Path, _ParsedFont] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, font_path: str) -> None:
+        """폰트를 미리 파싱해 둡니다. 서버 시작 시 호출합니다."""
+        self._get(font_path)
+
+    def digest(self, font_path: str) -> str:
+        """폰트 파일 내용의 SHA-256 (캐시 키에 사용)"""
+        return self._get(font_path).digest
+
+    def cmap(self, font_path: str) -> dict[int, str]:
+        """폰트가 가진 글자의 코드 포인트 → 글리프 이름 (읽기 전용)"""
+        return self._get(font_path).template.cmap
+
+    def is_warm(self, font_path: str) -> bool:
+        return Path(font_path).resolve() in self._fonts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fonts.clear()
+
+    def _get(self, font_path: str) -> _ParsedFont:
+        key = Path(font_path).resolve()
+        parsed = self._fonts.get(key)
+        if parsed is None:
+            with self._lock:
+                parsed = self._fonts.get(key)
+                if parsed is None:
+                    parsed = _ParsedFont(key)
+                    self._fonts[key] = parsed
+        return parsed
+
+    def add_font(self, pdf: FPDF, family: str, style: str, font_path: str) -> None:
+        """
+        `FPDF.add_font()`와 같은 역할을 하되, 파싱된 폰트를 재사용합니다.
+        문서마다 달라지는 상태(subset, 누락 글리프, 서브셋 대상 TTFont)만 새로 만듭니다.
+        """
+        parsed = self._get(font_path)
+        if not parsed.shareable:
+            pdf.add_font(family, style, font_path)
+            return
+
+        style = "".join(sorted(style.upper()))
+        fontkey = f"{family.lower()}{style}"
+        if fontkey in pdf.fonts:
+            return
+
+        template = parsed.template
+        font = TTFFont.__new__(TTFFont)
+        # 읽기 전용 속성(cmap, cw, glyph_ids, desc 등)은 템플릿과 공유
+        for slot in TTFFont.__slots__:
+            if hasattr(template, slot):
+                setattr(font, slot, getattr(template, slot))
+        font.i = len(pdf.fonts) + 1
+        font.fontkey = fontkey
+        font.emphasis = TextEmphasis.coerce(style)
+        font.biggest_size_pt = 0
+        font.missing_glyphs = []
+        font._hbfont = None
+        # FontDescriptor는 출력 시 객체 번호와 FontFile 참조가 기록되므로 문서별로 복사
+        font.desc = copy.copy(template.desc)
+        # pdf.output()이 서브셋 과정에서 ttfont를 직접 수정하므로 문서마다 새로 엽니다.
+        font.ttfont = parsed.open_ttfont()
+        font.subset = SubsetMap(font)
+        if any(slot not in _OPTIONAL_SLOTS and not hasattr(font, slot) for slot in TTFFont.__slots__):
+            # 슬롯 구성이 예상과 다르면 반쯤 만든 복제본 대신 fpdf2의 등록 경로를 씁니다.
+            font.ttfont.close()
+            pdf.add_font(family, style, font_path)
+            return
+
+        pdf.fonts[fontkey] = font
+        if font.is_cff and font.is_cid_keyed:
+            pdf._set_min_pdf_version("1.6")
+
+
+_registry = FontRegistry()
+
+
+def get_font_registry() -> FontRegistry:
+    """프로세스 전역 레지스트리를 반환합니다."""
+    return _registry
+
+
+def warm_font(font_path: str) -> None:
+    """프로세스 전역 레지스트리에 폰트(와 미리 빌드한 축소 폰트)를 미리 적재합니다."""
+    from font_subset import find_compact_font
+
+    _registry.warm(font_path)
+    compact = find_compact_font(font_path)
+    if compact:
+        _registry.warm(compact)
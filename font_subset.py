@@ -0,0 +1,185 @@
+"""
+코퍼스용 축소 폰트(compact font)를 미리 만드는 모듈 (오프라인 빌드)
+
+fpdf2는 output()을 호출할 때마다 원본 CJK 폰트(수만 글리프)에서 사용한 글자만 골라 서브셋을 만듭니다.
+원본 대신 필요한 글리프만 담은 축소 폰트를 미리 만들어 두면 매 요청의 서브셋 계산이 가벼워집니다.
+
+포함하는 글자:
+- 한자: KS X 1001 한자 4,888자 + 코퍼스(--corpus의 *.txt, 사용자 사전)에 나오는 한자
+- 한글: 완성형 음절 11,172자 + 호환 자모
+- 문장 부호: ASCII, 일반 구두점, CJK 기호와 구두점, 전각 문자
+
+축소 폰트는 원본 옆에 `<이름>.compact<확장자>`로 저장되고, 원본 폰트의 해시를 담은
+`<이름>.compact<확장자>.json`이 함께 저장됩니다. 원본이 바뀌면 축소 폰트는 사용되지 않습니다.
+생성기는 축소 폰트에 없는 글자만 원본 폰트로 그립니다.
+
+    python font_subset.py --font fonts/NotoSerifCJKkr-Regular.otf [--corpus message/ more.txt]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from font_registry import get_font_registry
+from memo_cache import memoize
+
+COMPACT_TAG = ".compact"
+DEFAULT_CORPUS = ("message", "custom_meanings.json")
+
+# 문장 부호와 기호 (시작, 끝) 코드 포인트
+PUNCTUATION_RANGES = (
+    (0x0020, 0x007E),  # ASCII
+    (0x00A0, 0x00BF),  # Latin-1 기호 (·, « » 등)
+    (0x2010, 0x205E),  # 일반 구두점
+    (0x2190, 0x2193),  # 화살표
+    (0x2460, 0x2473),  # 원 숫자
+    (0x25A0, 0x25CF),  # 도형
+    (0x3000, 0x303F),  # CJK 기호와 구두점
+    (0xFF01, 0xFF5E),  # 전각 문자
+)
+HANGUL_RANGES = (
+    (0xAC00, 0xD7A3),  # 완성형 음절
+    (0x3131, 0x318E),  # 호환 자모
+)
+
+
+def compact_font_path(font_path: str) -> Path:
+    """원본 폰트에 대응하는 축소 폰트 경로 (fonts/X.otf → fonts/X.compact.otf)"""
+    path = Path(font_path)
+    return path.with_name(f"{path.stem}{COMPACT_TAG}{path.suffix}")
+
+
+def _manifest_path(compact_path: Path) -> Path:
+    return compact_path.with_name(compact_path.name + ".json")
+
+
+def ks_x_1001_hanja() -> str:
+    """KS X 1001(EUC-KR) 한자 4,888자"""
+    chars = []
+    for lead in range(0xCA, 0xFE):
+        for trail in range(0xA1, 0xFF):
+            try:
+                chars.append(bytes((lead, trail)).decode("euc-kr"))
+            except UnicodeDecodeError:
+                continue
+    return "".join(chars)
+
+
+def _is_cjk(ch: str) -> bool:
+    return "\u4e00" <= ch <= "\u9fff" or "\u3400" <= ch <= "\u4dbf" or "\uf900" <= ch <= "\ufaff"
+
+
+def corpus_hanja(paths: Iterable[str]) -> set[str]:
+    """입력 파일(디렉토리는 안의 *.txt, .json은 키와 값)에 나오는 한자를 모읍니다. 없는 경로는 건너뜁니다."""
+    chars: set[str] = set()
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.txt")) if path.is_dir() else [path] if path.is_file() else []
+        for file in files:
+            text = file.read_text(encoding="utf-8", errors="ignore")
+            if file.suffix == ".json":
+                text = "".join(f"{k}{v}" for k, v in json.loads(text).items())
+            chars.update(ch for ch in text if _is_cjk(ch))
+    return chars
+
+
+def compact_charset(corpus: Iterable[str] = DEFAULT_CORPUS) -> str:
+    """축소 폰트에 담을 글자를 코드 포인트 순으로 반환합니다."""
+    chars = set(ks_x_1001_hanja()) | corpus_hanja(corpus)
+    for start, end in HANGUL_RANGES + PUNCTUATION_RANGES:
+        chars.update(chr(cp) for cp in range(start, end + 1))
+    return "".join(sorted(chars))
+
+
+def build_compact_font(font_path: str, chars: str, output: Optional[str] = None) -> dict:
+    """
+    chars의 글리프만 담은 축소 폰트를 저장하고 manifest를 반환합니다.
+    글자 폭과 세로 메트릭은 원본과 같으므로 레이아웃 계산에는 원본 폰트를 그대로 씁니다.
+    """
+    from fontTools import subset, ttLib
+
+    start = time.perf_counter()
+    target = Path(output) if output else compact_font_path(font_path)
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.notdef_outline = True
+    options.recalc_bounds = True
+    font = ttLib.TTFont(font_path, recalcTimestamp=False)
+    cmap = font.getBestCmap()
+    unicodes = [ord(ch) for ch in chars if ord(ch) in cmap]
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    font.save(str(tmp))
+    font.close()
+    os.replace(tmp, target)
+    with ttLib.TTFont(str(target), lazy=True) as saved:
+        n_glyphs = len(saved.getGlyphOrder())
+
+    manifest = {
+        "source": Path(font_path).name,
+        "source_digest": get_font_registry().digest(font_path),
+        "requested_chars": len(chars),
+        "chars": len(unicodes),
+        "glyphs": n_glyphs,
+        "source_bytes": Path(font_path).stat().st_size,
+        "bytes": target.stat().st_size,
+        "build_ms": round((time.perf_counter() - start) * 1000, 1),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _manifest_path(target).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
+
+
+@memoize
+def _read_manifest(path: str, mtime_ns: int) -> Optional[dict]:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def find_compact_font(font_path: str) -> Optional[str]:
+    """원본 폰트로 빌드한 축소 폰트가 있으면 그 경로를, 없거나 원본이 바뀌었으면 None을 반환합니다."""
+    compact = compact_font_path(font_path)
+    manifest_path = _manifest_path(compact)
+    try:
+        mtime_ns = manifest_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    manifest = _read_manifest(str(manifest_path), mtime_ns)
+    if not manifest or not compact.exists():
+        return None
+    if manifest.get("source_digest") != get_font_registry().digest(font_path):
+        return None
+    return str(compact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코퍼스용 축소 폰트를 빌드합니다.")
+    parser.add_argument("--font", required=True, help="원본 CJK 폰트")
+    parser.add_argument("--corpus", nargs="*", default=list(DEFAULT_CORPUS),
+                        help="한자를 추가로 모을 입력 파일/디렉토리 (기본값: message/, custom_meanings.json)")
+    parser.add_argument("--output", help="저장 경로 (기본값: 원본 옆 <이름>.compact<확장자>)")
+    args = parser.parse_args()
+    if not Path(args.font).exists():
+        print(f"폰트 파일을 찾을 수 없습니다: {args.font}")
+        sys.exit(1)
+
+    manifest = build_compact_font(args.font, compact_charset(args.corpus), args.output)
+    target = args.output or compact_font_path(args.font)
+    print(
+        f"{target}: {manifest['chars']:,}/{manifest['requested_chars']:,} chars, {manifest['glyphs']:,} glyphs, "
+        f"{manifest['source_bytes']:,} → {manifest['bytes']:,} bytes ({manifest['build_ms'] / 1000:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
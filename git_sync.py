@@ -0,0 +1,288 @@
+"""
+백그라운드 Git 동기화 모듈
+
+출석 기록 같은 로컬 쓰기는 즉시 끝내고, Git 커밋/푸시는 백그라운드 스레드가 맡습니다.
+
+- enqueue(): 동기화할 파일과 커밋 메시지를 대기열에 넣고 바로 반환합니다.
+- 디바운스: 첫 항목이 들어온 뒤 debounce초 동안 모인 항목을 커밋 하나로 묶습니다.
+- 재시도: 실패하면 항목을 대기열에 남겨 두고 지수 백오프(backoff_base * 2^n, 최대 backoff_max초) 후 다시 시도합니다.
+- 순서: git add → git commit → git pull --rebase → git push
+  (출석 로그는 .gitattributes의 union 병합으로 양쪽에서 덧붙인 줄을 모두 남깁니다)
+
+pull --rebase(--autostash)는 동기화 대상 파일을 새 파일로 바꿔 쓰므로, 그 사이에 덧붙인 줄은 사라질 수 있습니다.
+파일에 쓰는 쪽(AttendanceStore.append)과 작업자는 path_lock()으로 같은 잠금을 잡습니다.
+작업자는 git add부터 pull --rebase가 끝날 때까지 잠금을 잡고, push 동안에는 놓습니다.
+
+대기열 길이와 마지막 동기화 결과는 status()로 확인할 수 있습니다.
+동기화 한 번의 시간과 실패는 metrics의 git_sync 단계로 기록됩니다.
+"""
+import os
+import subprocess
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안의 잠금만 사용
+    fcntl = None
+
+from metrics import stage
+
+DEFAULT_DEBOUNCE = float(os.getenv("GIT_SYNC_DEBOUNCE", "10"))
+DEFAULT_REMOTE = os.getenv("GIT_SYNC_REMOTE", "origin")
+DEFAULT_BRANCH = os.getenv("GIT_SYNC_BRANCH", "master")
+
+
+@dataclass
+class SyncStatus:
+    """동기화 상태 스냅샷"""
+    queue_depth: int = 0  # 아직 푸시되지 않은 항목 수
+    last_attempt: Optional[float] = None  # time.time()
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None  # 마지막 시도가 성공했으면 None
+    syncs: int = 0  # 이 프로세스에서 성공한 동기화 횟수
+    failures: int = 0  # 연속 실패 횟수
+
+
+class GitSyncError(Exception):
+    """git 명령이 실패했을 때 발생합니다."""
+
+
+_local_lock = threading.RLock()
+
+
+@contextmanager
+def path_lock(path: str) -> Iterator[None]:
+    """
+    동기화 대상 파일의 프로세스 간 잠금. 파일에 쓰는 쪽과 pull --rebase가 함께 잡습니다.
+    rebase는 파일을 지우고 다시 만들므로 파일 자체가 아니라 옆의 잠금 파일(.이름.lock)을 잠급니다.
+    """
+    target = Path(path)
+    if fcntl is None:
+        with _local_lock:
+            yield
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target.with_name(f".{target.name}.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _error_detail(result: subprocess.CompletedProcess) -> str:
+    """git 출력에서 원인을 나타내는 줄(fatal:/error:)을 고릅니다."""
+    lines = (result.stderr or result.stdout).strip().splitlines()
+    for line in lines:
+        if line.startswith(("fatal:", "error:")):
+            return line
+    return lines[-1] if lines else f"exit {result.returncode}"
+
+
+class GitSyncWorker:
+    """대기열에 모인 변경을 묶어서 커밋하고 푸시하는 백그라운드 작업자"""
+
+    def __init__(
+        self,
+        repo_dir: str = ".",
+        remote: str = DEFAULT_REMOTE,
+        branch: str = DEFAULT_BRANCH,
+        debounce: float = DEFAULT_DEBOUNCE,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+        timeout: float = 60.0,
+    ):
+        self.repo_dir = repo_dir
+        self.remote = remote
+        self.branch = branch
+        self.debounce = debounce
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._pending: list[tuple[tuple[str, ...], str]] = []  # (파일 목록, 메시지)
+        self._first_pending: Optional[float] = None  # time.monotonic()
+        self._retry_at: float = 0.0
+        self._flush_requested = False
+        self._syncing = False
+        self._attempts = 0
+        self._status = SyncStatus()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def start(self) -> "GitSyncWorker":
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="git-sync", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, flush: bool = True, timeout: Optional[float] = None) -> None:
+        """작업자를 멈춥니다. flush=True면 남은 항목을 한 번 더 동기화합니다."""
+        if flush:
+            self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+
+    def enqueue(self, paths: Iterable[str], message: str) -> None:
+        """동기화할 파일과 커밋 메시지를 대기열에 넣습니다. (바로 반환)"""
+        with self._cond:
+            self._pending.append((tuple(paths), message))
+            if self._first_pending is None:
+                self._first_pending = time.monotonic()
+            self._status.queue_depth = len(self._pending)
+            self._cond.notify_all()
+        self.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        디바운스와 백오프 대기 없이 바로 동기화하고 결과를 기다립니다.
+        대기열이 비었으면 True, 동기화가 실패했거나 timeout이 지나면 False를 반환합니다.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._pending:
+                return True
+            # 진행 중인 시도가 있으면 그 다음 시도까지 기다립니다 (새 항목이 포함되도록).
+            target = self._attempts + (2 if self._syncing else 1)
+            self._flush_requested = True
+            self._cond.notify_all()
+        self.start()
+        with self._cond:
+            while self._pending and self._attempts < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return not self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def status(self) -> SyncStatus:
+        with self._cond:
+            return replace(self._status, queue_depth=len(self._pending))
+
+    # ------------------------------------------------------------------
+    # 작업자 스레드
+    # ------------------------------------------------------------------
+    def _due(self) -> Optional[float]:
+        """다음 동기화까지 남은 시간(초). 대기열이 비었으면 None (잠금을 잡은 상태에서 호출)"""
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        if self._flush_requested:
+            return 0.0
+        return max(self._first_pending + self.debounce, self._retry_at) - now
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    wait = self._due()
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                batch = list(self._pending)
+                self._flush_requested = False
+                self._syncing = True
+
+            error = None
+            try:
+                with stage("git_sync"):
+                    self._sync(batch)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+
+            with self._cond:
+                self._status.last_attempt = time.time()
+                self._syncing = False
+                self._attempts += 1
+                if error is None:
+                    del self._pending[:len(batch)]  # 동기화하는 동안 들어온 항목은 남김
+                    self._first_pending = time.monotonic() if self._pending else None
+                    self._status.last_success = self._status.last_attempt
+                    self._status.last_error = None
+                    self._status.failures = 0
+                    self._status.syncs += 1
+                else:
+                    self._status.failures += 1
+                    self._status.last_error = error
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (self._status.failures - 1))
+                    self._retry_at = time.monotonic() + delay
+                    print(f"Git sync failed ({self._status.failures}회, {delay:.0f}초 후 재시도): {error}")
+                self._status.queue_depth = len(self._pending)
+                self._cond.notify_all()
+
+    def _git(self, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+        result = subprocess.run(
+            ["git", *args], cwd=self.repo_dir, capture_output=True, text=True,
+            timeout=self.timeout, check=False,
+        )
+        if check and result.returncode != 0:
+            raise GitSyncError(f"git {args[0]}: {_error_detail(result)}")
+        return result
+
+    def _sync(self, batch: list[tuple[tuple[str, ...], str]]) -> None:
+        """모인 항목을 커밋 하나로 묶어 푸시합니다."""
+        paths = sorted({p for item_paths, _ in batch for p in item_paths})
+        messages = list(dict.fromkeys(message for _, message in batch))
+
+        # 커밋과 rebase 동안 대상 파일에 덧붙이지 못하게 합니다 (항상 같은 순서로 잡음).
+        with ExitStack() as locks:
+            for p in paths:
+                locks.enter_context(path_lock(os.path.join(self.repo_dir, p)))
+            self._commit_and_rebase(paths, messages)
+        self._git("push", self.remote, f"HEAD:{self.branch}")
+
+    def _commit_and_rebase(self, paths: list[str], messages: list[str]) -> None:
+        """대상 파일을 커밋하고 원격의 변경 위로 rebase합니다. (대상 파일의 path_lock을 잡은 상태에서 호출)"""
+        existing = [p for p in paths if os.path.exists(os.path.join(self.repo_dir, p))]
+        if existing:
+            self._git("add", "--", *existing)
+        # 스테이징된 변경이 있을 때만 커밋 (이전 시도에서 커밋만 되고 푸시가 실패했을 수 있음)
+        if self._git("diff", "--cached", "--quiet", check=False).returncode != 0:
+            if len(messages) == 1:
+                subject, body = messages[0], []
+            else:
+                subject, body = f"chore: sync {len(messages)} updates", messages
+            self._git("commit", "-m", subject, *(["-m", "\n".join(body)] if body else []))
+
+        # 동기화 대상이 아닌 추적 파일(예: 아직 저장 버튼을 누르지 않은 custom_meanings.json)이 바뀌어 있어도
+        # rebase가 거부되지 않도록 잠시 stash했다가 되돌립니다.
+        pull = self._git("pull", "--rebase", "--autostash", self.remote, self.branch, check=False)
+        if pull.returncode != 0:
+            self._git("rebase", "--abort", check=False)
+            raise GitSyncError(f"git pull: {_error_detail(pull)}")
+
+
+_worker: Optional[GitSyncWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_sync_worker() -> GitSyncWorker:
+    """프로세스 전역 동기화 작업자를 반환합니다. (처음 enqueue할 때 스레드 시작)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = GitSyncWorker()
+        return _worker
@@ -1,93 +1,308 @@
 """
 한자 훈음(뜻과 소리) 라이브러리 연결 및 사용자 정의 사전 모듈 (캐싱 최적화 버전)
+
+Streamlit에 의존하지 않으며, hanjadict는 처음 필요할 때 불러옵니다.
+사용자 사전(custom_meanings.json)은 파일이 바뀌었을 때만 다시 읽고, 저장할 때는 임시 파일에 쓴 뒤
+원자적으로 교체합니다. 훈음이 바뀐 글자의 캐시만 지우고 등록된 캐시(add_dictionary_listener)에 알립니다.
 """
-import hanjadict
+import hashlib
 import unicodedata
 import json
 import os
-import streamlit as st
+import tempfile
+import threading
+
+from memo_cache import memoize
+
+CUSTOM_DICT_PATH = 'custom_meanings.json'
+
+# 사용자 사전의 메모리 사본. 파일의 (inode, 크기, 수정 시각)이 바뀌었을 때만 다시 읽습니다.
+# git pull이나 다른 프로세스(웹 앱 ↔ 봇 워커)가 파일을 바꾼 것도 다음 조회 때 반영됩니다.
+# 파일이 없으면 서명이 None이므로, 아직 한 번도 읽지 않은 상태는 따로 구분합니다.
+_NEVER_LOADED = object()
+_dict_lock = threading.RLock()
+_dict_state = {"signature": _NEVER_LOADED, "entries": {}, "version": "none"}
+
+# 글자 → {선호 음: 훈음}. 사전이 바뀌면 바뀐 글자의 항목만 지웁니다.
+# 조회 도중 무효화되면 오래된 결과를 저장하지 않도록 세대 번호를 둡니다.
+_meaning_cache: dict[str, dict] = {}
+_meaning_generation = [0]
+
+# 사용자 사전이 바뀔 때 바뀐 글자 집합을 받는 함수 목록 (캐시 무효화용)
+_change_listeners = []
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+def _content_version(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def _changed_chars(old: dict, new: dict) -> set:
+    """두 사전에서 훈음이 달라진 글자 (호환 한자는 정규화된 글자로도 조회되므로 함께 포함)"""
+    chars = {ch for ch in old.keys() | new.keys() if old.get(ch) != new.get(ch)}
+    return chars | {unicodedata.normalize('NFKC', ch) for ch in chars}
+
+def _apply_change(chars: set) -> None:
+    """바뀐 글자의 훈음 캐시만 지우고 등록된 캐시(페이지 캐시 등)에 알립니다."""
+    if not chars:
+        return
+    _meaning_generation[0] += 1
+    for ch in list(_meaning_cache):
+        if ch in chars or unicodedata.normalize('NFKC', ch) in chars:
+            _meaning_cache.pop(ch, None)
+    for callback in list(_change_listeners):
+        callback(set(chars))
+
+def _refresh_custom_dict() -> dict:
+    """파일이 바뀌었으면 다시 읽고 바뀐 글자만 무효화합니다. 현재 사전을 반환합니다."""
+    signature = _file_signature(CUSTOM_DICT_PATH)
+    state = _dict_state
+    if signature == state["signature"]:
+        return state["entries"]
+    with _dict_lock:
+        if signature == state["signature"]:
+            return state["entries"]
+        entries, version = {}, "none"
+        if signature is not None:
+            try:
+                with open(CUSTOM_DICT_PATH, 'rb') as f:
+                    data = f.read()
+                entries = json.loads(data)
+                version = _content_version(data)
+            except (OSError, ValueError):
+                entries, version = {}, "none"
+        # 처음 읽을 때만 무효화를 건너뜁니다. 읽은 뒤에 파일이 새로 생긴 경우는 바뀐 것으로 봅니다.
+        first_load = state["signature"] is _NEVER_LOADED
+        changed = set() if first_load else _changed_chars(state["entries"], entries)
+        state.update(signature=signature, entries=entries, version=version)
+    _apply_change(changed)
+    return entries
 
-@st.cache_data
 def get_custom_dict():
-    """custom_meanings.json 파일을 로드하고 캐싱합니다."""
-    path = 'custom_meanings.json'
-    if os.path.exists(path):
+    """custom_meanings.json의 내용을 반환합니다. (파일이 바뀌지 않았으면 메모리 사본, 수정하지 마세요)"""
+    return _refresh_custom_dict()
+
+def get_dictionary_version() -> str:
+    """
+    사용자 사전 파일 내용의 해시를 반환합니다. 사전을 고치면 바뀝니다.
+    (글자와 무관한 전체 버전. 구절/노트 캐시 키에는 get_chars_dictionary_version을 씁니다)
+    """
+    _refresh_custom_dict()
+    return _dict_state["version"]
+
+def get_chars_dictionary_version(chars) -> str:
+    """
+    주어진 글자들에 적용되는 사용자 사전 항목만의 해시를 반환합니다. (구절/노트 단위 캐시 키에 사용)
+    다른 글자의 훈음을 고쳐도 값이 바뀌지 않습니다.
+    """
+    custom_dict = get_custom_dict()
+    entries = sorted({
+        (ch, _custom_meaning(custom_dict, ch))
+        for ch in chars
+    }, key=lambda e: e[0])
+    raw = json.dumps([e for e in entries if e[1] is not None], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+def add_dictionary_listener(callback):
+    """사용자 사전의 훈음이 바뀔 때 호출될 함수를 등록합니다. callback(chars: set[str])"""
+    if callback not in _change_listeners:
+        _change_listeners.append(callback)
+
+def remove_dictionary_listener(callback):
+    """add_dictionary_listener로 등록한 함수를 해제합니다. 등록되지 않은 함수는 무시합니다."""
+    if callback in _change_listeners:
+        _change_listeners.remove(callback)
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """같은 디렉토리의 임시 파일에 쓰고 fsync한 뒤 교체합니다. 읽는 쪽은 반쯤 쓴 파일을 보지 않습니다."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix='.custom_meanings.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
 
 def save_custom_meaning(char: str, meaning: str):
     """
     사용자 정의 사전에 새로운 훈음을 추가/수정하고 파일에 저장합니다.
+    파일은 원자적으로 교체하며, 훈음이 바뀐 글자의 캐시만 무효화하고 사전 버전을 올립니다.
     """
     if not char or not meaning:
         return
 
-    path = 'custom_meanings.json'
-    current_dict = {}
-    if os.path.exists(path):
+    with _dict_lock:
+        current = _refresh_custom_dict()
+        if current.get(char) == meaning:
+            return
+        updated = {**current, char: meaning}
+        data = json.dumps(updated, ensure_ascii=False, indent=4).encode('utf-8')
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                current_dict = json.load(f)
-        except: pass
-    
-    current_dict[char] = meaning
+            _atomic_write(CUSTOM_DICT_PATH, data)
+        except OSError as e:
+            print(f"사전 저장 실패: {e}")
+            return
+        _dict_state.update(
+            signature=_file_signature(CUSTOM_DICT_PATH), entries=updated, version=_content_version(data),
+        )
+    _apply_change(_changed_chars(current, updated))
 
-    try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(current_dict, f, ensure_ascii=False, indent=4)
-        # 저장 후 캐시 초기화
-        st.cache_data.clear()
-    except Exception as e:
-        print(f"사전 저장 실패: {e}")
-
-@st.cache_resource
+@memoize
 def _get_hanjadict_instance():
-    """hanjadict 라이브러리 로드를 캐싱합니다."""
+    """hanjadict 라이브러리를 처음 필요할 때 불러옵니다. (사전 파일 로드가 무거움)"""
+    import hanjadict
     return hanjadict
 
-def get_hanja_meaning(char: str, preferred_sound: str = None) -> str:
-    """
-    한자의 훈음(뜻과 소리)을 반환합니다.
-    """
-    if not char or len(char) != 1:
-        return ""
-    
-    # 1. 사용자 정의 사전 확인
-    custom_dict = get_custom_dict()
+_table = None
+
+def _get_hanja_table():
+    """미리 컴파일된 훈음 표를 (처음 한 번) 불러옵니다."""
+    global _table
+    if _table is None:
+        from hanja_table import load_table
+        _table = load_table()
+    return _table
+
+def _custom_meaning(custom_dict: dict, char: str):
+    """사용자 정의 사전에서 훈음을 찾습니다. (호환 한자는 정규화 후 재시도)"""
     if char in custom_dict:
         return custom_dict[char]
-    
-    # 호환 한자 대응 (정규화)
     normalized_char = unicodedata.normalize('NFKC', char)
     if normalized_char in custom_dict:
         return custom_dict[normalized_char]
-    
-    # 2. hanjadict 조회
+    return None
+
+def _lookup_candidates(char: str):
+    """후보 훈음 목록. 표 범위 밖의 문자는 hanjadict를 직접 조회합니다."""
+    candidates = _get_hanja_table().candidates(char)
+    if candidates is not None:
+        return candidates
+
+    normalized_char = unicodedata.normalize('NFKC', char)
     hdict = _get_hanjadict_instance()
     result = hdict.lookup(normalized_char)
-    
     if not result:
         result = hdict.lookup(char)
-        
     if not result:
-        return ""
-        
-    candidates = [c.strip() for c in result.split(',')]
-    
-    # 3. 선호하는 음(소리)이 있는 경우 매칭 시도
+        return ()
+    return tuple(c.strip() for c in result.split(','))
+
+# 두음법칙 규칙표: (첫소리, 적용되는 가운뎃소리(None이면 그 밖의 모든 모음), 바뀐 첫소리)
+# 같은 한자가 단어 첫머리에서 '락/낙', '례/예', '녀/여'처럼 다른 음으로 읽히므로,
+# 선호하는 음과 후보의 음을 모두 이 규칙으로 바꾼 형태로 맞춰 봅니다. 위에서부터 처음 맞는 규칙 하나만 적용합니다.
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_IOTIZED = frozenset("ㅑㅕㅖㅛㅠㅣ")
+INITIAL_SOUND_RULES = (
+    ("ㄹ", _IOTIZED, "ㅇ"),  # 례→예, 륙→육, 리→이, 량→양
+    ("ㄹ", None, "ㄴ"),      # 락→낙, 로→노, 뢰→뇌
+    ("ㄴ", _IOTIZED, "ㅇ"),  # 녀→여, 뇨→요, 닉→익
+)
+
+# 두음법칙 밖에서 같은 한자의 음으로 취급하는 관용 음 (두음법칙을 적용한 형태 → 대표 음)
+SOUND_ALIASES = {"불": "부"}  # 不: 부정(不正), 부득이(不得已)
+
+def initial_sound_form(sound: str) -> str:
+    """두음법칙을 적용한 음을 반환합니다. 예: '락' → '낙', '례' → '예'. 한글 음절 하나가 아니면 그대로"""
+    if len(sound) != 1 or not '가' <= sound <= '힣':
+        return sound
+    code = ord(sound) - 0xAC00
+    lead, vowel, tail = code // 588, code // 28 % 21, code % 28
+    for before, vowels, after in INITIAL_SOUND_RULES:
+        if _CHOSEONG[lead] == before and (vowels is None or _JUNGSEONG[vowel] in vowels):
+            return chr(0xAC00 + _CHOSEONG.index(after) * 588 + vowel * 28 + tail)
+    return sound
+
+_sound_keys: dict[str, str] = {}
+
+def _sound_key(sound: str) -> str:
+    """두음법칙과 관용 음을 맞춘 비교용 음"""
+    key = _sound_keys.get(sound)
+    if key is None:
+        key = initial_sound_form(sound)
+        key = _sound_keys[sound] = SOUND_ALIASES.get(key, key)
+    return key
+
+def _build_sound_index(candidates) -> tuple[dict, dict]:
+    """
+    후보 목록으로 (음 → 훈음, 비교용 음 → 훈음) 색인을 만듭니다.
+    같은 음의 후보가 여럿이면 앞의 후보를 씁니다.
+    """
+    exact, general = {}, {}
+    for cand in candidates:
+        parts = cand.split()
+        if not parts:
+            continue
+        exact.setdefault(parts[-1], cand)
+        general.setdefault(_sound_key(parts[-1]), cand)
+    return exact, general
+
+# 글자 → (후보 목록, 음 색인, 비교용 음 색인). 훈음 표는 바뀌지 않으므로 무효화하지 않습니다.
+_sound_indexes: dict[str, tuple] = {}
+
+def _char_index(char: str) -> tuple:
+    index = _sound_indexes.get(char)
+    if index is None:
+        candidates = _lookup_candidates(char)
+        index = _sound_indexes[char] = (candidates, *_build_sound_index(candidates))
+    return index
+
+def _select_candidate(candidates, preferred_sound: str = None, index: tuple = None) -> str:
+    """
+    선호하는 음(소리)과 맞는 후보를 고릅니다.
+    같은 음의 후보 → 두음법칙/관용 음으로 맞는 후보 → 첫 번째 후보 순입니다.
+    """
     if preferred_sound:
-        for cand in candidates:
-            parts = cand.split()
-            if not parts: continue
-            actual_sound = parts[-1]
-            if actual_sound == preferred_sound: return cand
-            if {actual_sound, preferred_sound} <= {"불", "부"}: return cand
-            if {actual_sound, preferred_sound} <= {"락", "낙", "악", "요"}: return cand
-            if {actual_sound, preferred_sound} <= {"륙", "육"}: return cand
-            if {actual_sound, preferred_sound} <= {"례", "예"}: return cand
-    
-    return candidates[0]
\ No newline at end of file
+        exact, general = index or _build_sound_index(candidates)
+        meaning = exact.get(preferred_sound) or general.get(_sound_key(preferred_sound))
+        if meaning:
+            return meaning
+    return candidates[0]
+
+def _resolve_meaning(custom_dict: dict, char: str, sound: str = None) -> str:
+    """한 글자의 훈음 (사용자 사전 → 훈음 표). 결과는 글자별 훈음 캐시에 기억합니다."""
+    by_sound = _meaning_cache.get(char)
+    if by_sound is not None and sound in by_sound:
+        return by_sound[sound]
+    generation = _meaning_generation[0]
+    meaning = _custom_meaning(custom_dict, char)
+    if meaning is None:
+        candidates, exact, general = _char_index(char)
+        meaning = _select_candidate(candidates, sound, (exact, general)) if candidates else ""
+    if generation == _meaning_generation[0]:
+        _meaning_cache.setdefault(char, {})[sound] = meaning
+    return meaning
+
+def get_hanja_meaning(char: str, preferred_sound: str = None) -> str:
+    """
+    한자의 훈음(뜻과 소리)을 반환합니다.
+    사용자 사전 → 훈음 표 순서로 찾고, 선호하는 음(소리)이 있으면 그 음의 후보를 고릅니다.
+    """
+    if not char or len(char) != 1:
+        return ""
+    return _resolve_meaning(get_custom_dict(), char, preferred_sound)
+
+def get_hanja_meanings(chars, sounds=None) -> list[str]:
+    """
+    여러 글자의 훈음을 한 번에 반환합니다. (구절 단위 일괄 조회)
+    사용자 사전은 한 번만 확인하며, (글자, 음) 조합의 결과는 글자별 훈음 캐시에서 재사용합니다.
+    """
+    chars = list(chars)
+    if not sounds:
+        sounds = [None] * len(chars)
+    custom_dict = get_custom_dict()
+    return [
+        _resolve_meaning(custom_dict, char, sound) if char and len(char) == 1 else ""
+        for char, sound in zip(chars, sounds)
+    ]
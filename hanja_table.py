@@ -0,0 +1,246 @@
+"""
+미리 컴파일된 한자 훈음 표 모듈
+
+hanjadict의 사전(dict + 문자열)을 CJK 코드 포인트 범위별 배열과 UTF-8 문자열 덩어리로
+한 번 변환해 파일로 저장하고, 이후에는 mmap으로 읽기만 합니다.
+
+- 후보 훈음은 미리 ','로 나누고 공백을 정리해 둡니다.
+- 호환 한자(U+F900~U+FAFF)는 NFKC 정규화 결과로 미리 조회해 둡니다.
+- 여러 프로세스(봇 워커 등)가 같은 파일을 mmap하면 페이지 캐시를 공유합니다.
+
+파일 형식 (리틀 엔디언):
+    header   : MAGIC(4) | FORMAT_VERSION(u32) | source digest(32) | n_slots(u32) | n_cands(u32) | blob_len(u32)
+    first    : u32[n_slots]    슬롯별 첫 후보 번호 + 1 (0 = 없음)
+    count    : u8[n_slots]     슬롯별 후보 수
+    offsets  : u32[n_cands+1]  후보 문자열의 blob 내 위치
+    blob     : UTF-8 후보 문자열
+
+직접 빌드:
+    python hanja_table.py [--output .cache/hanja_table.bin]
+"""
+import argparse
+import hashlib
+import importlib.metadata
+import importlib.util
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Optional
+
+MAGIC = b"HJT1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sI32sIII")
+
+# (시작, 끝) 코드 포인트: 확장 A, 통합 한자, 호환 한자
+CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF))
+
+DEFAULT_TABLE_PATH = Path(os.getenv("HANJA_TABLE_PATH", ".cache/hanja_table.bin"))
+
+
+def _range_bases() -> list[tuple[int, int, int]]:
+    bases = []
+    base = 0
+    for start, end in CJK_RANGES:
+        bases.append((start, end, base))
+        base += end - start + 1
+    return bases
+
+
+_BASES = _range_bases()
+N_SLOTS = _BASES[-1][2] + CJK_RANGES[-1][1] - CJK_RANGES[-1][0] + 1
+
+
+def slot_of(cp: int) -> int:
+    """코드 포인트의 슬롯 번호. 표가 다루지 않는 문자는 -1"""
+    for start, end, base in _BASES:
+        if start <= cp <= end:
+            return base + cp - start
+    return -1
+
+
+def split_candidates(result: str) -> list[str]:
+    """hanjadict 결과 문자열을 후보 목록으로 나눕니다. 예: '즐거울 락, 노래 악' → ['즐거울 락', '노래 악']"""
+    return [c.strip() for c in result.split(',')]
+
+
+def _hanjadict_data_path() -> Optional[Path]:
+    """
+    hanjadict가 읽을 사전 데이터 파일 위치. hanjadict를 import하면 사전 JSON 전체를 파싱하므로
+    import하지 않고 hanjadict.table._find_table()과 같은 순서로 찾습니다.
+    (HANJADICT_TABLE 환경 변수 → 패키지 안의 table.json)
+    """
+    env = os.environ.get("HANJADICT_TABLE")
+    if env:
+        return Path(env)
+    spec = importlib.util.find_spec("hanjadict")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    local = Path(list(spec.submodule_search_locations)[0]) / "table.json"
+    return local if local.is_file() else None
+
+
+def _source_digest() -> bytes:
+    """
+    원본 사전이 바뀌었는지 확인하기 위한 서명 (hanjadict 버전 + 데이터 파일 위치/크기/수정 시각).
+    사전 데이터를 읽지 않으므로 표가 최신이면 hanjadict를 불러오지 않습니다.
+    """
+    try:
+        version = importlib.metadata.version("hanjadict")
+    except importlib.metadata.PackageNotFoundError:
+        version = ""
+    parts = [version]
+    table_path = _hanjadict_data_path()
+    if table_path and table_path.exists():
+        stat = table_path.stat()
+        parts += [str(table_path.resolve()), str(stat.st_size), str(stat.st_mtime_ns)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).digest()
+
+
+def build_table(table_data: dict, digest: bytes = b"\0" * 32) -> bytes:
+    """hanjadict 사전으로부터 표 파일 내용을 만듭니다."""
+    first = array("I", [0]) * N_SLOTS
+    count = bytearray(N_SLOTS)
+    offsets = array("I", [0])
+    blob = bytearray()
+    n_cands = 0
+
+    for start, end, base in _BASES:
+        for cp in range(start, end + 1):
+            ch = chr(cp)
+            result = table_data.get(unicodedata.normalize('NFKC', ch)) or table_data.get(ch)
+            if not result:
+                continue
+            candidates = split_candidates(result)[:255]
+            first[base + cp - start] = n_cands + 1
+            count[base + cp - start] = len(candidates)
+            for cand in candidates:
+                blob += cand.encode("utf-8")
+                offsets.append(len(blob))
+                n_cands += 1
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, digest, N_SLOTS, n_cands, len(blob))
+    return header + first.tobytes() + bytes(count) + offsets.tobytes() + bytes(blob)
+
+
+class HanjaTable:
+    """표 파일(bytes 또는 mmap) 위에서 동작하는 읽기 전용 조회기"""
+
+    def __init__(self, buf):
+        self._buf = buf
+        magic, version, digest, n_slots, n_cands, blob_len = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or n_slots != N_SLOTS:
+            raise ValueError("한자 표 파일 형식이 맞지 않습니다.")
+        expected = _HEADER.size + 4 * n_slots + n_slots + 4 * (n_cands + 1) + blob_len
+        if len(buf) != expected:
+            # 쓰다가 끊긴 파일 등: 다시 빌드하도록 ValueError로 알립니다.
+            raise ValueError(f"한자 표 파일 크기가 맞지 않습니다. ({len(buf)} != {expected})")
+        self.digest = digest
+        self.n_candidates = n_cands
+        view = memoryview(buf)
+        pos = _HEADER.size
+        self._first = view[pos:pos + 4 * n_slots].cast("I")
+        pos += 4 * n_slots
+        self._count = view[pos:pos + n_slots]
+        pos += n_slots
+        self._offsets = view[pos:pos + 4 * (n_cands + 1)].cast("I")
+        pos += 4 * (n_cands + 1)
+        self._blob = view[pos:pos + blob_len]
+        # 디코딩한 후보 목록 메모 (자주 쓰이는 글자는 한 번만 디코딩)
+        self._decoded: dict[str, Optional[tuple[str, ...]]] = {}
+
+    def close(self) -> None:
+        """메모리 뷰를 놓고 mmap을 닫습니다. (bytes 위의 표는 뷰만 놓음)"""
+        for view in (self._first, self._count, self._offsets, self._blob):
+            view.release()
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def candidates(self, ch: str) -> Optional[tuple[str, ...]]:
+        """
+        후보 훈음 목록을 반환합니다.
+        표가 다루는 범위 밖의 문자는 None, 범위 안이지만 사전에 없으면 빈 튜플입니다.
+        """
+        try:
+            return self._decoded[ch]
+        except KeyError:
+            pass
+        slot = slot_of(ord(ch))
+        if slot < 0:
+            candidates = None
+        elif not self._first[slot]:
+            candidates = ()
+        else:
+            first = self._first[slot] - 1
+            offsets, blob = self._offsets, self._blob
+            candidates = tuple(
+                str(blob[offsets[i]:offsets[i + 1]], "utf-8")
+                for i in range(first, first + self._count[slot])
+            )
+        self._decoded[ch] = candidates
+        return candidates
+
+
+def load_table(path: Path = DEFAULT_TABLE_PATH) -> HanjaTable:
+    """
+    표 파일을 mmap으로 엽니다. 파일이 없거나 hanjadict 사전이 바뀌었으면 새로 빌드해 저장합니다.
+    저장할 수 없는 환경에서는 메모리에 빌드한 표를 사용합니다.
+    hanjadict 사전(JSON 전체)은 다시 빌드할 때만 불러옵니다.
+    """
+    digest = _source_digest()
+    path = Path(path)
+    buf = None
+    try:
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        table = HanjaTable(buf)
+        if table.digest == digest:
+            return table
+        table.close()
+    except (OSError, ValueError, struct.error):
+        if buf is not None:
+            buf.close()
+
+    from hanjadict import table_data
+
+    data = build_table(table_data, digest)
+    try:
+        save_table(path, data)
+    except OSError as e:
+        print(f"한자 표 저장 실패 (메모리 사용): {e}")
+    return HanjaTable(data)
+
+
+def save_table(path: Path, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 교체하므로, 읽는 쪽은 반쯤 쓴 표를 보지 않습니다."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hanjadict 사전으로 한자 훈음 표 파일을 빌드합니다.")
+    parser.add_argument("--output", default=str(DEFAULT_TABLE_PATH))
+    args = parser.parse_args()
+    from hanjadict import table_data
+
+    if not table_data:
+        print("hanjadict 사전 데이터를 찾을 수 없습니다. (HANJADICT_TABLE 환경 변수를 확인하세요)")
+        sys.exit(1)
+    data = build_table(table_data, _source_digest())
+    save_table(Path(args.output), data)
+    table = HanjaTable(data)
+    print(f"{args.output}: {table.n_candidates} candidates, {len(data):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+필사 노트 레이아웃 계획 모듈
+
+구절 하나를 PDF 그리기 명령 없이 "어디에 무엇을 그릴지"만 담은 계획(PassagePlan)으로 바꿉니다.
+계획은 페이지 목록이고, 각 페이지는 위치가 정해진 그리기 항목의 목록입니다.
+
+    Glyph     기준선 위치에 찍는 글자/짧은 문자열 (원문 한자, 연한 글자, 훈음, 라벨)
+    TextCell  폭과 높이가 있는 한 줄 텍스트 칸 (음독, 줄바꿈된 해석의 각 줄)
+    GridCell  격자 셀(테두리 + 십자 점선) + 그 아래 훈음 쓰기 칸
+    Rule      직선 (해석 필사 줄)
+
+페이지 나눔(새 페이지 시작)은 계획을 만들 때 결정됩니다. AnalectsTracingPDF.emit_plan()이
+계획을 fpdf 호출로 옮기며, 다른 백엔드도 같은 계획을 그대로 사용할 수 있습니다.
+plan_to_dict() / plan_from_dict()로 JSON 직렬화할 수 있습니다.
+
+계획은 (구절 내용, Config, 폰트, 그 구절의 글자에 해당하는 사용자 사전 항목)을 키로 프로세스 안에서 캐시됩니다
+(LRU, PLAN_CACHE_SIZE개). 다른 글자의 훈음을 고쳐도 구절의 계획은 그대로 재사용됩니다.
+글자 폭은 폰트별 (텍스트, 크기) 표에 기억해 두고 다시 측정하지 않습니다 (WIDTH_CACHE_SIZE개).
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import astuple, dataclass, fields
+from typing import Union
+
+from fpdf import FPDF
+from fpdf.enums import MethodReturnValue
+
+from font_registry import get_font_registry
+from hanja_dictionary import get_chars_dictionary_version, get_hanja_meanings
+from metrics import stage
+
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "2048"))
+WIDTH_CACHE_SIZE = int(os.getenv("WIDTH_CACHE_SIZE", "65536"))
+
+
+# ---------------------------------------------------------------------------
+# Plan items
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Glyph:
+    """(x, y) 기준선 위치에 찍는 텍스트"""
+    x: float
+    y: float
+    text: str
+    size: float  # pt
+    color: tuple
+
+
+@dataclass(frozen=True)
+class TextCell:
+    """(x, y)에서 시작하는 w × h 크기의 한 줄 텍스트 칸 (왼쪽 정렬)"""
+    x: float
+    y: float
+    w: float
+    h: float
+    text: str
+    size: float
+    color: tuple
+
+
+@dataclass(frozen=True)
+class GridCell:
+    """(x, y)가 왼쪽 위인 size × size 격자 셀과 그 아래 훈음 쓰기 칸"""
+    x: float
+    y: float
+    size: float
+
+
+@dataclass(frozen=True)
+class Rule:
+    """(x1, y1)에서 (x2, y2)까지의 직선"""
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    color: tuple
+    width: float
+
+
+PlanItem = Union[Glyph, TextCell, GridCell, Rule]
+_ITEM_TYPES = {cls.__name__: cls for cls in (Glyph, TextCell, GridCell, Rule)}
+
+
+@dataclass(frozen=True)
+class PassagePlan:
+    """구절 하나의 레이아웃. pages[i]는 i번째 페이지에 그릴 항목들입니다."""
+    label: str
+    pages: tuple[tuple[PlanItem, ...], ...]
+
+
+def plan_to_dict(plan: PassagePlan) -> dict:
+    """JSON으로 저장할 수 있는 dict로 바꿉니다."""
+    return {
+        "label": plan.label,
+        "pages": [
+            [{"type": type(item).__name__, **{f.name: getattr(item, f.name) for f in fields(item)}} for item in page]
+            for page in plan.pages
+        ],
+    }
+
+
+def plan_from_dict(data: dict) -> PassagePlan:
+    pages = []
+    for page in data["pages"]:
+        items = []
+        for raw in page:
+            values = dict(raw)
+            cls = _ITEM_TYPES[values.pop("type")]
+            if "color" in values:
+                values["color"] = tuple(values["color"])
+            items.append(cls(**values))
+        pages.append(tuple(items))
+    return PassagePlan(label=data["label"], pages=tuple(pages))
+
+
+# ---------------------------------------------------------------------------
+# Plan cache
+# ---------------------------------------------------------------------------
+
+_plan_cache: "OrderedDict[tuple, PassagePlan]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+_plan_cache_stats = {"hits": 0, "misses": 0}
+
+
+def plan_cache_stats() -> dict:
+    with _plan_cache_lock:
+        return {**_plan_cache_stats, "size": len(_plan_cache)}
+
+
+def clear_plan_cache() -> None:
+    with _plan_cache_lock:
+        _plan_cache.clear()
+
+
+# 폰트 해시 → {(텍스트, 크기 pt): 폭 mm}. 같은 폰트를 쓰는 planner(요청마다 새로 만들어짐)가 함께 씁니다.
+# 항목 수가 WIDTH_CACHE_SIZE를 넘으면 그 폰트의 표를 비웁니다. (dict 읽기/쓰기는 스레드 안전)
+_width_tables: dict[str, dict[tuple, float]] = {}
+
+
+def clear_width_cache() -> None:
+    _width_tables.clear()
+
+
+# ---------------------------------------------------------------------------
+# Planner
+# ---------------------------------------------------------------------------
+
+def passage_sounds(passage) -> list:
+    """음독의 한글 글자를 원문 글자별 음으로 씁니다. 글자 수가 다르면 모두 None"""
+    sounds = [ch for ch in passage.reading if "\uac00" <= ch <= "\ud7a3"]
+    return sounds if len(sounds) == len(passage.original) else [None] * len(passage.original)
+
+
+class LayoutPlanner:
+    """Config와 폰트 크기 정보만으로 구절의 레이아웃을 계산합니다. (PDF에 아무것도 그리지 않음)"""
+
+    def __init__(self, config, font_path: str):
+        self.cfg = config
+        registry = get_font_registry()
+        # 글자 폭 측정과 해석 줄바꿈 계산에만 쓰는 문서 (출력하지 않음)
+        self._metrics = FPDF(unit="mm", format="A4")
+        self._metrics.set_margins(left=config.margin_left, top=config.margin_top, right=config.margin_right)
+        registry.add_font(self._metrics, "CJK", "", font_path)
+        self._metrics.add_page()
+        digest = registry.digest(font_path)
+        self._cache_prefix = (digest, astuple(config))
+        self._widths = _width_tables.setdefault(digest, {})
+
+    # ----- Measurement -----
+
+    def string_width(self, text: str, size: float) -> float:
+        """텍스트 폭(mm). (텍스트, 크기)별로 폰트마다 한 번만 계산합니다."""
+        key = (text, size)
+        width = self._widths.get(key)
+        if width is None:
+            self._metrics.set_font("CJK", "", size)
+            width = self._metrics.get_string_width(text)
+            if len(self._widths) >= WIDTH_CACHE_SIZE:
+                self._widths.clear()
+            self._widths[key] = width
+        return width
+
+    def wrap_lines(self, text: str, width: float, line_height: float, size: float) -> list[str]:
+        """fpdf multi_cell과 같은 규칙으로 텍스트를 줄바꿈합니다."""
+        self._metrics.set_font("CJK", "", size)
+        return self._metrics.multi_cell(
+            width, line_height, text, border=0, align="L", dry_run=True, output=MethodReturnValue.LINES
+        )
+
+    # ----- Layout calculation -----
+
+    def calculate_layout(self, n_chars: int) -> tuple[float, int]:
+        """
+        한자의 크기를 일정하게 유지하기 위해 고정된 레이아웃을 사용합니다.
+        셀 크기: 25mm, 줄당 글자 수: 7자
+        """
+        return 22.0, 8
+
+    def calculate_font_size(self, cell_size: float) -> float:
+        """셀 크기에 맞는 폰트 크기(pt)를 계산합니다."""
+        return cell_size * self.cfg.font_ratio * self.cfg.mm_to_pt
+
+    def _start_x(self, chars_in_line: int, cell_size: float) -> float:
+        """줄의 시작 x 좌표 (왼쪽 정렬)"""
+        return self.cfg.margin_left
+
+    def _fits(self, y: float, height: float) -> bool:
+        cfg = self.cfg
+        return y + height <= cfg.page_height - cfg.margin_bottom
+
+    # ----- Rows -----
+
+    def original_row(
+        self, pages: list[list], chars: list[str], interpretation: str,
+        cell_size: float, chars_per_line: int, y_start: float,
+        reading: str = "",
+        sounds: list[str] = None,
+    ) -> float:
+        """
+        Row 1: 진한 원문 글자 + 음독 + 한글 해석 (간격 및 레이아웃 최적화)
+        """
+        cfg = self.cfg
+        items = pages[-1]
+        font_size = self.calculate_font_size(cell_size)
+        y = y_start
+
+        row_height = cell_size + (cfg.meaning_height if cfg.show_meaning else 0)
+        if not sounds:
+            sounds = [None] * len(chars)
+
+        # 구절 전체의 훈음을 한 번에 조회
+        if cfg.show_meaning:
+            with stage("dictionary"):
+                meanings = get_hanja_meanings(chars, sounds)
+        else:
+            meanings = [""] * len(chars)
+
+        for start in range(0, len(chars), chars_per_line):
+            line_chars = chars[start:start + chars_per_line]
+            x = self._start_x(len(line_chars), cell_size)
+            for ch, meaning in zip(line_chars, meanings[start:start + chars_per_line]):
+                # 1. Original Hanja
+                items.append(Glyph(
+                    x + (cell_size - self.string_width(ch, font_size)) / 2,
+                    y + cell_size * 0.82,
+                    ch, font_size, cfg.color_original,
+                ))
+
+                # 2. Meaning below
+                if meaning:
+                    m_size = 7
+                    m_width = self.string_width(meaning, m_size)
+                    if m_width > cell_size + 2:
+                        m_size = 5
+                        m_width = self.string_width(meaning, m_size)
+                    items.append(Glyph(
+                        x + (cell_size - m_width) / 2,
+                        y + cell_size + cfg.meaning_height * 0.7,
+                        meaning, m_size, cfg.color_interpretation,
+                    ))
+                x += cell_size
+            y += row_height
+
+        # --- 음독 및 해석 간격 조정 ---
+        y += 2
+        text_x = cfg.margin_left + 1
+
+        # 3. Reading (음독)
+        if reading:
+            items.append(TextCell(
+                text_x, y, cfg.page_width - cfg.margin_right - text_x, 8, reading, 10, cfg.color_original,
+            ))
+            y += 8
+
+        # 4. Interpretation (해석)
+        width = cfg.usable_width - 2
+        for line in self.wrap_lines(interpretation, width, 5, 9):
+            items.append(TextCell(text_x, y, width, 5, line, 9, cfg.color_interpretation))
+            y += 5
+        y += 4
+
+        return y
+
+    def ghost_row(
+        self, pages: list[list], chars: list[str], cell_size: float,
+        chars_per_line: int, y_start: float,
+    ) -> float:
+        """
+        Row 2: 연한 회색 글자 + 격자 + 훈음 쓰기 빈 칸
+        """
+        cfg = self.cfg
+        font_size = self.calculate_font_size(cell_size)
+        y = y_start
+        row_height = cell_size + cfg.meaning_box_height
+        n_rows = -(-len(chars) // chars_per_line)
+        if not self._fits(y, n_rows * row_height):
+            pages.append([])
+            y = cfg.margin_top
+
+        items = pages[-1]
+        for start in range(0, len(chars), chars_per_line):
+            line_chars = chars[start:start + chars_per_line]
+            x = self._start_x(len(line_chars), cell_size)
+            for ch in line_chars:
+                items.append(GridCell(x, y, cell_size))
+                items.append(Glyph(
+                    x + (cell_size - self.string_width(ch, font_size)) / 2,
+                    y + cell_size * 0.82,
+                    ch, font_size, cfg.color_ghost,
+                ))
+                x += cell_size
+            y += row_height
+        return y
+
+    def practice_row(
+        self, pages: list[list], n_chars: int, cell_size: float,
+        chars_per_line: int, y_start: float,
+    ) -> float:
+        """
+        Row 3: 빈 격자 + 훈음 쓰기 빈 칸
+        """
+        cfg = self.cfg
+        y = y_start
+        row_height = cell_size + cfg.meaning_box_height
+        n_rows = -(-n_chars // chars_per_line)
+        if not self._fits(y, n_rows * row_height):
+            pages.append([])
+            y = cfg.margin_top
+
+        items = pages[-1]
+        remaining = n_chars
+        for _ in range(n_rows):
+            n_in_line = min(remaining, chars_per_line)
+            x = self._start_x(n_in_line, cell_size)
+            for _ in range(n_in_line):
+                items.append(GridCell(x, y, cell_size))
+                x += cell_size
+            remaining -= n_in_line
+            y += row_height
+        return y
+
+    def interp_practice(self, pages: list[list], y_start: float) -> float:
+        """해석 필사 라인"""
+        cfg = self.cfg
+        y = y_start
+        needed_h = cfg.interp_practice_lines * cfg.interp_practice_height
+        if not self._fits(y, needed_h):
+            pages.append([])
+            y = cfg.margin_top
+        items = pages[-1]
+        items.append(Glyph(cfg.margin_left, y + 4, "[해석 필사]", 7, cfg.color_label))
+        y += 6
+        for _ in range(cfg.interp_practice_lines):
+            y += cfg.interp_practice_height
+            items.append(Rule(cfg.margin_left, y, cfg.page_width - cfg.margin_right, y, cfg.color_border, 0.2))
+        return y
+
+    # ----- Passage -----
+
+    def plan_passage(self, passage) -> PassagePlan:
+        """구절의 레이아웃 계획을 반환합니다. 같은 입력의 계획은 캐시에서 재사용합니다."""
+        key = self._cache_prefix + (
+            passage.label, passage.original, passage.interpretation, passage.reading,
+            get_chars_dictionary_version(passage.original),
+        )
+        with _plan_cache_lock:
+            plan = _plan_cache.get(key)
+            if plan is not None:
+                _plan_cache.move_to_end(key)
+                _plan_cache_stats["hits"] += 1
+                return plan
+            _plan_cache_stats["misses"] += 1
+
+        plan = self.build_plan(passage)
+        with _plan_cache_lock:
+            _plan_cache[key] = plan
+            while len(_plan_cache) > PLAN_CACHE_SIZE:
+                _plan_cache.popitem(last=False)
+        return plan
+
+    def build_plan(self, passage) -> PassagePlan:
+        """캐시를 거치지 않고 구절의 레이아웃을 계산합니다. (구절마다 새 페이지에서 시작)"""
+        cfg = self.cfg
+        chars = list(passage.original)
+        n = len(chars)
+        cell_size, cpl = self.calculate_layout(n)
+
+        sounds = passage_sounds(passage)
+
+        pages: list[list] = [[]]
+        y = cfg.margin_top
+        pages[-1].append(Glyph(cfg.margin_left, y + cfg.label_height * 0.65, passage.label, 9, cfg.color_label))
+        y += cfg.label_height
+
+        y = self.original_row(pages, chars, passage.interpretation, cell_size, cpl, y, reading=passage.reading, sounds=sounds)
+        y += cfg.row_gap
+        y = self.ghost_row(pages, chars, cell_size, cpl, y)
+        y += cfg.row_gap
+        y = self.practice_row(pages, n, cell_size, cpl, y)
+        y += cfg.row_gap
+        y = self.interp_practice(pages, y)
+
+        return PassagePlan(label=passage.label, pages=tuple(tuple(page) for page in pages))
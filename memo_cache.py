@@ -0,0 +1,73 @@
+"""
+프레임워크 독립 메모이제이션 캐시 모듈
+
+`@st.cache_data` 대신 사용하는 프로세스 전역 캐시입니다. Streamlit 없이도 동작하므로
+CLI와 텔레그램 봇이 Streamlit을 import하지 않아도 됩니다.
+
+    @memoize
+    def load_data(): ...
+
+    load_data.clear()            # 이 함수의 캐시 전체 무효화
+    load_data.invalidate()       # 특정 인자 조합만 무효화 (인자 없이 호출하면 인자 없는 결과)
+    clear_all_caches()           # 등록된 모든 캐시 무효화
+
+반환값은 호출자 간에 공유되므로 수정하지 마세요.
+"""
+import functools
+import threading
+from typing import Callable
+
+_registry: list = []
+_registry_lock = threading.Lock()
+
+
+def _make_key(args: tuple, kwargs: dict):
+    if kwargs:
+        return args, tuple(sorted(kwargs.items()))
+    return args
+
+
+def memoize(fn: Callable) -> Callable:
+    """인자별로 결과를 기억하는 데코레이터 (스레드 안전)"""
+    results: dict = {}
+    lock = threading.Lock()
+    # 계산 도중 무효화되면 오래된 결과를 저장하지 않도록 세대 번호를 둡니다.
+    generation = [0]
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = _make_key(args, kwargs)
+        try:
+            return results[key]
+        except KeyError:
+            pass
+        started = generation[0]
+        value = fn(*args, **kwargs)
+        with lock:
+            if generation[0] == started:
+                results[key] = value
+        return value
+
+    def clear():
+        with lock:
+            results.clear()
+            generation[0] += 1
+
+    def invalidate(*args, **kwargs):
+        with lock:
+            results.pop(_make_key(args, kwargs), None)
+            generation[0] += 1
+
+    wrapper.clear = clear
+    wrapper.invalidate = invalidate
+    with _registry_lock:
+        _registry.append(wrapper)
+    return wrapper
+
+
+def clear_all_caches() -> None:
+    """@memoize 로 등록된 모든 함수의 캐시를 비웁니다."""
+    with _registry_lock:
+        wrappers = list(_registry)
+    for wrapper in wrappers:
+        wrapper.clear()
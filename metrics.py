@@ -0,0 +1,413 @@
+"""
+단계별 처리 시간 지표 모듈 (Prometheus 텍스트 형식)
+
+봇과 웹 앱이 요청을 처리하는 단계별 시간, 요청 수와 결과, 오류 수, 대기열 길이, 캐시 적중률을
+프로세스 안에 모아 두고 `/metrics`로 내보냅니다. 외부 패키지 없이 동작합니다.
+
+단계 이름 (STAGES):
+    parse            텍스트 → 구절 목록
+    dictionary       훈음 조회 (render 안에서 측정되며 render 시간에 포함)
+    render           구절 렌더링 (레이아웃 계획 + fpdf 호출, 페이지 캐시 포함)
+    output           pdf.output() (폰트 서브셋 + 직렬화)
+    rasterize        PDF → 미리보기 이미지
+    telegram_upload  텔레그램 미리보기/PDF 전송
+    add_log          출석 기록 추가 (로컬 기록 + 동기화 예약)
+    git_sync         백그라운드 Git 커밋/푸시 (git_sync.py 작업자 스레드)
+
+측정 방법:
+    with collect_stages("app") as timings:   # 요청 하나의 단계 시간을 모음 (끝날 때 지표에 반영)
+        with stage("parse"):
+            ...
+
+봇의 렌더링은 워커 프로세스에서 실행되므로 워커는 collect_stages(None)으로 모으기만 하고,
+결과(RenderResult.stage_seconds)를 받은 메인 프로세스가 observe_stages()로 반영합니다.
+모으는 중이 아닐 때 stage()는 바로 지표에 반영합니다 (source는 set_default_source()로 정함).
+
+    start_metrics_server(9108)   # http://127.0.0.1:9108/metrics
+"""
+import json
+import logging
+import math
+import threading
+import time
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable, Optional
+
+STAGES = ("parse", "dictionary", "render", "output", "rasterize", "telegram_upload", "add_log", "git_sync")
+
+# 초 단위 히스토그램 경계 (5ms ~ 60s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger("metrics")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ---------------------------------------------------------------------------
+# Metric types
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블은 {self.labelnames} 이어야 합니다 ({tuple(labels)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.collect()]
+
+
+class Counter(_Metric):
+    """증가만 하는 값"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """관측값 분포 (누적 버킷 + 합계 + 개수)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}  # 레이블 → [버킷별 개수..., 합계, 개수]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[-1] if entry else 0
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, entry in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, entry):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf)} {entry[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {entry[-1]}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    내보낼 때마다 fn()으로 값을 읽는 지표 (대기열 길이, 캐시 적중률 등).
+    레이블이 없으면 fn()은 숫자를, 있으면 {레이블 값 튜플: 숫자}를 반환합니다.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable, labelnames: tuple = (), kind: str = "gauge"):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def collect(self) -> list[str]:
+        try:
+            values = self.fn()
+        except Exception as e:
+            logger.warning(f"{self.name} 값을 읽지 못했습니다: {e}")
+            return []
+        if not self.labelnames:
+            values = {(): values}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, tuple(map(str, k)))} {_format_value(v)}"
+            for k, v in sorted(values.items())
+        ]
+
+
+class MetricsRegistry:
+    """이름별 지표 모음. 같은 이름으로 다시 등록하면 기존 지표를 반환합니다 (Streamlit rerun 대비)."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, factory: Callable[[], _Metric]) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._register(name, lambda: Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, help: str, fn: Callable, labelnames: tuple = (), kind: str = "gauge") -> CallbackMetric:
+        """fn을 읽는 지표를 등록합니다. 이미 있으면 fn만 바꿉니다."""
+        metric = self._register(name, lambda: CallbackMetric(name, help, fn, labelnames, kind))
+        metric.fn = fn
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """프로세스 전역 지표 모음을 반환합니다."""
+    return _registry
+
+
+STAGE_SECONDS = _registry.histogram(
+    "analects_stage_seconds", "Time spent in each processing stage", ("source", "stage"))
+STAGE_ERRORS = _registry.counter(
+    "analects_stage_errors_total", "Exceptions raised inside a processing stage", ("source", "stage"))
+REQUESTS = _registry.counter(
+    "analects_requests_total", "Handled requests by outcome", ("source", "outcome"))
+REQUEST_SECONDS = _registry.histogram(
+    "analects_request_seconds", "End-to-end request latency", ("source",))
+FIRST_IMAGE_SECONDS = _registry.histogram(
+    "analects_first_image_seconds", "Time from request to the first preview image being sent", ("source",))
+TELEGRAM_SENDS = _registry.counter(
+    "analects_telegram_sends_total", "Telegram photo/document sends by how the file was sent", ("kind", "via"))
+TELEGRAM_UPLOAD_BYTES = _registry.counter(
+    "analects_telegram_upload_bytes_total", "Bytes uploaded to Telegram (file_id resends upload nothing)", ("kind",))
+
+
+# ---------------------------------------------------------------------------
+# Stage timing
+# ---------------------------------------------------------------------------
+
+class StageTimings(dict):
+    """요청 하나의 단계 이름 → 누적 시간(초). 같은 단계가 여러 번 실행되면 더합니다."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors: list[str] = []
+
+    def merge(self, seconds: dict) -> None:
+        """다른 곳(워커 프로세스)에서 잰 단계 시간을 더합니다."""
+        for name, value in seconds.items():
+            self[name] = self.get(name, 0.0) + value
+
+
+_collecting: ContextVar[Optional[StageTimings]] = ContextVar("analects_stage_timings", default=None)
+_default_source = "main"
+
+
+def set_default_source(source: str) -> None:
+    """모으는 중이 아닐 때 stage()가 쓰는 source 레이블 (예: "bot", "app")"""
+    global _default_source
+    _default_source = source
+
+
+class stage:
+    """
+    블록의 실행 시간을 단계 시간으로 기록하는 컨텍스트 관리자.
+    블록에서 예외가 나면 오류로 세고, 예외에 metrics_stage 속성(가장 안쪽 단계 이름)을 붙입니다.
+    """
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        inner = exc is not None and getattr(exc, "metrics_stage", None) is None
+        if inner:
+            try:
+                exc.metrics_stage = self.name
+            except AttributeError:
+                pass
+        timings = _collecting.get()
+        if timings is not None:
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed
+            if inner:
+                timings.errors.append(self.name)
+        else:
+            STAGE_SECONDS.observe(elapsed, source=_default_source, stage=self.name)
+            if inner:
+                STAGE_ERRORS.inc(source=_default_source, stage=self.name)
+        return False
+
+
+class collect_stages:
+    """
+    블록 안의 stage() 시간을 StageTimings로 모읍니다.
+    source를 주면 블록이 끝날 때 (예외가 나도) observe_stages(source, ...)로 지표에 반영합니다.
+    """
+
+    def __init__(self, source: Optional[str] = None):
+        self.source = source
+        self.timings = StageTimings()
+
+    def __enter__(self) -> StageTimings:
+        self._token = _collecting.set(self.timings)
+        return self.timings
+
+    def __exit__(self, exc_type, exc, tb):
+        _collecting.reset(self._token)
+        if self.source is not None:
+            observe_stages(self.source, self.timings, self.timings.errors)
+        return False
+
+
+def observe_stages(source: str, seconds: dict, errors: Iterable[str] = ()) -> None:
+    """모은 단계 시간과 오류를 지표에 반영합니다."""
+    for name, value in seconds.items():
+        STAGE_SECONDS.observe(value, source=source, stage=name)
+    for name in errors:
+        STAGE_ERRORS.inc(source=source, stage=name)
+
+
+def record_request(source: str, outcome: str, seconds: float, stages: Optional[dict] = None, **fields) -> None:
+    """요청 하나의 결과와 전체 시간을 지표에 반영하고, 단계별 시간을 JSON 한 줄로 로그에 남깁니다."""
+    REQUESTS.inc(source=source, outcome=outcome)
+    REQUEST_SECONDS.observe(seconds, source=source)
+    entry = {
+        "source": source,
+        "outcome": outcome,
+        "ms": round(seconds * 1000, 1),
+        "stages_ms": {name: round(value * 1000, 1) for name, value in (stages or {}).items()},
+        **fields,
+    }
+    logger.info(json.dumps(entry, ensure_ascii=False))
+
+
+def register_default_metrics() -> None:
+    """노트/페이지 캐시 적중률, Git 동기화 대기열, 프로세스 RSS 지표를 등록합니다. (봇과 웹 앱이 시작할 때 호출)"""
+    from git_sync import get_sync_worker
+    from notebook_cache import get_notebook_cache
+    from page_cache import get_page_cache
+    from session_store import process_rss_bytes
+
+    def caches() -> dict:
+        return {"notebook": get_notebook_cache().stats(), "page": get_page_cache().stats()}
+
+    _registry.callback(
+        "analects_cache_hits_total", "Cache lookups that found an entry",
+        lambda: {(name,): s["hits"] for name, s in caches().items()}, ("cache",), kind="counter")
+    _registry.callback(
+        "analects_cache_misses_total", "Cache lookups that found nothing",
+        lambda: {(name,): s["misses"] for name, s in caches().items()}, ("cache",), kind="counter")
+    _registry.callback(
+        "analects_cache_hit_ratio", "Cache hit ratio since process start",
+        lambda: {(name,): s["hit_rate"] for name, s in caches().items()}, ("cache",))
+    _registry.callback(
+        "analects_git_sync_queue_depth", "Attendance updates waiting to be pushed",
+        lambda: get_sync_worker().queue_depth)
+    _registry.callback(
+        "analects_git_sync_consecutive_failures", "Consecutive failed Git sync attempts",
+        lambda: get_sync_worker().status().failures)
+    _registry.callback(
+        "analects_process_resident_bytes", "Resident memory (RSS) of this process",
+        lambda: process_rss_bytes() or 0)
+
+
+# ---------------------------------------------------------------------------
+# HTTP endpoint
+# ---------------------------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = _registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_servers: dict[tuple, ThreadingHTTPServer] = {}
+_servers_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """
+    /metrics를 내보내는 HTTP 서버를 백그라운드 스레드로 시작합니다. 같은 주소로 다시 호출하면 기존 서버를 반환합니다.
+    port가 0 이하이거나 포트를 열 수 없으면 None을 반환합니다.
+    """
+    if port <= 0:
+        return None
+    with _servers_lock:
+        server = _servers.get((host, port))
+        if server is None:
+            try:
+                server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.warning(f"지표 서버를 시작하지 못했습니다 ({host}:{port}): {e}")
+                return None
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            _servers[(host, port)] = server
+        return server
@@ -0,0 +1,175 @@
+"""
+Poppler 없이 레이아웃 계획을 바로 이미지로 그리는 미리보기 모듈
+
+PDF를 만들어 pdftoppm으로 다시 래스터화하는 대신, AnalectsTracingPDF가 fpdf로 옮기는 것과 같은
+레이아웃 계획(layout_plan.PassagePlan)을 Pillow로 직접 그립니다. 페이지 크기와 좌표는 Config와
+계획에 모두 들어 있으므로 PDF 없이도 같은 페이지가 나옵니다.
+
+- 첫 페이지 미리보기는 첫 구절의 계획만 있으면 되므로 PDF 생성과 poppler 프로세스가 모두 필요 없습니다.
+- 글자는 fpdf와 같은 위치 규칙(text()의 기준선, cell()의 왼쪽 여백과 세로 가운데)으로 찍습니다.
+- 선은 PDF처럼 경로 가운데를 기준으로 그리고, 점선은 선의 시작점부터 (선 길이, 간격)을 반복합니다.
+- 글자와 선의 안티에일리어싱 방식이 poppler와 달라 가장자리 픽셀은 조금 다릅니다.
+  (tests/native_preview_test.py가 pdftoppm 결과와 픽셀 차이를 비교합니다)
+
+PREVIEW_BACKEND=poppler이면 봇과 웹 앱은 기존 preview.py(pdftoppm) 경로를 씁니다.
+"""
+import math
+import os
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from layout_plan import Glyph, GridCell, LayoutPlanner, Rule, TextCell
+from preview import DEFAULT_DPI, PreviewConfig, encode_image
+
+PREVIEW_BACKEND = os.getenv("PREVIEW_BACKEND", "native")  # native | poppler
+
+MM_PER_INCH = 25.4
+PT_PER_INCH = 72.0
+CELL_MARGIN = 1.0  # fpdf cell()의 왼쪽 여백 (mm, 기본 여백 10mm의 1/10)
+
+_WHITE = (255, 255, 255)
+
+
+@lru_cache(maxsize=64)
+def _font(font_path: str, size_px: float) -> ImageFont.FreeTypeFont:
+    """(폰트, 픽셀 크기)별로 FreeType 폰트를 한 번만 엽니다."""
+    return ImageFont.truetype(font_path, size_px)
+
+
+class PlanRasterizer:
+    """레이아웃 계획의 한 페이지를 dpi 해상도의 RGB 이미지로 그립니다."""
+
+    def __init__(self, config, font_path: str, dpi: int = DEFAULT_DPI):
+        self.cfg = config
+        self.font_path = font_path
+        self.dpi = dpi
+        self.scale = dpi / MM_PER_INCH  # mm → px
+        # pdftoppm과 같이 올림 (A4 100 DPI → 827 × 1170)
+        self.size = (math.ceil(config.page_width * self.scale), math.ceil(config.page_height * self.scale))
+
+    def _px(self, mm: float) -> float:
+        return mm * self.scale
+
+    def _width(self, mm: float) -> int:
+        return max(1, round(mm * self.scale))
+
+    def _text_font(self, size_pt: float) -> ImageFont.FreeTypeFont:
+        return _font(self.font_path, size_pt * self.dpi / PT_PER_INCH)
+
+    # ----- Primitives -----
+
+    def _line(self, draw: ImageDraw.ImageDraw, x1: float, y1: float, x2: float, y2: float, color: tuple, width: float):
+        draw.line((self._px(x1), self._px(y1), self._px(x2), self._px(y2)), fill=color, width=self._width(width))
+
+    def _dashed_line(self, draw, x1: float, y1: float, x2: float, y2: float, color: tuple, width: float):
+        """수평/수직 점선 (PDF의 `[dash gap] 0 d`와 같이 시작점부터 반복)"""
+        cfg = self.cfg
+        length = abs(x2 - x1) + abs(y2 - y1)
+        dx, dy = (x2 - x1) / length, (y2 - y1) / length
+        pos = 0.0
+        while pos < length:
+            end = min(pos + cfg.dash_length, length)
+            self._line(draw, x1 + dx * pos, y1 + dy * pos, x1 + dx * end, y1 + dy * end, color, width)
+            pos += cfg.dash_length + cfg.dash_gap
+
+    def _rect(self, draw, x: float, y: float, w: float, h: float, color: tuple, width: float):
+        """테두리만 있는 사각형. 선 굵기의 절반씩 안팎으로 걸치게 그립니다."""
+        half = self._width(width) / 2
+        draw.rectangle(
+            (self._px(x) - half, self._px(y) - half, self._px(x + w) + half - 1, self._px(y + h) + half - 1),
+            outline=color, width=self._width(width),
+        )
+
+    def _grid_cell(self, draw, cell: GridCell):
+        """draw_grid_cell + draw_meaning_box (셀 템플릿과 같은 그림)"""
+        cfg = self.cfg
+        x, y, size = cell.x, cell.y, cell.size
+        mid_x, mid_y = x + size / 2, y + size / 2
+        self._dashed_line(draw, x, mid_y, x + size, mid_y, cfg.color_cross, cfg.dash_width)
+        self._dashed_line(draw, mid_x, y, mid_x, y + size, cfg.color_cross, cfg.dash_width)
+        self._rect(draw, x, y, size, size, cfg.color_border, cfg.border_width)
+        self._rect(draw, x, y + size, size, cfg.meaning_box_height, cfg.color_meaning_box, 0.2)
+
+    def _glyph(self, draw, item: Glyph):
+        """fpdf text(): (x, y)가 기준선의 왼쪽 끝"""
+        draw.text((self._px(item.x), self._px(item.y)), item.text, fill=item.color,
+                  font=self._text_font(item.size), anchor="ls")
+
+    def _text_cell(self, draw, item: TextCell):
+        """fpdf cell(align="L"): 왼쪽 여백 뒤, 기준선은 칸 가운데 + 글자 크기의 0.3배"""
+        baseline = item.y + 0.5 * item.h + 0.3 * item.size * MM_PER_INCH / PT_PER_INCH
+        draw.text((self._px(item.x + CELL_MARGIN), self._px(baseline)), item.text, fill=item.color,
+                  font=self._text_font(item.size), anchor="ls")
+
+    # ----- Page -----
+
+    def render_page(self, items: Iterable) -> Image.Image:
+        """
+        계획의 한 페이지를 그립니다. emit_plan()과 같이 격자 셀을 먼저 그리고
+        나머지 항목은 계획 순서대로 그립니다.
+        """
+        items = list(items)
+        image = Image.new("RGB", self.size, _WHITE)
+        draw = ImageDraw.Draw(image)
+        for item in items:
+            if isinstance(item, GridCell):
+                self._grid_cell(draw, item)
+        for item in items:
+            if isinstance(item, Glyph):
+                self._glyph(draw, item)
+            elif isinstance(item, TextCell):
+                self._text_cell(draw, item)
+            elif isinstance(item, Rule):
+                self._line(draw, item.x1, item.y1, item.x2, item.y2, item.color, item.width)
+            elif not isinstance(item, GridCell):
+                raise TypeError(f"알 수 없는 레이아웃 항목: {item!r}")
+        return image
+
+
+def plan_pages(passages, config, font_path: str, limit: Optional[int] = None) -> list[tuple]:
+    """
+    노트 전체의 페이지 목록 (페이지마다 그리기 항목). PDF와 같은 순서입니다.
+    limit을 주면 그 페이지 수까지만 계획합니다. (구절마다 새 페이지에서 시작하므로 앞 구절만 계획)
+    """
+    planner = LayoutPlanner(config, font_path)
+    pages = []
+    for passage in passages:
+        pages.extend(planner.plan_passage(passage).pages)
+        if limit is not None and len(pages) >= limit:
+            return pages[:limit]
+    return pages
+
+
+def rasterize_plan_pages(
+    passages, config, font_path: str, pages: Optional[Iterable[int]] = None, dpi: int = DEFAULT_DPI,
+) -> dict[int, Image.Image]:
+    """preview.rasterize_pages()와 같은 형태로 {페이지 번호: PIL 이미지}를 반환합니다. (PDF 불필요)"""
+    wanted = None if pages is None else sorted(set(pages))
+    plan = plan_pages(passages, config, font_path, limit=wanted[-1] if wanted else None)
+    if wanted is None:
+        wanted = range(1, len(plan) + 1)
+    rasterizer = PlanRasterizer(config, font_path, dpi)
+    return {page: rasterizer.render_page(plan[page - 1]) for page in wanted if 1 <= page <= len(plan)}
+
+
+def render_plan_previews(
+    passages, config, font_path: str,
+    pages: Optional[Iterable[int]] = None,
+    preview_config: Optional[PreviewConfig] = None,
+    thumbnail: bool = False,
+) -> dict[int, bytes]:
+    """preview.render_previews()의 PDF 없는 버전: 지정한 페이지를 설정에 맞는 DPI/형식의 바이트로 반환합니다."""
+    cfg = preview_config or PreviewConfig()
+    dpi = cfg.thumbnail_dpi if thumbnail else cfg.dpi
+    images = rasterize_plan_pages(passages, config, font_path, pages, dpi)
+    return {page: encode_image(image, cfg.fmt, cfg.quality) for page, image in images.items()}
+
+
+def render_plan_png(passages, config, font_path: str, page: int = 1, dpi: int = DEFAULT_DPI) -> bytes:
+    """preview.render_preview_png()의 PDF 없는 버전: 노트의 한 페이지를 PNG 바이트로 렌더링합니다."""
+    images = rasterize_plan_pages(passages, config, font_path, [page], dpi)
+    if page not in images:
+        raise RuntimeError(f"미리보기 생성 실패: {page} 페이지")
+    return encode_image(images[page], "png")
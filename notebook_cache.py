@@ -0,0 +1,192 @@
+"""
+완성된 필사 노트(PDF + 미리보기) 디스크 캐시 모듈
+
+같은 입력으로 만든 PDF는 항상 같으므로, 입력 전체의 해시를 키로 결과를 저장해 재사용합니다.
+키 구성: 정규화된 구절 목록 + Config 필드 + 폰트 파일 해시 + 본문 폰트(축소 폰트) 해시 + 노트에 쓰인 글자의 사용자 사전 항목 + 캐시 형식 버전
+(노트에 없는 글자의 훈음을 고쳐도 키가 바뀌지 않습니다)
+
+저장 구조: <root>/<key[:2]>/<key>/<name>
+전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목(디렉토리 mtime 기준)부터 지웁니다.
+정리는 디렉토리 전체를 훑으므로 저장할 때마다 하지 않고, 이 프로세스가 쓴 양이 한도의 1/20을 넘을 때마다
+(그리고 처음 저장할 때) 합니다. 따라서 전체 크기는 프로세스마다 최대 max_bytes/20만큼 한도를 넘을 수 있습니다.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import unicodedata
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from analects_tracing import Config, PassageData
+from font_registry import get_font_registry
+from font_subset import find_compact_font
+from hanja_dictionary import get_chars_dictionary_version
+
+# 렌더링 결과가 바뀌는 코드 변경 시 올려서 기존 캐시를 무효화합니다.
+CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.getenv("NOTEBOOK_CACHE_DIR", ".cache/notebooks")
+DEFAULT_MAX_BYTES = int(os.getenv("NOTEBOOK_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+PDF_NAME = "notebook.pdf"
+
+
+def preview_name(page: int, dpi: int, fmt: str) -> str:
+    """미리보기 이미지의 캐시 항목 이름"""
+    return f"preview-p{page}-{dpi}dpi.{fmt}"
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text.strip())
+
+
+def notebook_key(
+    passages: Iterable[PassageData], config: Config, font_path: str, text_font_path: Optional[str] = None,
+) -> str:
+    """
+    입력 전체를 대표하는 캐시 키(SHA-256 hex)를 계산합니다.
+    text_font_path는 본문에 쓰일 폰트이며, 없으면 AnalectsTracingPDF와 같은 규칙으로 고릅니다.
+    (use_compact_font이면 최신 축소 폰트, 아니면 원본) 축소 폰트를 다시 빌드하면 키가 바뀝니다.
+    """
+    passages = list(passages)
+    if text_font_path is None:
+        text_font_path = (find_compact_font(font_path) if config.use_compact_font else None) or font_path
+    payload = {
+        "format": CACHE_FORMAT_VERSION,
+        "passages": [
+            {
+                "label": _normalize(p.label),
+                "original": _normalize(p.original),
+                "interpretation": _normalize(p.interpretation),
+                "reading": _normalize(p.reading),
+            }
+            for p in passages
+        ],
+        "config": asdict(config),
+        "font": get_font_registry().digest(font_path),
+        "text_font": get_font_registry().digest(text_font_path),
+        "dictionary": get_chars_dictionary_version({ch for p in passages for ch in p.original}),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class NotebookCache:
+    """크기 제한이 있는 LRU 디스크 캐시. 여러 프로세스가 같은 디렉토리를 공유해도 안전합니다."""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._evict_every = max(1, max_bytes // 20)
+        self._written = self._evict_every  # 처음 저장할 때 한 번 정리 (이전 실행에서 남은 항목)
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str, name: str) -> Optional[bytes]:
+        """저장된 바이트를 반환합니다. 없으면 None (적중/실패 횟수를 기록)."""
+        entry = self._entry_dir(key)
+        try:
+            data = (entry / name).read_bytes()
+            os.utime(entry)  # LRU: 최근 사용 시각 갱신
+        except OSError:
+            self.record(misses=1)
+            return None
+        self.record(hits=1)
+        return data
+
+    def put(self, key: str, name: str, data: bytes) -> None:
+        """바이트를 저장하고, 쓴 양이 정리 간격을 넘었으면 크기 제한에 맞게 오래된 항목을 지웁니다."""
+        entry = self._entry_dir(key)
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            tmp = entry / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, entry / name)  # 원자적 교체: 읽는 쪽은 반쯤 쓴 파일을 보지 않음
+            os.utime(entry)
+        except OSError as e:
+            # 캐시는 최선 노력(best-effort): 저장 실패가 요청 실패로 이어지지 않게 합니다.
+            print(f"노트 캐시 저장 실패: {e}")
+            return
+        with self._lock:
+            self._written += len(data)
+            due = self._written >= self._evict_every
+            if due:
+                self._written = 0
+        if due:
+            self.evict()
+
+    def peek(self, key: str, name: str) -> Optional[bytes]:
+        """적중 기록과 최근 사용 시각 갱신 없이 저장된 바이트를 읽습니다."""
+        try:
+            return (self._entry_dir(key) / name).read_bytes()
+        except OSError:
+            return None
+
+    def keys(self) -> list[str]:
+        return [entry.name for _, _, entry in self._entries()]
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def record(self, hits: int = 0, misses: int = 0) -> None:
+        """적중/실패 횟수를 더합니다. (워커 프로세스에서 조회한 결과를 합산할 때도 사용)"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        if not self.root.exists():
+            return entries
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir():
+                continue
+            for entry in bucket.iterdir():
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                except OSError:
+                    continue  # 다른 프로세스가 지우는 중
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래된 항목부터 지웁니다."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_cache: Optional[NotebookCache] = None
+
+
+def get_notebook_cache() -> NotebookCache:
+    """프로세스 전역 캐시 인스턴스를 반환합니다."""
+    global _cache
+    if _cache is None:
+        _cache = NotebookCache()
+    return _cache
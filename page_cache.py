@@ -0,0 +1,225 @@
+"""
+구절 단위 렌더링 페이지 캐시 모듈
+
+학이편 1-1처럼 자주 쓰이는 구절은 사용자와 노트 구성이 달라도 같은 페이지로 렌더링됩니다.
+노트 전체가 아니라 구절 하나가 만든 페이지를 저장해 두고, 노트를 만들 때 캐시된 구절은
+페이지를 그대로 붙이고 캐시에 없는 구절만 렌더링합니다.
+
+키 구성: 정규화된 구절 + Config 필드 + 폰트 파일 해시(원본, 본문용 축소 폰트) + 구절 글자에 해당하는 사용자 사전 항목의 해시
+- 사용자 사전 전체가 아니라 구절이 쓰는 글자의 항목만 키에 들어가므로,
+  한 글자의 훈음을 고쳐도 그 글자를 쓰지 않는 구절의 캐시는 그대로 적중합니다.
+- save_custom_meaning()이 훈음을 바꾸면 그 글자를 쓰는 구절의 항목을 바로 지웁니다.
+
+텍스트는 문서마다 다른 폰트 서브셋 번호 대신 유니코드로 바꿔 저장하고,
+붙일 때 현재 문서의 서브셋 번호로 다시 인코딩합니다.
+저장소는 NotebookCache(크기 제한 LRU 디스크 캐시)를 그대로 사용하므로 여러 프로세스가 공유합니다.
+"""
+import hashlib
+import json
+import os
+import re
+import unicodedata
+import zlib
+from dataclasses import asdict
+from typing import Optional
+
+from fpdf.util import escape_parens
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData, RawPage
+from font_registry import get_font_registry
+from hanja_dictionary import add_dictionary_listener, get_chars_dictionary_version
+from notebook_cache import NotebookCache
+
+# 페이지 내용이 바뀌는 코드 변경 시 올려서 기존 캐시를 무효화합니다.
+PAGE_CACHE_FORMAT_VERSION = 2
+
+DEFAULT_PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", ".cache/pages")
+DEFAULT_PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_MB", "128")) * 1024 * 1024
+
+PAGES_NAME = "pages.json.z"
+CHARS_NAME = "chars.txt"
+
+_TEXT_FONT_KEY = "cjk"  # emit_plan이 쓰는 폰트 (CJK, 보통 굵기)
+_TEXT_OP = re.compile(rb"\(((?:\\.|[^\\)])*)\) Tj")
+_ESCAPE = re.compile(rb"\\(.)", re.S)
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text.strip())
+
+
+def passage_chars(passage: PassageData) -> str:
+    """사용자 사전 변경이 영향을 주는 글자 (원문 글자와 그 NFKC 정규화 글자)"""
+    chars = set(passage.original)
+    chars.update(unicodedata.normalize("NFKC", ch) for ch in passage.original)
+    return "".join(sorted(chars))
+
+
+def passage_key(passage: PassageData, config: Config, font_path: str, text_font_path: Optional[str] = None) -> str:
+    """
+    구절 하나의 렌더링 결과를 대표하는 캐시 키(SHA-256 hex)를 계산합니다.
+    text_font_path는 본문에 실제로 쓰인 폰트(축소 폰트)이며, 없으면 font_path와 같다고 봅니다.
+    """
+    payload = {
+        "format": PAGE_CACHE_FORMAT_VERSION,
+        "passage": {
+            "label": _normalize(passage.label),
+            "original": _normalize(passage.original),
+            "interpretation": _normalize(passage.interpretation),
+            "reading": _normalize(passage.reading),
+        },
+        "config": asdict(config),
+        "font": get_font_registry().digest(font_path),
+        "text_font": get_font_registry().digest(text_font_path or font_path),
+        "dictionary": get_chars_dictionary_version(passage.original),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _unescape(raw: bytes) -> bytes:
+    return _ESCAPE.sub(lambda m: b"\r" if m.group(1) == b"r" else m.group(1), raw)
+
+
+def _to_unicode(contents: bytes, id_to_char: dict[int, str]) -> Optional[bytes]:
+    """텍스트 연산자의 서브셋 번호를 유니코드로 바꿉니다. 바꿀 수 없는 글리프가 있으면 None"""
+    try:
+        return _TEXT_OP.sub(
+            lambda m: b"(" + escape_parens(
+                "".join(id_to_char[ord(c)] for c in _unescape(m.group(1)).decode("utf-16-be")).encode("utf-16-be")
+            ) + b") Tj",
+            contents,
+        )
+    except (KeyError, UnicodeDecodeError):
+        return None
+
+
+def _from_unicode(contents: bytes, font) -> bytes:
+    """유니코드로 저장된 텍스트 연산자를 현재 문서의 서브셋 번호로 다시 인코딩합니다."""
+    return _TEXT_OP.sub(
+        lambda m: font.encode_text(_unescape(m.group(1)).decode("utf-16-be")).encode("latin-1"),
+        contents,
+    )
+
+
+class PageCache:
+    """구절별 페이지를 저장하는 크기 제한 LRU 디스크 캐시"""
+
+    def __init__(self, root: str = DEFAULT_PAGE_CACHE_DIR, max_bytes: int = DEFAULT_PAGE_CACHE_MAX_BYTES):
+        self.store = NotebookCache(root, max_bytes)
+
+    @property
+    def hits(self) -> int:
+        return self.store.hits
+
+    @property
+    def misses(self) -> int:
+        return self.store.misses
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+    def record(self, hits: int = 0, misses: int = 0) -> None:
+        """적중/실패 횟수를 더합니다. (워커 프로세스에서 조회한 결과를 합산할 때 사용)"""
+        self.store.record(hits, misses)
+
+    def load(self, key: str) -> Optional[tuple[list[RawPage], dict[int, float]]]:
+        """저장된 (페이지 목록, 템플릿 번호 → 셀 크기)를 반환합니다. 없으면 None"""
+        data = self.store.get(key, PAGES_NAME)
+        if data is None:
+            return None
+        try:
+            entry = json.loads(zlib.decompress(data))
+            pages = [
+                RawPage(p["contents"].encode("latin-1"), p["fonts"], p["xobjects"])
+                for p in entry["pages"]
+            ]
+            templates = {int(index): size for index, size in entry["templates"].items()}
+        except (ValueError, KeyError, zlib.error) as e:
+            print(f"페이지 캐시 항목 손상 ({key[:12]}): {e}")
+            return None
+        return pages, templates
+
+    def save(self, key: str, passage: PassageData, pages: list[RawPage], templates: dict[int, float]) -> None:
+        entry = {
+            "pages": [
+                {"contents": p.contents.decode("latin-1"), "fonts": p.fonts, "xobjects": p.xobjects}
+                for p in pages
+            ],
+            "templates": {str(index): size for index, size in templates.items()},
+        }
+        data = zlib.compress(json.dumps(entry).encode("utf-8"))
+        # 글자 목록을 먼저 써 두어야 무효화가 모든 항목을 찾을 수 있습니다.
+        self.store.put(key, CHARS_NAME, passage_chars(passage).encode("utf-8"))
+        self.store.put(key, PAGES_NAME, data)
+
+    def render_passage(self, generator: AnalectsTracingPDF, passage: PassageData) -> bool:
+        """
+        구절을 generator의 문서에 추가합니다. 캐시에 있으면 저장된 페이지를 붙이고,
+        없으면 렌더링한 뒤 그 페이지를 저장합니다. 캐시 적중 여부를 반환합니다.
+        """
+        font = generator.pdf.fonts[_TEXT_FONT_KEY]
+        key = passage_key(passage, generator.cfg, generator.font_path, generator.text_font_path)
+        cached = self.load(key)
+        if cached is not None:
+            pages, templates = cached
+            generator.import_pages(
+                [RawPage(_from_unicode(p.contents, font), p.fonts, p.xobjects) for p in pages],
+                templates,
+            )
+            return True
+
+        first = generator.pdf.page + 1
+        generator.emit_plan(generator.planner.plan_passage(passage))
+        pages = self._portable_pages(generator, first, font)
+        if pages is not None:
+            used = {index for page in pages for index in page.xobjects}
+            templates = {i: size for i, size in generator.template_sizes().items() if i in used}
+            self.save(key, passage, pages, templates)
+        return False
+
+    @staticmethod
+    def _portable_pages(generator: AnalectsTracingPDF, first: int, font) -> Optional[list[RawPage]]:
+        """방금 렌더링한 페이지를 다른 문서에 붙일 수 있는 형태로 바꿉니다. 옮길 수 없는 내용이면 None"""
+        id_to_char = {}
+        for glyph, char_id in font.subset.items():
+            # 예약 글리프(.notdef, 공백)는 유니코드가 (코드,) 튜플로 들어 있습니다.
+            unicode = glyph.unicode if isinstance(glyph.unicode, tuple) else (glyph.unicode,)
+            if len(unicode) == 1:
+                id_to_char[char_id] = chr(unicode[0])
+        pages = []
+        for page in generator.export_pages(first):
+            # 다른 폰트나 글자 간격 조정(TJ)이 쓰인 페이지는 저장하지 않습니다.
+            if any(index != font.i for index in page.fonts) or b" TJ" in page.contents:
+                return None
+            contents = _to_unicode(page.contents, id_to_char)
+            if contents is None:
+                return None
+            pages.append(RawPage(contents, page.fonts, page.xobjects))
+        return pages
+
+    def invalidate_chars(self, chars) -> int:
+        """주어진 글자 중 하나라도 쓰는 구절의 항목을 지우고 지운 개수를 반환합니다."""
+        chars = set(chars)
+        removed = 0
+        for key in self.store.keys():
+            used = self.store.peek(key, CHARS_NAME)
+            if used is not None and chars & set(used.decode("utf-8")):
+                self.store.remove(key)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> PageCache:
+    """프로세스 전역 페이지 캐시를 반환합니다. 사용자 사전이 바뀌면 해당 글자를 쓰는 항목을 지웁니다."""
+    global _cache
+    if _cache is None:
+        _cache = PageCache()
+        add_dictionary_listener(_cache.invalidate_chars)
+    return _cache
@@ -0,0 +1,137 @@
+"""
+여러 프로세스로 큰 노트를 나눠 렌더링하고 페이지 단위로 합치는 모듈
+
+구절마다 새 페이지에서 시작하므로 구절은 서로 독립적인 작업 단위입니다.
+연속된 구절 묶음(shard)을 워커 프로세스가 각각 부분 문서로 렌더링하고,
+메인 프로세스가 페이지 콘텐츠 스트림을 순서대로 하나의 문서에 옮겨 담습니다.
+
+- 폰트는 최종 문서에 한 번만 포함됩니다 (부분 문서를 PDF로 출력하지 않음).
+- 모든 프로세스가 같은 글자 목록으로 폰트 서브셋 번호를 미리 정해 두므로
+  워커가 만든 텍스트 연산자를 그대로 옮겨도 같은 글리프를 가리킵니다.
+- 격자 셀 템플릿(Form XObject) 번호가 다르면 참조를 최종 문서 번호로 바꿉니다.
+- 미리 정한 글자 목록 밖의 글자가 나오면(서브셋 번호가 어긋날 수 있음) 한 프로세스로 렌더링합니다.
+
+    pdf_bytes = render_sharded(passages, Config(), font_path, workers=4)
+"""
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from analects_tracing import AnalectsTracingPDF, Config, PassageData, RawPage
+from font_registry import warm_font
+from hanja_dictionary import get_hanja_meanings
+from layout_plan import passage_sounds
+
+# 이보다 구절이 적으면 프로세스를 띄우는 비용이 더 큽니다.
+MIN_PASSAGES_PER_SHARD = 4
+
+_TEXT_FONT_KEY = "cjk"  # emit_plan이 쓰는 폰트 (CJK, 보통 굵기)
+_FALLBACK_FONT_KEY = "cjkfull"  # 축소 폰트에 없는 글자용 원본 폰트
+
+
+class SubsetMismatchError(Exception):
+    """미리 정한 글자 목록 밖의 글자가 쓰여 폰트 서브셋 번호가 어긋날 수 있을 때 발생합니다."""
+
+
+@dataclass
+class Shard:
+    """워커가 렌더링한 부분 문서"""
+    pages: list[RawPage]
+    templates: dict[int, float]  # XObject 번호 → 격자 셀 크기
+
+
+def seed_characters(passages: Iterable[PassageData], config: Config) -> str:
+    """
+    노트 전체에서 쓰일 수 있는 글자를 코드 포인트 순으로 모읍니다.
+    라벨, 원문, 음독, 해석, 훈음, 고정 문구를 포함합니다.
+    """
+    chars = set("[해석 필사]")
+    for passage in passages:
+        chars.update(passage.label, passage.original, passage.interpretation, passage.reading)
+        if config.show_meaning:
+            for meaning in get_hanja_meanings(list(passage.original), passage_sounds(passage)):
+                chars.update(meaning)
+    return "".join(sorted(chars))
+
+
+def _seed_subset(generator: AnalectsTracingPDF, seed: str) -> int:
+    """글자 목록 순서대로 서브셋 번호를 미리 배정하고 배정된 글리프 수를 반환합니다."""
+    subset = generator.pdf.fonts[_TEXT_FONT_KEY].subset
+    for ch in seed:
+        subset.pick(ord(ch))
+    return len(subset)
+
+
+def render_shard(passages: list[PassageData], config: Config, font_path: str, seed: str) -> Shard:
+    """워커 프로세스에서 구절 묶음을 렌더링하고 페이지별 콘텐츠 스트림을 반환합니다."""
+    generator = AnalectsTracingPDF(config, font_path)
+    seeded = _seed_subset(generator, seed)
+    for passage in passages:
+        generator.render_passage(passage)
+    if len(generator.pdf.fonts[_TEXT_FONT_KEY].subset) != seeded:
+        raise SubsetMismatchError("글자 목록에 없는 글자가 사용되었습니다.")
+    if _FALLBACK_FONT_KEY in generator.pdf.fonts:
+        raise SubsetMismatchError("축소 폰트에 없는 글자가 있어 원본 폰트가 사용되었습니다.")
+    return Shard(pages=generator.export_pages(), templates=generator.template_sizes())
+
+
+def split_shards(passages: list[PassageData], n_shards: int) -> list[list[PassageData]]:
+    """순서를 유지한 채 글자 수가 비슷하도록 연속 구간으로 나눕니다."""
+    n_shards = max(1, min(n_shards, len(passages)))
+    total = sum(len(p.original) + 1 for p in passages)
+    shards: list[list[PassageData]] = [[]]
+    acc = 0
+    for passage in passages:
+        # 현재 묶음이 목표 비율을 채웠으면 다음 묶음으로
+        if shards[-1] and acc >= total * len(shards) / n_shards and len(shards) < n_shards:
+            shards.append([])
+        shards[-1].append(passage)
+        acc += len(passage.original) + 1
+    return shards
+
+
+def merge_shards(generator: AnalectsTracingPDF, shards: list[Shard]) -> None:
+    """부분 문서의 페이지를 순서대로 generator의 문서에 추가합니다. (폰트는 이 문서에 한 번만 등록)"""
+    for shard in shards:
+        generator.import_pages(shard.pages, shard.templates)
+
+
+def render_sharded(
+    passages: Iterable[PassageData],
+    config: Config,
+    font_path: str,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> bytes:
+    """
+    구절을 여러 프로세스로 나눠 렌더링하고 하나의 PDF 바이트로 합칩니다.
+    구절이 적거나 workers가 1이면 한 프로세스에서 렌더링합니다.
+    executor를 주면 그 풀을 사용하고, 없으면 이번 호출 동안만 프로세스 풀을 만듭니다.
+    """
+    passages = list(passages)
+    workers = workers or os.cpu_count() or 1
+    n_shards = min(workers, len(passages) // MIN_PASSAGES_PER_SHARD)
+    generator = AnalectsTracingPDF(config, font_path)
+    if n_shards <= 1:
+        return generator.generate_bytes(passages)
+
+    seed = seed_characters(passages, config)
+    _seed_subset(generator, seed)
+    chunks = split_shards(passages, n_shards)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=n_shards, initializer=warm_font, initargs=(font_path,))
+    try:
+        futures = [executor.submit(render_shard, chunk, config, font_path, seed) for chunk in chunks]
+        shards = [future.result() for future in futures]
+    except SubsetMismatchError as e:
+        print(f"병렬 렌더링 취소, 한 프로세스로 렌더링합니다: {e}")
+        return AnalectsTracingPDF(config, font_path).generate_bytes(passages)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    merge_shards(generator, shards)
+    return bytes(generator.pdf.output())
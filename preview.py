@@ -0,0 +1,169 @@
+"""
+PDF 미리보기 이미지 생성 모듈
+
+PDF 바이트를 poppler(pdftoppm)의 표준 입력으로 넘기고 PPM 이미지를 표준 출력으로 받아
+Pillow로 PNG/JPEG/WebP로 인코딩합니다. 임시 파일을 만들지 않으므로 동시 요청 간
+파일 정리 경쟁이 없습니다.
+
+- 필요한 페이지만 래스터화합니다 (`pages` 지정).
+- 여러 페이지는 구간으로 나눠 pdftoppm 프로세스 여러 개로 동시에 변환합니다.
+- 썸네일(낮은 DPI)을 먼저 만들고 본 해상도 이미지를 나중에 만들 수 있습니다.
+"""
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Iterable, Optional
+
+from PIL import Image
+
+DEFAULT_DPI = 200  # pdf2image 기본값과 동일
+
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PPM_HEADER = re.compile(rb"P6\s+(\d+)\s+(\d+)\s+(\d+)\s")
+
+
+@dataclass
+class PreviewConfig:
+    """미리보기 설정"""
+    dpi: int = 100
+    thumbnail_dpi: int = 30
+    fmt: str = "jpeg"  # png | jpeg | webp
+    quality: int = 80  # jpeg / webp 품질
+    threads: int = 4  # 동시에 실행할 pdftoppm 프로세스 수
+
+
+def count_pages(pdf_bytes: bytes) -> int:
+    """PDF 바이트에서 페이지 수를 셉니다 (fpdf2 출력은 객체 스트림을 쓰지 않음)."""
+    return len(_PAGE_OBJECT.findall(pdf_bytes))
+
+
+def _run_pdftoppm(pdf_bytes: bytes, first_page: int, last_page: int, dpi: int, timeout: int) -> bytes:
+    command = [
+        "pdftoppm", "-r", str(dpi),
+        "-f", str(first_page), "-l", str(last_page),
+        "-",  # PDF는 stdin으로, 출력 루트를 생략하면 stdout으로 기록
+    ]
+    result = subprocess.run(command, input=pdf_bytes, capture_output=True, timeout=timeout, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"pdftoppm 실패: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def _split_ppm_stream(data: bytes) -> list[Image.Image]:
+    """stdout에 이어 붙은 여러 PPM(P6) 이미지를 페이지별로 나눕니다."""
+    images = []
+    pos = 0
+    while pos < len(data):
+        m = _PPM_HEADER.match(data, pos)
+        if not m:
+            break
+        width, height = int(m.group(1)), int(m.group(2))
+        start = m.end()
+        end = start + width * height * 3
+        images.append(Image.frombytes("RGB", (width, height), data[start:end]))
+        pos = end
+    return images
+
+
+def encode_image(image: Image.Image, fmt: str = "png", quality: int = 80) -> bytes:
+    """PIL 이미지를 지정한 형식의 바이트로 인코딩합니다."""
+    buf = BytesIO()
+    fmt = fmt.lower()
+    if fmt == "png":
+        image.save(buf, "PNG")
+    elif fmt in ("jpeg", "jpg"):
+        image.save(buf, "JPEG", quality=quality, optimize=True)
+    elif fmt == "webp":
+        image.save(buf, "WEBP", quality=quality, method=4)
+    else:
+        raise ValueError(f"지원하지 않는 미리보기 형식: {fmt}")
+    return buf.getvalue()
+
+
+def _page_ranges(pages: list[int]) -> list[tuple[int, int]]:
+    """정렬된 페이지 번호를 연속 구간으로 묶습니다. 예: [1,2,3,5] → [(1,3),(5,5)]"""
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def _split_for_threads(ranges: list[tuple[int, int]], threads: int) -> list[tuple[int, int]]:
+    """pdftoppm 프로세스마다 비슷한 수의 페이지가 가도록 구간을 쪼갭니다."""
+    total = sum(last - first + 1 for first, last in ranges)
+    chunk = max(1, -(-total // max(1, threads)))
+    chunks = []
+    for first, last in ranges:
+        while first <= last:
+            end = min(last, first + chunk - 1)
+            chunks.append((first, end))
+            first = end + 1
+    return chunks
+
+
+def rasterize_pages(
+    pdf_bytes: bytes,
+    pages: Optional[Iterable[int]] = None,
+    dpi: int = DEFAULT_DPI,
+    threads: int = 1,
+    timeout: int = 120,
+) -> dict[int, Image.Image]:
+    """
+    지정한 페이지만 래스터화해 {페이지 번호: PIL 이미지}로 반환합니다.
+    pages가 None이면 모든 페이지를 변환합니다.
+    """
+    n_pages = count_pages(pdf_bytes)
+    if pages is None:
+        pages = range(1, n_pages + 1)
+    pages = sorted(p for p in set(pages) if 1 <= p <= n_pages)
+    if not pages:
+        return {}
+
+    chunks = _split_for_threads(_page_ranges(pages), threads)
+
+    def convert(chunk: tuple[int, int]) -> list[Image.Image]:
+        return _split_ppm_stream(_run_pdftoppm(pdf_bytes, chunk[0], chunk[1], dpi, timeout))
+
+    if len(chunks) == 1:
+        results = [convert(chunks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(threads, len(chunks))) as pool:
+            results = list(pool.map(convert, chunks))
+
+    images = {}
+    for (first, _), chunk_images in zip(chunks, results):
+        for offset, image in enumerate(chunk_images):
+            images[first + offset] = image
+    return images
+
+
+def render_previews(
+    pdf_bytes: bytes,
+    pages: Optional[Iterable[int]] = None,
+    config: Optional[PreviewConfig] = None,
+    thumbnail: bool = False,
+) -> dict[int, bytes]:
+    """지정한 페이지를 설정에 맞는 DPI/형식의 이미지 바이트로 반환합니다."""
+    cfg = config or PreviewConfig()
+    dpi = cfg.thumbnail_dpi if thumbnail else cfg.dpi
+    images = rasterize_pages(pdf_bytes, pages, dpi=dpi, threads=cfg.threads)
+    return {page: encode_image(image, cfg.fmt, cfg.quality) for page, image in images.items()}
+
+
+def render_preview_png(pdf_bytes: bytes, page: int = 1, dpi: int = DEFAULT_DPI, timeout: int = 60) -> bytes:
+    """PDF의 한 페이지를 PNG 바이트로 렌더링합니다."""
+    images = rasterize_pages(pdf_bytes, [page], dpi=dpi, timeout=timeout)
+    if page not in images:
+        raise RuntimeError(f"미리보기 생성 실패: {page} 페이지")
+    return encode_image(images[page], "png")
+
+
+def render_preview_pages(pdf_bytes: bytes, dpi: int = DEFAULT_DPI, timeout: int = 120) -> list[bytes]:
+    """PDF의 모든 페이지를 PNG 바이트 목록으로 렌더링합니다."""
+    images = rasterize_pages(pdf_bytes, dpi=dpi, timeout=timeout)
+    return [encode_image(images[page], "png") for page in sorted(images)]
@@ -0,0 +1,287 @@
+"""
+PDF 생성 작업 큐 모듈
+
+텔레그램 봇의 이벤트 루프를 막지 않도록 파싱, PDF 생성, 미리보기 변환을
+프로세스 풀에서 실행합니다. 대기열 길이와 채팅별 동시 작업 수를 제한합니다.
+봇은 첫 구절의 미리보기(render_first_page)와 전체 PDF(render_notebook)를
+한 실행 슬롯에서 차례로 실행해(submit_phases) 미리보기를 먼저 보냅니다.
+"""
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from analects_tracing import AnalectsTracingPDF, Config, parse_text_input
+from font_registry import warm_font
+from metrics import collect_stages, stage
+from native_preview import PREVIEW_BACKEND, render_plan_png
+from notebook_cache import PDF_NAME, get_notebook_cache, notebook_key, preview_name
+from page_cache import get_page_cache
+from preview import DEFAULT_DPI, render_preview_png
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 찼을 때 발생합니다."""
+
+
+class ChatLimitError(Exception):
+    """한 채팅의 동시 작업 수 제한을 넘었을 때 발생합니다."""
+
+
+@dataclass
+class RenderResult:
+    """워커 작업 결과 (render_first_page의 결과는 pdf_data가 None)"""
+    pdf_data: Optional[bytes]
+    png_data: bytes
+    cache_hits: int = 0
+    cache_misses: int = 0
+    page_cache_hits: int = 0
+    page_cache_misses: int = 0
+    stage_seconds: dict = field(default_factory=dict)  # 워커에서 잰 단계별 시간 (metrics.STAGES)
+
+
+def _cache_counters() -> tuple[int, int, int, int]:
+    cache, page_cache = get_notebook_cache(), get_page_cache()
+    return cache.hits, cache.misses, page_cache.hits, page_cache.misses
+
+
+def _run_job(job: Callable, text: str, font_path: str) -> Optional[RenderResult]:
+    """job을 실행하고 그동안의 캐시 적중/실패 수와 단계별 시간을 결과에 담습니다."""
+    before = _cache_counters()
+    with collect_stages() as timings:
+        result = job(text, font_path)
+    if result is not None:
+        after = _cache_counters()
+        result.cache_hits, result.cache_misses, result.page_cache_hits, result.page_cache_misses = (
+            a - b for a, b in zip(after, before)
+        )
+        result.stage_seconds = dict(timings)
+    return result
+
+
+def render_notebook(text: str, font_path: str) -> Optional[RenderResult]:
+    """
+    워커 프로세스에서 실행되는 작업: PDF와 첫 페이지 PNG를 만들어 반환합니다.
+    노트 캐시에 같은 입력의 결과가 있으면 다시 렌더링하지 않고,
+    없으면 페이지 캐시에 없는 구절만 렌더링합니다.
+    구절을 찾지 못하면 None을 반환합니다.
+    단계별 시간은 결과의 stage_seconds로 돌려주며, 메인 프로세스가 지표에 반영합니다.
+    """
+    return _run_job(_render_notebook, text, font_path)
+
+
+def render_first_page(text: str, font_path: str) -> Optional[RenderResult]:
+    """
+    두 단계 응답의 1단계: 첫 구절만 렌더링해 노트 첫 페이지의 PNG를 만듭니다. (pdf_data는 None)
+    구절마다 새 페이지에서 시작하므로 첫 구절의 첫 페이지가 곧 노트의 첫 페이지입니다.
+    PREVIEW_BACKEND=native(기본값)이면 PDF 없이 레이아웃 계획을 바로 그리고(native_preview.py),
+    poppler이면 첫 구절의 PDF를 만들어 pdftoppm으로 변환합니다.
+    만든 PNG는 노트 키로 저장해 두므로 이어서 실행되는 render_notebook은 다시 래스터화하지 않습니다.
+    """
+    return _run_job(_render_first_page, text, font_path)
+
+
+def _parse(text: str, font_path: str):
+    with stage("parse"):
+        passages = parse_text_input(text)
+    if not passages:
+        return None, None, None
+    config = Config()
+    return passages, config, notebook_key(passages, config, font_path)
+
+
+def _render_first_page(text: str, font_path: str) -> Optional[RenderResult]:
+    passages, config, key = _parse(text, font_path)
+    if not passages:
+        return None
+    cache = get_notebook_cache()
+    png_name = preview_name(1, DEFAULT_DPI, "png")
+    png_data = cache.get(key, png_name)
+    if png_data is None:
+        if PREVIEW_BACKEND == "native":
+            # 레이아웃 계획을 바로 그리므로 PDF를 만들지 않습니다.
+            with stage("rasterize"):
+                png_data = render_plan_png(passages[:1], config, font_path)
+        else:
+            generator = AnalectsTracingPDF(config, font_path, page_cache=get_page_cache())
+            first_pdf = generator.generate_bytes(passages[:1])
+            with stage("rasterize"):
+                png_data = render_preview_png(first_pdf, page=1)
+        cache.put(key, png_name, png_data)
+    return RenderResult(None, png_data)
+
+
+def _render_notebook(text: str, font_path: str) -> Optional[RenderResult]:
+    passages, config, key = _parse(text, font_path)
+    if not passages:
+        return None
+    cache = get_notebook_cache()
+    pdf_data = cache.get(key, PDF_NAME)
+    if pdf_data is None:
+        # 노트 전체가 처음이어도 다른 노트에서 렌더링된 구절은 페이지 캐시에서 가져옵니다.
+        pdf_data = AnalectsTracingPDF(config, font_path, page_cache=get_page_cache()).generate_bytes(passages)
+        cache.put(key, PDF_NAME, pdf_data)
+
+    png_name = preview_name(1, DEFAULT_DPI, "png")
+    png_data = cache.get(key, png_name)
+    if png_data is None:
+        with stage("rasterize"):
+            if PREVIEW_BACKEND == "native":
+                png_data = render_plan_png(passages[:1], config, font_path)
+            else:
+                png_data = render_preview_png(pdf_data, page=1)
+        cache.put(key, png_name, png_data)
+    return RenderResult(pdf_data, png_data)
+
+
+def create_executor(max_workers: int, font_path: str) -> ProcessPoolExecutor:
+    """각 워커가 시작할 때 폰트를 미리 적재하는 프로세스 풀을 만듭니다."""
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=warm_font,
+        initargs=(font_path,),
+    )
+
+
+class _Ticket:
+    """대기열의 작업 하나. 마지막으로 알린 순번과 진행 중인 알림 태스크를 기억합니다."""
+
+    __slots__ = ("on_queued", "reported", "task")
+
+    def __init__(self, on_queued: Optional[Callable[[int], Awaitable[None]]]):
+        self.on_queued = on_queued
+        self.reported: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class RenderQueue:
+    """
+    실행 슬롯(max_workers) + 대기열(max_queue) + 채팅별 제한(per_chat_limit)을 가진 작업 큐.
+    대기 순서는 제출 순서(FIFO)를 따릅니다.
+    대기 중인 작업에는 on_queued(순번)으로 순번을 알리고, 앞 작업이 빠져 순번이 바뀔 때마다 다시 알립니다.
+    대기했던 작업이 실행을 시작하면 on_queued(0)을 한 번 호출합니다.
+    """
+
+    def __init__(self, executor: Executor, max_workers: int, max_queue: int, per_chat_limit: int):
+        self._executor = executor
+        self._slots = asyncio.Semaphore(max_workers)
+        self._max_queue = max_queue
+        self._per_chat_limit = per_chat_limit
+        self._waiting: list[_Ticket] = []
+        self._active_per_chat: dict[int, int] = defaultdict(int)
+
+    @property
+    def queue_depth(self) -> int:
+        """실행 슬롯을 기다리는 작업 수"""
+        return len(self._waiting)
+
+    def _notify_positions(self) -> None:
+        """순번이 바뀐 대기 작업에 알림 태스크를 띄웁니다. (작업마다 알림은 하나씩 차례로 보냄)"""
+        for position, ticket in enumerate(self._waiting, start=1):
+            if ticket.on_queued is None or ticket.reported == position:
+                continue
+            if ticket.task is None or ticket.task.done():
+                ticket.task = asyncio.create_task(self._report_position(ticket))
+
+    async def _report_position(self, ticket: _Ticket) -> None:
+        # 알림을 보내는 동안 순번이 또 바뀌었으면 최신 순번으로 한 번 더 보냅니다.
+        while ticket in self._waiting:
+            position = self._waiting.index(ticket) + 1
+            if position == ticket.reported:
+                return
+            ticket.reported = position
+            await ticket.on_queued(position)
+
+    async def _report_started(self, ticket: _Ticket) -> None:
+        # 마지막 순번 알림이 끝난 뒤에 시작(0)을 알립니다. 순번을 알린 적이 없으면 보내지 않습니다.
+        await ticket.task
+        if ticket.reported is not None:
+            await ticket.on_queued(0)
+
+    @asynccontextmanager
+    async def _slot(self, chat_id: int, on_queued: Optional[Callable[[int], Awaitable[None]]]):
+        """채팅별 제한과 대기열 길이를 확인하고, 실행 슬롯을 얻을 때까지 순서대로 기다립니다."""
+        if self._active_per_chat[chat_id] >= self._per_chat_limit:
+            raise ChatLimitError(chat_id)
+        if len(self._waiting) >= self._max_queue:
+            raise QueueFullError()
+
+        ticket = _Ticket(on_queued)
+        self._waiting.append(ticket)
+        self._active_per_chat[chat_id] += 1
+        started: Optional[asyncio.Task] = None
+        try:
+            if self._slots.locked():
+                # 알림 전송을 기다리는 동안 순서가 밀리지 않도록 태스크로 보냅니다.
+                self._notify_positions()
+            async with self._slots:
+                self._waiting.remove(ticket)
+                self._notify_positions()
+                if ticket.task is not None:
+                    # 시작 알림도 태스크로 보내고 작업은 바로 시작합니다.
+                    started = asyncio.create_task(self._report_started(ticket))
+                try:
+                    yield
+                except BaseException:
+                    if started is not None:
+                        started.cancel()
+                        await asyncio.gather(started, return_exceptions=True)
+                        started = None
+                    raise
+                if started is not None:
+                    # 결과를 알리기 전에 시작 알림이 끝나도록 기다립니다.
+                    await started
+        finally:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                self._notify_positions()
+            self._active_per_chat[chat_id] -= 1
+            if not self._active_per_chat[chat_id]:
+                del self._active_per_chat[chat_id]
+
+    async def submit(
+        self,
+        chat_id: int,
+        fn: Callable,
+        *args,
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+    ):
+        """
+        작업을 제출하고 결과를 기다립니다.
+        실행 슬롯이 모두 사용 중이면 on_queued(대기 순번)을 호출하고, 순번이 바뀔 때와 실행을 시작할 때(0) 다시 호출합니다.
+        """
+        async with self._slot(chat_id, on_queued):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def submit_phases(
+        self,
+        chat_id: int,
+        calls: list[tuple[Callable, tuple]],
+        on_result: Callable[[int, object], Awaitable[None]],
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> list:
+        """
+        (fn, args) 작업들을 실행 슬롯 하나에서 차례로 실행하고 결과 목록을 반환합니다.
+        각 결과가 나오면 바로 on_result(순번, 결과)를 태스크로 보내고 다음 작업을 시작하므로,
+        앞 단계 결과(미리보기)를 보내는 동안 다음 단계(전체 PDF)가 렌더링됩니다.
+        결과가 None이면 남은 작업은 실행하지 않습니다. on_result 태스크가 모두 끝난 뒤 반환합니다.
+        """
+        results, callbacks = [], []
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slot(chat_id, on_queued):
+                for fn, args in calls:
+                    result = await loop.run_in_executor(self._executor, fn, *args)
+                    results.append(result)
+                    callbacks.append(asyncio.create_task(on_result(len(results) - 1, result)))
+                    if result is None:
+                        break
+        finally:
+            outcomes = await asyncio.gather(*callbacks, return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return results
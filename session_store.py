@@ -0,0 +1,113 @@
+"""
+세션별 미리보기 저장소 모듈 (크기 제한 + 프로세스 전체 메모리 보고)
+
+웹 앱은 접속한 세션마다 st.session_state에 미리보기를 들고 있으므로, 사용자가 많으면
+세션 수만큼 메모리가 늘어납니다. 미리보기는 압축된 이미지 바이트(PNG/JPEG)로만 저장하고,
+세션마다 전체 크기를 max_bytes로 제한해 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다(LRU).
+PDF는 세션에 두지 않고 노트 캐시(디스크)에서 필요할 때 읽습니다.
+
+살아 있는 저장소는 약한 참조로 모아 두므로, 세션이 끝나 저장소가 사라지면 보고에서도 빠집니다.
+
+    store = SessionStore()
+    store.put((page, dpi), png_bytes)
+    store.get((page, dpi))
+    memory_report()   # {"sessions", "entries", "bytes", "evictions", "rss_bytes"}
+
+Streamlit에 의존하지 않습니다.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+DEFAULT_SESSION_MAX_BYTES = int(float(os.getenv("SESSION_PREVIEW_MAX_MB", "8")) * 1024 * 1024)
+
+_stores: "weakref.WeakSet[SessionStore]" = weakref.WeakSet()
+_stores_lock = threading.Lock()
+
+
+class SessionStore:
+    """키 → 바이트. 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다."""
+
+    def __init__(self, max_bytes: int = DEFAULT_SESSION_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.evictions = 0
+        with _stores_lock:
+            _stores.add(self)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: Hashable, data: bytes) -> bool:
+        """
+        항목을 저장하고 제한을 넘는 만큼 오래된 항목을 지웁니다.
+        혼자서 제한보다 큰 항목은 저장하지 않고 False를 반환합니다.
+        """
+        data = bytes(data)
+        if len(data) > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._entries[key] = data
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+def process_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 상주 메모리(RSS) 바이트. /proc를 읽을 수 없는 환경에서는 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def memory_report() -> dict:
+    """살아 있는 모든 세션 저장소의 합계와 프로세스 RSS"""
+    with _stores_lock:
+        stores = list(_stores)
+    stats = [store.stats() for store in stores]
+    return {
+        "sessions": len(stats),
+        "entries": sum(s["entries"] for s in stats),
+        "bytes": sum(s["bytes"] for s in stats),
+        "evictions": sum(s["evictions"] for s in stats),
+        "rss_bytes": process_rss_bytes(),
+    }
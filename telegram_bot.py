@@ -1,14 +1,25 @@
 import os
 import logging
 import asyncio
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 from telegram import Update
 from telegram.ext import ApplicationBuilder, ContextTypes, MessageHandler, filters
-from pdf2image import convert_from_path
 
-# Import existing logic from analects_tracing
-from analects_tracing import Config, AnalectsTracingPDF, parse_text_input
+# PDF 생성 작업 큐 (프로세스 풀)
+from render_queue import (
+    ChatLimitError, QueueFullError, RenderQueue, create_executor, render_first_page, render_notebook,
+)
+from notebook_cache import get_notebook_cache
+from page_cache import get_page_cache
+# 같은 내용의 PNG/PDF는 다시 올리지 않고 텔레그램 file_id로 보냄
+from upload_cache import FileIdCache, send_cached
+# 단계별 처리 시간 지표 (Prometheus 형식, /metrics)
+from metrics import (
+    FIRST_IMAGE_SECONDS, collect_stages, get_metrics, record_request, register_default_metrics,
+    set_default_source, stage, start_metrics_server,
+)
 
 # Load environment variables
 load_dotenv()
@@ -22,15 +33,15 @@ logging.basicConfig(
 
 # Constants
 FONT_PATH = Path("fonts/NotoSerifCJKkr-Regular.otf")
-OUTPUT_DIR = Path("output")
 
-# Check font file existence at startup
-if not FONT_PATH.exists():
-    print(f"오류: 폰트 파일을 찾을 수 없습니다: {FONT_PATH}")
-    print("fonts/ 디렉토리에 CJK 지원 폰트 파일을 배치해주세요.")
-    exit(1)
+# Worker pool settings (.env 에서 조정 가능)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", os.cpu_count() or 1))
+RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "32"))
+RENDER_PER_CHAT = int(os.getenv("RENDER_PER_CHAT", "1"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0이면 지표 서버를 열지 않음
 
-OUTPUT_DIR.mkdir(exist_ok=True)
+render_queue: RenderQueue = None  # __main__ 에서 생성
+file_id_cache: FileIdCache = None  # __main__ 에서 생성
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_text = update.message.text
@@ -39,48 +50,90 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     chat_id = update.effective_chat.id
     message_id = update.message.message_id
+    started = time.perf_counter()
+    outcome = "error"
     status_message = await update.message.reply_text("PDF를 생성 중입니다. 잠시만 기다려주세요...")
 
-    try:
-        # 1. Parse input
-        passages = parse_text_input(user_text)
-        if not passages:
-            await status_message.edit_text("입력된 텍스트에서 구절을 찾을 수 없습니다. 형식을 확인해주세요.")
+    async def notify_position(position: int):
+        """대기 순번이 바뀔 때마다 상태 메시지를 고칩니다. (0: 대기가 끝나 생성을 시작함)"""
+        text = f"대기 중입니다. 현재 {position}번째 순서입니다..." if position else "PDF를 생성 중입니다. 잠시만 기다려주세요..."
+        try:
+            await status_message.edit_text(text)
+        except Exception as e:
+            logging.warning(f"Status update failed: {e}")
+
+    first_image = None
+
+    def record_result(result):
+        """워커 결과의 단계 시간과 캐시 적중/실패 수를 메인 프로세스 지표에 더합니다."""
+        stages.merge(result.stage_seconds)
+        notebook_cache = get_notebook_cache()
+        notebook_cache.record(hits=result.cache_hits, misses=result.cache_misses)
+        page_cache = get_page_cache()
+        page_cache.record(hits=result.page_cache_hits, misses=result.page_cache_misses)
+
+    async def send_phase(index: int, result):
+        """1단계(첫 구절 미리보기)가 끝나면 전체 PDF를 기다리지 않고 바로 이미지를 보냅니다."""
+        nonlocal first_image
+        if result is None or index != 0:
             return
-
-        # 2. Generate PDF (Using message_id for uniqueness)
-        pdf_path = OUTPUT_DIR / f"analects_{chat_id}_{message_id}.pdf"
-        config = Config()
-        generator = AnalectsTracingPDF(config, str(FONT_PATH))
-        generator.generate(passages, str(pdf_path))
-
-        # 3. Convert first page to PNG
-        png_path = OUTPUT_DIR / f"analects_{chat_id}_{message_id}.png"
-        images = convert_from_path(str(pdf_path), first_page=1, last_page=1)
-        if images:
-            images[0].save(str(png_path), "PNG")
-
-        # 4. Send files
-        # Send PNG first for quick preview
-        if png_path.exists():
-            with open(png_path, 'rb') as photo:
-                await context.bot.send_photo(chat_id=chat_id, photo=photo, caption="미리보기 (첫 페이지)")
-
-        # Send PDF
-        with open(pdf_path, 'rb') as pdf_file:
-            await context.bot.send_document(chat_id=chat_id, document=pdf_file, filename=f"analects_{message_id}.pdf")
-
-        await status_message.delete() # 상태 메시지 삭제
-
-    except Exception as e:
-        logging.error(f"Error processing message: {e}")
-        await status_message.edit_text(f"처리 중 오류가 발생했습니다: {str(e)}")
-    finally:
-        # Clean up temporary files
-        if 'pdf_path' in locals() and pdf_path.exists():
-            pdf_path.unlink()
-        if 'png_path' in locals() and png_path.exists():
-            png_path.unlink()
+        record_result(result)
+        with stage("telegram_upload"):
+            await send_cached(
+                context.bot, file_id_cache, "photo", chat_id, result.png_data, caption="미리보기 (첫 페이지)")
+        first_image = time.perf_counter() - started
+        FIRST_IMAGE_SECONDS.observe(first_image, source="bot")
+        try:
+            await status_message.edit_text("미리보기를 보냈습니다. 전체 PDF를 만드는 중입니다...")
+        except Exception as e:
+            logging.warning(f"Status update failed: {e}")
+
+    # 단계별 시간: 워커에서 잰 단계(parse, dictionary, render, output, rasterize)와 업로드를 함께 모아 지표에 반영
+    with collect_stages("bot") as stages:
+        try:
+            # 1. 첫 구절 미리보기 → 2. 전체 PDF (워커 프로세스에서 한 실행 슬롯으로 차례로 실행)
+            results = await render_queue.submit_phases(
+                chat_id,
+                [(render_first_page, (user_text, str(FONT_PATH))), (render_notebook, (user_text, str(FONT_PATH)))],
+                on_result=send_phase,
+                on_queued=notify_position,
+            )
+            if results[-1] is None:
+                outcome = "empty"
+                await status_message.edit_text("입력된 텍스트에서 구절을 찾을 수 없습니다. 형식을 확인해주세요.")
+                return
+            result = results[-1]
+            record_result(result)
+            logging.info(f"Notebook cache: {get_notebook_cache().stats()}")
+            logging.info(f"Page cache: {get_page_cache().stats()}")
+
+            # 3. Send PDF (미리보기는 send_phase에서 먼저 전송됨)
+            with stage("telegram_upload"):
+                await send_cached(
+                    context.bot, file_id_cache, "document", chat_id, result.pdf_data,
+                    filename=f"analects_{message_id}.pdf")
+
+            await status_message.delete() # 상태 메시지 삭제
+            outcome = "ok"
+
+        except ChatLimitError:
+            outcome = "chat_limit"
+            await status_message.edit_text("이전 요청을 처리하고 있습니다. 완료된 후 다시 보내주세요.")
+        except QueueFullError:
+            outcome = "queue_full"
+            await status_message.edit_text("요청이 많아 지금은 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+        except Exception as e:
+            # 워커에서 난 예외는 stage()가 붙인 단계 이름(metrics_stage)을 함께 가져옵니다.
+            failed_stage = getattr(e, "metrics_stage", None)
+            if failed_stage and failed_stage not in stages.errors:
+                stages.errors.append(failed_stage)
+            logging.error(f"Error processing message ({failed_stage or 'unknown'} stage): {e}")
+            await status_message.edit_text(f"처리 중 오류가 발생했습니다: {str(e)}")
+        finally:
+            record_request(
+                "bot", outcome, time.perf_counter() - started, stages, chat_id=chat_id,
+                first_image_ms=None if first_image is None else round(first_image * 1000, 1),
+            )
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     help_text = (
@@ -95,14 +148,35 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(help_text)
 
 if __name__ == '__main__':
+    # Check font file existence at startup
+    if not FONT_PATH.exists():
+        print(f"오류: 폰트 파일을 찾을 수 없습니다: {FONT_PATH}")
+        print("fonts/ 디렉토리에 CJK 지원 폰트 파일을 배치해주세요.")
+        exit(1)
+
     if not TOKEN or TOKEN == "YOUR_TELEGRAM_BOT_TOKEN":
         print("오류: .env 파일에 TELEGRAM_BOT_TOKEN을 설정해주세요.")
     else:
-        app = ApplicationBuilder().token(TOKEN).build()
+        executor = create_executor(RENDER_WORKERS, str(FONT_PATH))
+        render_queue = RenderQueue(executor, RENDER_WORKERS, RENDER_QUEUE_SIZE, RENDER_PER_CHAT)
+        file_id_cache = FileIdCache()
+
+        # 지표: 요청 밖에서 잰 단계도 source="bot"으로 기록하고, 대기열 길이와 캐시 적중률을 내보냄
+        set_default_source("bot")
+        register_default_metrics()
+        get_metrics().callback(
+            "analects_render_queue_depth", "Render jobs waiting for a worker slot",
+            lambda: render_queue.queue_depth)
+        if start_metrics_server(METRICS_PORT):
+            print(f"지표: http://127.0.0.1:{METRICS_PORT}/metrics")
+        app = ApplicationBuilder().token(TOKEN).concurrent_updates(True).build()
         
         # Handlers
         app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_message))
         app.add_handler(MessageHandler(filters.COMMAND, start))
         
-        print("봇이 시작되었습니다...")
-        app.run_polling()
\ No newline at end of file
+        print(f"봇이 시작되었습니다... (워커 {RENDER_WORKERS}개, 대기열 {RENDER_QUEUE_SIZE})")
+        try:
+            app.run_polling()
+        finally:
+            executor.shutdown(cancel_futures=True)
\ No newline at end of file
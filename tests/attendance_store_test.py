@@ -0,0 +1,146 @@
+"""
+출석 기록 저장소(attendance_store.py) 테스트 스크립트
+
+추가 전용 로그의 색인(중복 확인, 사용자별 일수, 순위), 다른 프로세스가 덧붙인 줄의 반영,
+git checkout/rebase처럼 파일이 교체되거나 줄었거나 같은 자리에서 다시 쓰였을 때의 재색인, 쓰는 중인 마지막 줄,
+challenge_db.json에서 한 번 옮기는 마이그레이션을 확인합니다.
+
+    python tests/attendance_store_test.py
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from attendance_store import AttendanceStore, migrate_json  # noqa: E402
+
+
+def entry(name: str, date: str) -> dict:
+    return {"name": name, "date": date, "timestamp": f"{date} 09:00:00"}
+
+
+def write_lines(path: Path, entries: list[dict]) -> None:
+    path.write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries), encoding="utf-8")
+
+
+def test_append_indexes_and_rejects_duplicates(tmp_path: Path):
+    store = AttendanceStore(str(tmp_path / "challenge_log.jsonl"))
+    assert store.append(entry("철수", "2026-01-01"))
+    assert store.append(entry("철수", "2026-01-02"))
+    assert store.append(entry("영희", "2026-01-01"))
+    assert not store.append(entry("철수", "2026-01-01"))  # 같은 (이름, 날짜)
+
+    assert len(store) == 3
+    assert store.user_days("철수") == 2
+    assert store.user_days("없는 사람") == 0
+    assert store.leaderboard() == [("철수", 2), ("영희", 1)]
+    assert (tmp_path / "challenge_log.jsonl").read_text(encoding="utf-8").count("\n") == 3
+
+
+def test_lines_appended_by_another_writer_are_picked_up(tmp_path: Path):
+    path = tmp_path / "challenge_log.jsonl"
+    store, other = AttendanceStore(str(path)), AttendanceStore(str(path))
+    store.append(entry("철수", "2026-01-01"))
+    assert other.append(entry("영희", "2026-01-01"))
+    assert not other.append(entry("철수", "2026-01-01"))  # 다른 인스턴스가 쓴 줄도 중복으로 봄
+    assert store.user_days("영희") == 1
+    assert len(store) == 2
+
+
+def test_replaced_or_truncated_file_is_reindexed(tmp_path: Path):
+    path = tmp_path / "challenge_log.jsonl"
+    store = AttendanceStore(str(path))
+    for day in range(1, 4):
+        store.append(entry("철수", f"2026-01-0{day}"))
+    assert store.user_days("철수") == 3
+
+    # git checkout/rebase처럼 파일을 통째로 교체 (새 inode)
+    replacement = tmp_path / "checkout.jsonl"
+    write_lines(replacement, [entry("영희", "2026-01-01"), entry("영희", "2026-01-02")])
+    os.replace(replacement, path)
+    assert store.user_days("철수") == 0
+    assert store.leaderboard() == [("영희", 2)]
+
+    # 같은 파일이 줄어듦 (같은 inode)
+    with open(path, "r+", encoding="utf-8") as f:
+        first = f.readline()
+        f.seek(0)
+        f.truncate()
+        f.write(first)
+    assert len(store) == 1
+    assert store.append(entry("영희", "2026-01-02"))  # 지워진 기록은 다시 추가할 수 있음
+
+
+def test_rewritten_and_grown_file_is_reindexed(tmp_path: Path):
+    # git pull --rebase는 파일을 지우고 다시 만들며(같은 inode를 다시 쓸 수 있음), 원격 줄이 앞에 끼어들어 파일이 커집니다.
+    path = tmp_path / "challenge_log.jsonl"
+    store = AttendanceStore(str(path))
+    local = [entry(f"a{i}", "2026-01-01") for i in range(1, 4)]
+    for e in local:
+        store.append(e)
+    assert len(store) == 3
+
+    # 같은 inode에서 다시 씀
+    with open(path, "r+", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in [entry("b", "2026-01-01"), *local]))
+    assert store.leaderboard() == [("b", 1), ("a1", 1), ("a2", 1), ("a3", 1)]
+    assert not store.append(entry("b", "2026-01-01"))
+
+    # 지우고 다시 만듦
+    path.unlink()
+    write_lines(path, [entry("b", "2026-01-01"), entry("c", "2026-01-01"), *local])
+    assert len(store) == 5
+    assert store.user_days("c") == 1
+
+
+def test_torn_last_line_is_read_once_complete(tmp_path: Path):
+    path = tmp_path / "challenge_log.jsonl"
+    store = AttendanceStore(str(path))
+    store.append(entry("철수", "2026-01-01"))
+    line = json.dumps(entry("영희", "2026-01-01"), ensure_ascii=False)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")  # 손상된 줄은 건너뜀
+        f.write(line[:10])  # 다른 프로세스가 아직 쓰는 중
+    assert len(store) == 1
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[10:] + "\n")
+    assert len(store) == 2
+    assert store.user_days("영희") == 1
+
+
+def test_migrate_json_once(tmp_path: Path):
+    db, log = tmp_path / "challenge_db.json", tmp_path / "challenge_log.jsonl"
+    assert migrate_json(str(db), str(log)) is None  # JSON 파일 없음
+    db.write_text(json.dumps({"logs": [
+        entry("철수", "2026-01-01"),
+        entry("철수", "2026-01-01"),  # 중복
+        {"name": "영희"},  # 날짜 없음
+        entry("영희", "2026-01-02"),
+    ]}, ensure_ascii=False), encoding="utf-8")
+
+    assert migrate_json(str(db), str(log)) == 2
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
+    store = AttendanceStore(str(log))
+    assert store.leaderboard() == [("철수", 1), ("영희", 1)]
+    assert json.loads(log.read_text(encoding="utf-8").splitlines()[0]) == entry("철수", "2026-01-01")
+
+    store.append(entry("철수", "2026-01-03"))
+    assert migrate_json(str(db), str(log)) is None  # 로그가 이미 있으면 다시 옮기지 않음
+    assert store.user_days("철수") == 2
+
+
+if __name__ == "__main__":
+    for test in (
+        test_append_indexes_and_rejects_duplicates,
+        test_lines_appended_by_another_writer_are_picked_up,
+        test_replaced_or_truncated_file_is_reindexed,
+        test_rewritten_and_grown_file_is_reindexed,
+        test_torn_last_line_is_read_once_complete,
+        test_migrate_json_once,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("ok")
@@ -0,0 +1,123 @@
+"""
+일괄 생성(batch_render.py) 테스트 스크립트
+
+합성 코퍼스(benchmarks/corpus.py)의 앞 편들을 입력 문서로 써서 분할 방식별 출력 파일,
+출력 이름 중복 처리, manifest.json 내용, 실패가 있을 때의 종료 코드를 확인합니다.
+
+    python tests/batch_render_test.py [폰트 경로]
+    TEST_FONT_PATH=폰트 경로 python -m pytest tests/batch_render_test.py
+
+폰트가 없으면 건너뜁니다.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import pytest  # noqa: E402
+
+from analects_tracing import Config  # noqa: E402
+from batch_render import MANIFEST_NAME, run_batch  # noqa: E402
+from corpus import corpus_text  # noqa: E402
+
+FONT_PATH = "fonts/NotoSerifCJKkr-Regular.otf"
+CONFIG = Config(use_compact_font=False)
+
+
+@pytest.fixture(scope="module")
+def font_path() -> str:
+    path = os.getenv("TEST_FONT_PATH", FONT_PATH)
+    if not Path(path).exists():
+        pytest.skip(f"폰트 파일을 찾을 수 없습니다: {path}")
+    return path
+
+
+def small_corpus(books: int = 2, verses: int = 3) -> str:
+    """합성 코퍼스의 앞 books개 편에서 편마다 verses개 구절만 남긴 입력 문서"""
+    lines, book, verse = [], 0, 0
+    it = iter(corpus_text(long_passages=False).splitlines())
+    lines.append(next(it))  # 날짜
+    for line in it:
+        if line.endswith("편") and line[0].isdigit():
+            book, verse = book + 1, 0
+            if book > books:
+                break
+            lines.append(line)
+        elif line.startswith(f"{verse + 1}.") and not line.endswith("편"):
+            verse += 1
+            if verse <= verses:
+                lines.append(line)
+        elif verse <= verses:
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def read_manifest(out: Path) -> dict:
+    return json.loads((out / MANIFEST_NAME).read_text(encoding="utf-8"))
+
+
+def test_split_book_writes_one_pdf_per_book(font_path: str, tmp_path: Path):
+    source = tmp_path / "week1.txt"
+    source.write_text(small_corpus(), encoding="utf-8")
+    out = tmp_path / "out"
+    assert run_batch([str(source)], str(out), font_path, split="book", workers=2, config=CONFIG) == 0
+
+    manifest = read_manifest(out)
+    names = [entry["file"] for entry in manifest["files"]]
+    assert names == ["01_학이.pdf", "02_위정.pdf"]
+    assert sorted(p.name for p in out.glob("*.pdf")) == sorted(names)
+    assert [entry["passages"] for entry in manifest["files"]] == [3, 3]
+    for entry in manifest["files"]:
+        assert entry["pages"] >= 1 and entry["bytes"] == (out / entry["file"]).stat().st_size
+    assert manifest["split"] == "book" and manifest["chunk_size"] is None
+    assert manifest["failures"] == []
+    assert manifest["totals"]["files"] == 2 and manifest["totals"]["passages"] == 6
+    assert manifest["totals"]["pages"] == sum(e["pages"] for e in manifest["files"])
+
+
+def test_output_names_are_unique(font_path: str, tmp_path: Path):
+    # 다른 디렉토리의 같은 이름 문서 두 개 + 번호가 붙은 이름과 겹치는 문서
+    text = small_corpus(books=1, verses=1)
+    inputs = []
+    for folder, name in (("a", "notes"), ("b", "notes"), ("c", "notes_2")):
+        (tmp_path / folder).mkdir()
+        inputs.append(tmp_path / folder / f"{name}.txt")
+        inputs[-1].write_text(text, encoding="utf-8")
+    out = tmp_path / "out"
+    assert run_batch([str(p) for p in inputs], str(out), font_path, workers=2, config=CONFIG) == 0
+
+    names = [entry["file"] for entry in read_manifest(out)["files"]]
+    assert len(set(names)) == 3, names
+    assert sorted(p.name for p in out.glob("*.pdf")) == sorted(names)
+
+
+def test_failure_is_recorded_and_exit_code_is_one(font_path: str, tmp_path: Path):
+    good, empty = tmp_path / "good.txt", tmp_path / "empty.txt"
+    good.write_text(small_corpus(books=1, verses=4), encoding="utf-8")
+    empty.write_text("구절 없음\n", encoding="utf-8")
+    out = tmp_path / "out"
+    code = run_batch([str(good), str(empty)], str(out), font_path, split="chunk", chunk_size=2,
+                     workers=2, config=CONFIG)
+    assert code == 1
+
+    manifest = read_manifest(out)
+    assert [entry["file"] for entry in manifest["files"]] == ["good_part001.pdf", "good_part002.pdf"]
+    assert manifest["chunk_size"] == 2
+    assert [(f["name"], f["source"]) for f in manifest["failures"]] == [("empty", str(empty))]
+    assert manifest["totals"]["failed"] == 1
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else FONT_PATH
+    if not Path(path).exists():
+        print(f"skip: 폰트 파일을 찾을 수 없습니다: {path}")
+        sys.exit(0)
+    for test in (test_split_book_writes_one_pdf_per_book, test_output_names_are_unique,
+                 test_failure_is_recorded_and_exit_code_is_one):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(path, Path(tmp))
+    print("ok")
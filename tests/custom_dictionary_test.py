@@ -0,0 +1,131 @@
+"""
+사용자 사전 저장과 글자별 캐시 무효화(hanja_dictionary.py) 테스트 스크립트
+
+임시 디렉토리의 사전 파일로 save_custom_meaning의 원자적 저장, 바뀐 글자만의 캐시 무효화,
+다른 프로세스나 git pull로 파일이 바뀌거나 새로 생긴 경우의 반영, 사전 버전 변화를 확인합니다.
+끝나면 사전 경로와 리스너를 원래대로 되돌리므로 같은 프로세스의 다른 테스트에 영향을 주지 않습니다.
+
+    python tests/custom_dictionary_test.py
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hanja_dictionary  # noqa: E402
+from hanja_dictionary import (  # noqa: E402
+    add_dictionary_listener, get_chars_dictionary_version, get_custom_dict, get_dictionary_version,
+    get_hanja_meanings, remove_dictionary_listener, save_custom_meaning,
+)
+
+changes: list[set] = []
+_original_path = hanja_dictionary.CUSTOM_DICT_PATH
+
+
+def setup_module():
+    add_dictionary_listener(changes.append)
+
+
+def teardown_module():
+    remove_dictionary_listener(changes.append)
+    hanja_dictionary.CUSTOM_DICT_PATH = _original_path
+    get_custom_dict()  # 원래 사전을 다시 읽어 임시 사전으로 바뀐 글자의 캐시를 비웁니다.
+
+
+def use_dictionary(entries: dict) -> Path:
+    """새 임시 사전 파일을 만들어 사용합니다."""
+    path = Path(tempfile.mkdtemp()) / "custom_meanings.json"
+    path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+    hanja_dictionary.CUSTOM_DICT_PATH = str(path)
+    get_custom_dict()
+    changes.clear()
+    return path
+
+
+def test_save_is_atomic_and_bumps_version():
+    path = use_dictionary({"子": "아들 자"})
+    before = get_dictionary_version()
+    save_custom_meaning("說", "기쁠 열")
+    assert json.loads(path.read_text(encoding="utf-8")) == {"子": "아들 자", "說": "기쁠 열"}
+    assert [p.name for p in path.parent.iterdir()] == [path.name]  # 임시 파일이 남지 않음
+    assert get_dictionary_version() != before
+
+
+def test_unchanged_save_does_not_write():
+    path = use_dictionary({"子": "아들 자"})
+    mtime = path.stat().st_mtime_ns
+    version = get_dictionary_version()
+    save_custom_meaning("子", "아들 자")
+    assert path.stat().st_mtime_ns == mtime
+    assert get_dictionary_version() == version
+    assert changes == []
+
+
+def test_only_changed_chars_are_invalidated():
+    use_dictionary({"子": "아들 자", "曰": "가로 왈"})
+    assert get_hanja_meanings("子曰") == ["아들 자", "가로 왈"]
+    untouched = get_chars_dictionary_version("曰")
+    save_custom_meaning("子", "스승 자")
+    assert changes == [{"子"}], changes
+    assert "子" not in hanja_dictionary._meaning_cache
+    assert "曰" in hanja_dictionary._meaning_cache  # 다른 글자의 캐시는 그대로
+    assert get_chars_dictionary_version("曰") == untouched
+    assert get_hanja_meanings("子曰") == ["스승 자", "가로 왈"]
+
+
+def test_compatibility_char_is_invalidated_with_normalized_char():
+    use_dictionary({"樂": "즐거울 락"})
+    compat = "樂"  # 樂의 호환 한자 (NFKC → 樂)
+    assert get_hanja_meanings(compat) == ["즐거울 락"]
+    save_custom_meaning("樂", "노래 악")
+    assert compat not in hanja_dictionary._meaning_cache
+    assert get_hanja_meanings(compat) == ["노래 악"]
+
+
+def test_external_change_is_picked_up():
+    path = use_dictionary({"子": "아들 자", "曰": "가로 왈"})
+    assert get_hanja_meanings("子曰") == ["아들 자", "가로 왈"]
+    # git pull처럼 파일을 통째로 교체
+    replacement = path.with_name("pulled.json")
+    replacement.write_text(json.dumps({"子": "아들 자", "曰": "말할 왈", "學": "배울 학"}, ensure_ascii=False),
+                           encoding="utf-8")
+    os.replace(replacement, path)
+    assert get_hanja_meanings("子曰學") == ["아들 자", "말할 왈", "배울 학"]
+    assert changes == [{"曰", "學"}], changes
+
+
+def test_file_created_after_load_is_picked_up():
+    path = Path(tempfile.mkdtemp()) / "custom_meanings.json"
+    hanja_dictionary.CUSTOM_DICT_PATH = str(path)  # 아직 파일이 없는 사전
+    assert get_custom_dict() == {}
+    before = get_hanja_meanings("子曰")
+    changes.clear()
+    # 다른 프로세스가 사전 파일을 처음 만듦
+    path.write_text(json.dumps({"子": "아들 자 (custom)"}, ensure_ascii=False), encoding="utf-8")
+    assert get_hanja_meanings("子曰") == ["아들 자 (custom)", before[1]]
+    assert changes == [{"子"}], changes
+
+
+def test_broken_file_reads_as_empty():
+    path = use_dictionary({"子": "아들 자"})
+    path.write_text("{", encoding="utf-8")
+    assert get_custom_dict() == {}
+    assert get_dictionary_version() == "none"
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_save_is_atomic_and_bumps_version()
+        test_unchanged_save_does_not_write()
+        test_only_changed_chars_are_invalidated()
+        test_compatibility_char_is_invalidated_with_normalized_char()
+        test_external_change_is_picked_up()
+        test_file_created_after_load_is_picked_up()
+        test_broken_file_reads_as_empty()
+    finally:
+        teardown_module()
+    print("ok")
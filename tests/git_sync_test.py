@@ -0,0 +1,177 @@
+"""
+백그라운드 Git 동기화 테스트 스크립트 (로컬 bare 저장소 사용, 네트워크 불필요)
+
+    python tests/git_sync_test.py
+"""
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from attendance_store import AttendanceStore  # noqa: E402
+from git_sync import GitSyncWorker  # noqa: E402
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def make_clone(root: Path, remote: Path, name: str) -> Path:
+    clone = root / name
+    git(root, "clone", "-q", str(remote), str(clone))
+    git(clone, "config", "user.name", "sync-test")
+    git(clone, "config", "user.email", "sync-test@example.com")
+    git(clone, "checkout", "-q", "-B", "master")
+    return clone
+
+
+def setup_repo(root: Path) -> tuple[Path, Path]:
+    remote = root / "remote.git"
+    git(root, "init", "-q", "--bare", "-b", "master", str(remote))
+    seed = make_clone(root, remote, "seed")
+    (seed / ".gitattributes").write_text("challenge_log.jsonl merge=union\n")
+    (seed / "challenge_log.jsonl").write_text("")
+    git(seed, "add", ".")
+    git(seed, "commit", "-q", "-m", "init")
+    git(seed, "push", "-q", "origin", "master")
+    return remote, make_clone(root, remote, "app")
+
+
+def test_coalesces_entries_into_one_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        remote, clone = setup_repo(Path(tmp))
+        worker = GitSyncWorker(str(clone), debounce=0.5)
+        log = clone / "challenge_log.jsonl"
+        for i in range(5):
+            with open(log, "a", encoding="utf-8") as f:
+                f.write(f'{{"name": "user{i}", "date": "2026-01-01"}}\n')
+            worker.enqueue([log.name], f"chore: add attendance log for user{i}")
+        assert worker.queue_depth == 5
+        assert worker.flush(timeout=30), worker.status().last_error
+        worker.stop()
+
+        assert worker.status().queue_depth == 0
+        assert git(remote, "rev-list", "--count", "master").strip() == "2"  # init + 묶음 커밋 1개
+        assert git(remote, "show", "master:challenge_log.jsonl").count("\n") == 5
+
+
+def test_retries_and_merges_concurrent_appends():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, clone = setup_repo(root)
+        other = make_clone(root, remote, "other")
+        worker = GitSyncWorker(str(clone), debounce=0.1, backoff_base=0.1, remote="missing")
+
+        (clone / "challenge_log.jsonl").write_text('{"name": "a", "date": "2026-01-01"}\n')
+        worker.enqueue(["challenge_log.jsonl"], "chore: add attendance log for a")
+        assert not worker.flush(timeout=30)
+        assert worker.status().failures >= 1 and worker.queue_depth == 1
+
+        # 다른 인스턴스가 먼저 푸시 → pull --rebase 시 union 병합
+        (other / "challenge_log.jsonl").write_text('{"name": "b", "date": "2026-01-01"}\n')
+        git(other, "commit", "-q", "-am", "other")
+        git(other, "push", "-q", "origin", "master")
+
+        worker.remote = "origin"
+        deadline = time.monotonic() + 30
+        while worker.queue_depth and time.monotonic() < deadline:
+            time.sleep(0.1)  # 백오프 후 자동 재시도
+        worker.stop()
+
+        status = worker.status()
+        assert status.queue_depth == 0 and status.last_error is None, status
+        lines = git(remote, "show", "master:challenge_log.jsonl").splitlines()
+        assert sorted(lines) == ['{"name": "a", "date": "2026-01-01"}', '{"name": "b", "date": "2026-01-01"}']
+
+
+def test_sync_with_unrelated_dirty_tracked_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, clone = setup_repo(root)
+        other = make_clone(root, remote, "other")
+        (other / "challenge_log.jsonl").write_text('{"name": "b", "date": "2026-01-01"}\n')
+        git(other, "commit", "-q", "-am", "other")
+        git(other, "push", "-q", "origin", "master")
+
+        # 사전을 고쳤지만 아직 "서버 DB에 최종 저장"을 누르지 않은 상태
+        (clone / ".gitattributes").write_text("challenge_log.jsonl merge=union\n# edited\n")
+        worker = GitSyncWorker(str(clone), debounce=0.1)
+        (clone / "challenge_log.jsonl").write_text('{"name": "a", "date": "2026-01-01"}\n')
+        worker.enqueue(["challenge_log.jsonl"], "chore: add attendance log for a")
+        assert worker.flush(timeout=30), worker.status().last_error
+        worker.stop()
+
+        assert len(git(remote, "show", "master:challenge_log.jsonl").splitlines()) == 2
+        assert "# edited" in (clone / ".gitattributes").read_text()  # 커밋하지 않은 변경은 그대로 남음
+        assert "# edited" not in git(remote, "show", "master:.gitattributes")
+
+
+def test_append_waits_for_pull_rebase():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, clone = setup_repo(root)
+        other = make_clone(root, remote, "other")
+        (other / "challenge_log.jsonl").write_text('{"name": "b", "date": "2026-01-01"}\n')
+        git(other, "commit", "-q", "-am", "other")
+        git(other, "push", "-q", "origin", "master")
+
+        store = AttendanceStore(str(clone / "challenge_log.jsonl"))
+        store.append({"name": "a", "date": "2026-01-01"})
+        worker = GitSyncWorker(str(clone), debounce=0.1)
+        appended, during_pull = [], []
+        writer = threading.Thread(target=lambda: appended.append(store.append({"name": "c", "date": "2026-01-01"})))
+        git_call = worker._git
+
+        def git_with_append_during_pull(*args, **kwargs):
+            if args[0] == "pull":
+                # pull --rebase가 출석 로그를 바꾸는 동안 다른 요청이 출석을 기록
+                writer.start()
+                time.sleep(0.3)
+                during_pull.append(list(appended))
+            return git_call(*args, **kwargs)
+
+        worker._git = git_with_append_during_pull
+        worker.enqueue(["challenge_log.jsonl"], "chore: add attendance log for a")
+        assert worker.flush(timeout=30), worker.status().last_error
+        worker.stop()
+        writer.join(10)
+
+        assert during_pull == [[]]  # rebase가 끝날 때까지 기다림
+        assert appended == [True]
+        names = sorted(line.split('"')[3] for line in (clone / "challenge_log.jsonl").read_text().splitlines())
+        assert names == ["a", "b", "c"]
+
+
+def test_store_reindexes_after_pull_rebase():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        remote, clone = setup_repo(root)
+        store = AttendanceStore(str(clone / "challenge_log.jsonl"))
+        worker = GitSyncWorker(str(clone), debounce=0.1)
+        for name in ("a1", "a2", "a3"):
+            store.append({"name": name, "date": "2026-01-01"})
+            worker.enqueue(["challenge_log.jsonl"], f"chore: add attendance log for {name}")
+        other = make_clone(root, remote, "other")
+        (other / "challenge_log.jsonl").write_text('{"name": "b", "date": "2026-01-01"}\n')
+        git(other, "commit", "-q", "-am", "other")
+        git(other, "push", "-q", "origin", "master")
+        assert len(store) == 3
+
+        # rebase가 원격 줄을 로컬 줄 앞에 넣어 파일을 다시 씀
+        assert worker.flush(timeout=30), worker.status().last_error
+        worker.stop()
+        assert sorted(name for name, _ in store.leaderboard()) == ["a1", "a2", "a3", "b"]
+        assert not store.append({"name": "b", "date": "2026-01-01"})
+
+
+if __name__ == "__main__":
+    test_coalesces_entries_into_one_commit()
+    test_retries_and_merges_concurrent_appends()
+    test_sync_with_unrelated_dirty_tracked_file()
+    test_append_waits_for_pull_rebase()
+    test_store_reindexes_after_pull_rebase()
+    print("ok")
@@ -0,0 +1,62 @@
+"""
+미리 컴파일된 훈음 표(hanja_table.py) 테스트 스크립트
+
+임시 사전 파일(HANJADICT_TABLE)과 임시 표 파일(HANJA_TABLE_PATH)로 새 프로세스에서 load_table을 실행해,
+표가 최신이면 hanjadict(사전 JSON 전체)를 불러오지 않고, 사전 파일이 바뀌거나 표 파일이 잘렸으면
+다시 빌드하는지 확인합니다.
+
+    python tests/hanja_table_test.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import sys
+from hanja_table import load_table
+table = load_table()
+print(table.candidates("樂"), "hanjadict" in sys.modules)
+"""
+
+
+def probe(env: dict) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+
+
+def test_fresh_table_does_not_load_hanjadict(tmp_path: Path):
+    data = tmp_path / "table.json"
+    data.write_text(json.dumps({"樂": "즐거울 락, 노래 악"}, ensure_ascii=False), encoding="utf-8")
+    env = {**os.environ, "HANJADICT_TABLE": str(data), "HANJA_TABLE_PATH": str(tmp_path / "hanja_table.bin")}
+
+    assert probe(env) == "('즐거울 락', '노래 악') True"  # 처음에는 빌드
+    assert probe(env) == "('즐거울 락', '노래 악') False"  # 최신 표는 mmap만
+
+    data.write_text(json.dumps({"樂": "좋아할 요"}, ensure_ascii=False), encoding="utf-8")
+    assert probe(env) == "('좋아할 요',) True"  # 사전이 바뀌면 다시 빌드
+
+
+def test_truncated_table_is_rebuilt(tmp_path: Path):
+    data = tmp_path / "table.json"
+    data.write_text(json.dumps({"樂": "즐거울 락, 노래 악"}, ensure_ascii=False), encoding="utf-8")
+    table = tmp_path / "hanja_table.bin"
+    env = {**os.environ, "HANJADICT_TABLE": str(data), "HANJA_TABLE_PATH": str(table)}
+    probe(env)
+    full = table.read_bytes()
+    table.write_bytes(full[:len(full) // 3])  # 쓰다가 끊긴 파일
+
+    assert probe(env) == "('즐거울 락', '노래 악') True"
+    assert table.read_bytes() == full
+
+
+if __name__ == "__main__":
+    for test in (test_fresh_table_does_not_load_hanjadict, test_truncated_table_is_rebuilt):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test(Path(tmp_dir))
+    print("ok")
@@ -0,0 +1,112 @@
+"""
+Pillow 미리보기(native_preview.py)와 poppler(pdftoppm) 미리보기의 픽셀 비교 테스트 스크립트
+
+같은 노트를 PDF → pdftoppm으로 래스터화한 이미지와 레이아웃 계획을 바로 그린 이미지를 페이지별로 비교합니다.
+글꼴 힌팅과 안티에일리어싱 차이로 가장자리가 1픽셀 정도 어긋나는 것은 허용하고(이웃 3×3 픽셀 중 하나와
+밝기 차가 TOLERANCE 이하면 같은 픽셀), 그보다 큰 차이가 나는 픽셀 비율이 MAX_MISMATCH를 넘으면 실패합니다.
+격자가 빠지거나 글자가 0.3mm 이상 밀리면 이 기준을 넘습니다.
+
+    python tests/native_preview_test.py [폰트 경로]
+    TEST_FONT_PATH=폰트 경로 python -m pytest tests/native_preview_test.py
+
+폰트가 없으면 건너뛰고, pdftoppm이 없으면 페이지 수와 이미지 크기만 확인합니다.
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+from PIL import Image, ImageChops, ImageFilter  # noqa: E402
+
+from analects_tracing import AnalectsTracingPDF, Config, parse_text_input  # noqa: E402
+from native_preview import rasterize_plan_pages  # noqa: E402
+from preview import count_pages, rasterize_pages  # noqa: E402
+
+FONT_PATH = "fonts/NotoSerifCJKkr-Regular.otf"
+TOLERANCE = 32  # 밝기 차 (0-255)
+MAX_MISMATCH = 0.01  # 페이지당 허용하는 불일치 픽셀 비율
+
+TEXT = """260210
+9.자한편
+30.子曰知者不惑仁者不憂勇者不懼
+(자왈지자불혹인자불우용자불구)
+공자께서 말씀하셨다. 지혜로운 사람은 미혹되지 않고, 어진 사람은 근심하지 않으며, 용감한 사람은 두려워하지 않는다.
+1.학이편
+1.子曰學而時習之不亦說乎有朋自遠方來不亦樂乎人不知而不慍不亦君子乎
+공자께서 말씀하셨다. 배우고 때때로 익히면 또한 기쁘지 아니한가.
+"""
+
+
+def _outside(a: Image.Image, b: Image.Image) -> int:
+    """a의 픽셀 중 b의 같은 위치 3×3 이웃의 밝기 범위에서 TOLERANCE보다 더 벗어난 픽셀 수"""
+    low, high = b.filter(ImageFilter.MinFilter(3)), b.filter(ImageFilter.MaxFilter(3))
+    excess = ImageChops.lighter(ImageChops.subtract(low, a), ImageChops.subtract(a, high))
+    return sum(excess.histogram()[TOLERANCE + 1:])
+
+
+def mismatch_ratio(reference: Image.Image, image: Image.Image) -> float:
+    a, b = reference.convert("L"), image.convert("L")
+    assert a.size == b.size, (a.size, b.size)
+    return (_outside(a, b) + _outside(b, a)) / (a.width * a.height)
+
+
+@pytest.fixture(scope="module")
+def font_path() -> str:
+    path = os.getenv("TEST_FONT_PATH", FONT_PATH)
+    if not Path(path).exists():
+        pytest.skip(f"폰트 파일을 찾을 수 없습니다: {path}")
+    return path
+
+
+@pytest.fixture(scope="module")
+def passages():
+    return parse_text_input(TEXT)
+
+
+@pytest.fixture(scope="module", params=(True, False), ids=("meaning", "no-meaning"))
+def config(request) -> Config:
+    return Config(show_meaning=request.param, use_compact_font=False)
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes(font_path: str, passages, config) -> bytes:
+    return AnalectsTracingPDF(config, font_path).generate_bytes(passages)
+
+
+def test_page_count_and_size(font_path: str, passages, config, pdf_bytes: bytes):
+    images = rasterize_plan_pages(passages, config, font_path, dpi=100)
+    assert len(images) == count_pages(pdf_bytes), (len(images), count_pages(pdf_bytes))
+    assert images[1].size == (827, 1170), images[1].size  # A4 @ 100 DPI, pdftoppm과 같은 올림
+
+
+def test_pixels_match_poppler(font_path: str, passages, config, pdf_bytes: bytes):
+    if not shutil.which("pdftoppm"):
+        pytest.skip("pdftoppm이 없어 픽셀 비교는 건너뜁니다.")
+    for dpi in (100, 200):
+        reference = rasterize_pages(pdf_bytes, dpi=dpi)
+        native = rasterize_plan_pages(passages, config, font_path, dpi=dpi)
+        assert sorted(reference) == sorted(native)
+        for page in reference:
+            ratio = mismatch_ratio(reference[page], native[page])
+            print(f"{dpi} dpi p{page}: 불일치 {ratio:.3%}")
+            assert ratio <= MAX_MISMATCH, (dpi, page, ratio)
+
+
+if __name__ == "__main__":
+    font_path = sys.argv[1] if len(sys.argv) > 1 else FONT_PATH
+    if not Path(font_path).exists():
+        print(f"skip: 폰트 파일을 찾을 수 없습니다: {font_path}")
+        sys.exit(0)
+    passages = parse_text_input(TEXT)
+    for show_meaning in (True, False):
+        config = Config(show_meaning=show_meaning, use_compact_font=False)
+        pdf_bytes = AnalectsTracingPDF(config, font_path).generate_bytes(passages)
+        test_page_count_and_size(font_path, passages, config, pdf_bytes)
+        if shutil.which("pdftoppm"):
+            test_pixels_match_poppler(font_path, passages, config, pdf_bytes)
+        else:
+            print("pdftoppm이 없어 픽셀 비교는 건너뜁니다.")
+    print("ok")
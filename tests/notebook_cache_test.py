@@ -0,0 +1,136 @@
+"""
+노트 캐시(notebook_cache.py) 테스트 스크립트
+
+크기 제한 LRU 정리(가장 오래 사용되지 않은 항목부터, get이 최근 사용 시각을 갱신),
+쓴 양에 따른 주기적 정리, 적중/실패 횟수를 확인합니다.
+축소 폰트를 임시 디렉토리에 다른 글자 집합으로 두 번 빌드해, 본문 폰트가 바뀌면 캐시 키도 바뀌는지 확인합니다.
+
+    python tests/notebook_cache_test.py [폰트 경로]
+    TEST_FONT_PATH=폰트 경로 python -m pytest tests/notebook_cache_test.py
+
+키 테스트는 폰트가 없으면 건너뜁니다.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+from analects_tracing import Config, parse_text_input  # noqa: E402
+from font_registry import get_font_registry  # noqa: E402
+from font_subset import build_compact_font, find_compact_font  # noqa: E402
+from notebook_cache import PDF_NAME, NotebookCache, notebook_key  # noqa: E402
+
+FONT_PATH = "fonts/NotoSerifCJKkr-Regular.otf"
+
+TEXT = """260210
+1.학이편
+1.子曰學而時習之
+공자께서 말씀하셨다.
+"""
+
+
+@pytest.fixture(scope="module")
+def font_path() -> str:
+    path = os.getenv("TEST_FONT_PATH", FONT_PATH)
+    if not Path(path).exists():
+        pytest.skip(f"폰트 파일을 찾을 수 없습니다: {path}")
+    return path
+
+
+def age(cache: NotebookCache, key: str, seconds: float) -> None:
+    """항목의 최근 사용 시각을 seconds초 전으로 돌립니다."""
+    at = time.time() - seconds
+    os.utime(cache._entry_dir(key), (at, at))
+
+
+def fill(cache: NotebookCache, keys: str) -> None:
+    """키마다 100바이트를 저장하고, 앞의 키일수록 오래 전에 사용한 것으로 만듭니다."""
+    for i, key in enumerate(keys):
+        cache.put(key * 4, PDF_NAME, b"x" * 100)
+        age(cache, key * 4, 10 * (len(keys) - i))
+
+
+def test_evicts_least_recently_used_first(tmp_path: Path):
+    cache = NotebookCache(root=str(tmp_path), max_bytes=300)
+    fill(cache, "abc")
+    assert cache.size_bytes() == 300
+    cache.put("dddd", PDF_NAME, b"x" * 100)
+    assert sorted(cache.keys()) == ["bbbb", "cccc", "dddd"]
+    assert cache.size_bytes() == 300
+
+
+def test_get_refreshes_recency(tmp_path: Path):
+    cache = NotebookCache(root=str(tmp_path), max_bytes=300)
+    fill(cache, "abc")
+    assert cache.get("aaaa", PDF_NAME) == b"x" * 100
+    assert cache.peek("bbbb", PDF_NAME) == b"x" * 100  # peek은 최근 사용 시각을 바꾸지 않음
+    cache.put("dddd", PDF_NAME, b"x" * 100)
+    assert sorted(cache.keys()) == ["aaaa", "cccc", "dddd"]
+
+
+def test_evicts_after_writing_a_twentieth_of_the_limit(tmp_path: Path, monkeypatch):
+    cache = NotebookCache(root=str(tmp_path), max_bytes=2000)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(cache.size_bytes()) or evict())
+
+    cache.put("0000", PDF_NAME, b"x" * 10)
+    assert len(scans) == 1  # 처음 저장할 때 한 번 정리
+    for i in range(1, 10):
+        cache.put(f"{i}" * 4, PDF_NAME, b"x" * 10)
+    assert len(scans) == 1
+    cache.put("aaaa", PDF_NAME, b"x" * 10)  # 100바이트 = 2000 / 20
+    assert len(scans) == 2
+
+
+def test_hit_and_miss_counters(tmp_path: Path):
+    cache = NotebookCache(root=str(tmp_path), max_bytes=1000)
+    assert cache.get("aaaa", PDF_NAME) is None
+    cache.put("aaaa", PDF_NAME, b"pdf")
+    assert cache.get("aaaa", PDF_NAME) == b"pdf"
+    assert cache.get("aaaa", "preview-p1-72dpi.png") is None
+    assert cache.peek("aaaa", PDF_NAME) == b"pdf"  # peek은 세지 않음
+    cache.record(hits=2, misses=1)  # 워커 프로세스의 조회 결과
+    assert cache.stats() == {"hits": 3, "misses": 3, "hit_rate": 0.5}
+
+
+def test_rebuilt_compact_font_changes_key(font_path: str, tmp_path: Path):
+    font = tmp_path / Path(font_path).name
+    shutil.copy(font_path, font)
+    passages = parse_text_input(TEXT)
+    compact, full = Config(use_compact_font=True), Config(use_compact_font=False)
+
+    before = notebook_key(passages, compact, str(font))  # 축소 폰트 없음 → 원본으로 씀
+    assert before == notebook_key(passages, compact, str(font), str(font))
+
+    build_compact_font(str(font), "子曰學而時習之가나다")
+    assert find_compact_font(str(font))
+    first = notebook_key(passages, compact, str(font))
+    assert first != before
+
+    build_compact_font(str(font), "子曰學而時習之가나다라마바사")
+    get_font_registry().clear()  # 같은 경로의 폰트를 다시 읽도록 (새 프로세스와 같은 상태)
+    second = notebook_key(passages, compact, str(font))
+    assert second != first
+
+    # 축소 폰트를 쓰지 않는 설정의 키는 축소 폰트와 무관합니다.
+    assert notebook_key(passages, full, str(font)) == notebook_key(passages, full, str(font), str(font))
+
+
+if __name__ == "__main__":
+    for test in (test_evicts_least_recently_used_first, test_get_refreshes_recency, test_hit_and_miss_counters):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    path = sys.argv[1] if len(sys.argv) > 1 else FONT_PATH
+    if not Path(path).exists():
+        print(f"skip: 폰트 파일을 찾을 수 없습니다: {path}")
+        sys.exit(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        test_rebuilt_compact_font_changes_key(path, Path(tmp))
+    print("ok")
@@ -0,0 +1,155 @@
+"""
+구절 페이지 캐시(page_cache.py) 테스트 스크립트
+
+캐시 없이 만든 노트와, 빈 캐시로 만든 노트 / 구절 순서를 바꿔 채워진 캐시에서 붙인 노트의
+페이지 수와 페이지별 텍스트를 비교합니다. 캐시된 페이지의 텍스트는 유니코드로 저장했다가
+붙일 때 현재 문서의 서브셋 번호로 다시 인코딩되므로, 서브셋 순서가 달라져도 같은 글자가 나와야 합니다.
+글자별 무효화(invalidate_chars)와, 대체 폰트나 TJ가 쓰인 구절은 저장하지 않는 경로도 확인합니다.
+
+    python tests/page_cache_test.py [폰트 경로]
+    TEST_FONT_PATH=폰트 경로 python -m pytest tests/page_cache_test.py
+
+폰트가 없으면 건너뜁니다.
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import pytest  # noqa: E402
+
+from analects_tracing import AnalectsTracingPDF, Config, parse_text_input  # noqa: E402
+from corpus import corpus_passages  # noqa: E402
+from font_registry import get_font_registry  # noqa: E402
+from font_subset import build_compact_font  # noqa: E402
+from page_cache import PageCache  # noqa: E402
+from preview import count_pages  # noqa: E402
+
+FONT_PATH = "fonts/NotoSerifCJKkr-Regular.otf"
+
+_TEXT_OP = re.compile(rb"\(((?:\\.|[^\\)])*)\) Tj")
+_ESCAPE = re.compile(rb"\\(.)", re.S)
+
+TEXT = """260210
+1.학이편
+1.子曰學而時習之
+공자께서 말씀하셨다.
+4.子曰仁者樂山
+공자께서 말씀하셨다.
+"""
+
+
+@pytest.fixture(scope="module")
+def font_path() -> str:
+    path = os.getenv("TEST_FONT_PATH", FONT_PATH)
+    if not Path(path).exists():
+        pytest.skip(f"폰트 파일을 찾을 수 없습니다: {path}")
+    return path
+
+
+@pytest.fixture
+def page_cache(tmp_path: Path) -> PageCache:
+    return PageCache(root=str(tmp_path / "pages"), max_bytes=1 << 26)
+
+
+def render(font_path: str, passages, page_cache=None, config: Config = None):
+    """(생성기, 페이지별 텍스트, PDF 바이트). 텍스트는 output()이 페이지를 직렬화하기 전에 꺼냅니다."""
+    generator = AnalectsTracingPDF(config or Config(use_compact_font=False), font_path, page_cache=page_cache)
+    for passage in passages:
+        generator.render_passage(passage)
+    texts = page_texts(generator)
+    return generator, texts, bytes(generator.pdf.output())
+
+
+def page_texts(generator: AnalectsTracingPDF) -> list[str]:
+    """페이지마다 텍스트 연산자의 글리프를 문서의 서브셋 표(ToUnicode와 같은 표)로 되돌린 문자열"""
+    font = generator.pdf.fonts["cjk"]
+    id_to_char = {}
+    for glyph, char_id in font.subset.items():
+        unicode = glyph.unicode if isinstance(glyph.unicode, tuple) else (glyph.unicode,)
+        id_to_char[char_id] = "".join(chr(u) for u in unicode)
+    texts = []
+    for page in generator.export_pages():
+        runs = []
+        for m in _TEXT_OP.finditer(page.contents):
+            raw = _ESCAPE.sub(lambda e: b"\r" if e.group(1) == b"r" else e.group(1), m.group(1))
+            runs.append("".join(id_to_char[ord(c)] for c in raw.decode("utf-16-be")))
+        texts.append("|".join(runs))
+    return texts
+
+
+def test_cold_and_warm_cache_match_uncached(font_path: str, page_cache: PageCache):
+    passages = corpus_passages()[:6]
+    reordered = passages[::-1]
+
+    plain, plain_texts, plain_pdf = render(font_path, passages)
+    _, cold_texts, cold_pdf = render(font_path, passages, page_cache)
+    assert (page_cache.hits, page_cache.misses) == (0, len(passages))
+    assert count_pages(cold_pdf) == count_pages(plain_pdf) == plain.pdf.page
+    assert cold_texts == plain_texts
+
+    # 구절 순서가 바뀌면 서브셋 번호도 바뀌므로, 다시 인코딩이 맞아야 같은 글자가 나옵니다.
+    _, plain_texts, plain_pdf = render(font_path, reordered)
+    _, warm_texts, warm_pdf = render(font_path, reordered, page_cache)
+    assert (page_cache.hits, page_cache.misses) == (len(passages), len(passages))
+    assert count_pages(warm_pdf) == count_pages(plain_pdf)
+    assert warm_texts == plain_texts
+
+
+def test_invalidate_chars_removes_only_passages_using_them(font_path: str, page_cache: PageCache):
+    passages = parse_text_input(TEXT)
+    render(font_path, passages, page_cache)
+    assert len(page_cache.store.keys()) == 2
+
+    assert page_cache.invalidate_chars("習") == 1  # 1-1만 씀
+    assert page_cache.invalidate_chars("習") == 0
+    render(font_path, passages, page_cache)
+    assert (page_cache.hits, page_cache.misses) == (1, 3)
+    assert page_cache.invalidate_chars("子") == 2  # 두 구절 모두 씀
+    assert page_cache.store.keys() == []
+
+
+def test_fallback_font_pages_are_not_cached(font_path: str, page_cache: PageCache):
+    # 仁을 뺀 축소 폰트를 두면 4번 구절은 원본 폰트(대체 폰트)로도 그려지므로 저장하지 않습니다.
+    font = Path(tempfile.mkdtemp()) / Path(font_path).name
+    shutil.copy(font_path, font)
+    try:
+        build_compact_font(str(font), "".join(chr(c) for c in get_font_registry().cmap(font_path) if chr(c) != "仁"))
+        passages = parse_text_input(TEXT)
+        generator, _, _ = render(str(font), passages, page_cache, Config(use_compact_font=True))
+        assert "cjkfull" in generator.pdf.fonts
+        assert len(page_cache.store.keys()) == 1
+        render(str(font), passages, page_cache, Config(use_compact_font=True))
+        assert (page_cache.hits, page_cache.misses) == (1, 3)
+    finally:
+        shutil.rmtree(font.parent)
+
+
+def test_tj_pages_are_not_cached(font_path: str, page_cache: PageCache, monkeypatch):
+    generator = AnalectsTracingPDF(Config(use_compact_font=False), font_path, page_cache=page_cache)
+    emit_plan = generator.emit_plan
+
+    def emit_with_kerning(plan):
+        emit_plan(plan)
+        generator.pdf._out("BT [(\x00\x01) -20 (\x00\x02)] TJ ET")
+
+    monkeypatch.setattr(generator, "emit_plan", emit_with_kerning)
+    assert page_cache.render_passage(generator, parse_text_input(TEXT)[0]) is False
+    assert page_cache.store.keys() == []
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else FONT_PATH
+    if not Path(path).exists():
+        print(f"skip: 폰트 파일을 찾을 수 없습니다: {path}")
+        sys.exit(0)
+    for test in (test_cold_and_warm_cache_match_uncached, test_invalidate_chars_removes_only_passages_using_them,
+                 test_fallback_font_pages_are_not_cached):
+        with tempfile.TemporaryDirectory() as root:
+            test(path, PageCache(root=root, max_bytes=1 << 26))
+    print("ok")
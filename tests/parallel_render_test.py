@@ -0,0 +1,115 @@
+"""
+여러 프로세스 렌더링(parallel_render.py) 테스트 스크립트
+
+합성 코퍼스(benchmarks/corpus.py)의 구절을 묶음으로 나눠 렌더링하고 합친 문서가 한 프로세스로 만든
+문서와 같은 페이지(텍스트와 격자 셀 배치)를 갖는지, 합친 PDF에 폰트가 한 번만 들어가는지,
+미리 정한 글자 목록이 어긋나면(SubsetMismatchError) 한 프로세스 렌더링으로 돌아가는지 확인합니다.
+
+    python tests/parallel_render_test.py [폰트 경로]
+    TEST_FONT_PATH=폰트 경로 python -m pytest tests/parallel_render_test.py
+
+폰트가 없으면 건너뜁니다.
+"""
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import pytest  # noqa: E402
+
+import parallel_render  # noqa: E402
+from analects_tracing import AnalectsTracingPDF, Config  # noqa: E402
+from corpus import corpus_passages  # noqa: E402
+from parallel_render import (  # noqa: E402
+    SubsetMismatchError, merge_shards, render_shard, render_sharded, seed_characters, split_shards,
+)
+from preview import count_pages  # noqa: E402
+
+FONT_PATH = "fonts/NotoSerifCJKkr-Regular.otf"
+CONFIG = Config(use_compact_font=False)
+
+
+@pytest.fixture(scope="module")
+def font_path() -> str:
+    path = os.getenv("TEST_FONT_PATH", FONT_PATH)
+    if not Path(path).exists():
+        pytest.skip(f"폰트 파일을 찾을 수 없습니다: {path}")
+    return path
+
+
+@pytest.fixture(scope="module")
+def passages():
+    return corpus_passages(long_passages=False)[:12]
+
+
+def page_drawing(generator: AnalectsTracingPDF) -> list[tuple[list[bytes], list[bytes]]]:
+    """
+    페이지마다 (텍스트 블록(BT … ET), 격자 셀 배치) 목록. 색·선 상태는 앞 페이지에서 이어지는 정도만 다르므로 비교하지 않고,
+    격자 셀 템플릿 번호는 등록 순서에 따라 다르므로 셀 크기로 바꿉니다.
+    """
+    sizes = generator.template_sizes()
+    return [
+        (
+            re.findall(rb"BT .*? ET", page.contents, re.S),
+            [b"%s %r" % (m.group(1), sizes[int(m.group(2))]) for m in re.finditer(rb"([\d. ]+) cm /I(\d+) Do", page.contents)],
+        )
+        for page in generator.export_pages()
+    ]
+
+
+def seeded_generator(font_path: str, seed: str) -> AnalectsTracingPDF:
+    generator = AnalectsTracingPDF(CONFIG, font_path)
+    parallel_render._seed_subset(generator, seed)
+    return generator
+
+
+def test_merged_shards_match_serial_pages(font_path: str, passages):
+    seed = seed_characters(passages, CONFIG)
+    serial = seeded_generator(font_path, seed)
+    for passage in passages:
+        serial.render_passage(passage)
+
+    chunks = split_shards(passages, 3)
+    assert len(chunks) == 3 and [p for chunk in chunks for p in chunk] == passages
+    merged = seeded_generator(font_path, seed)
+    merge_shards(merged, [render_shard(chunk, CONFIG, font_path, seed) for chunk in chunks])
+
+    # 서브셋 번호를 같은 글자 목록으로 정했으므로 텍스트 연산자가 그대로 같습니다.
+    assert page_drawing(merged) == page_drawing(serial)
+
+
+def test_render_sharded_writes_one_pdf_with_one_font(font_path: str, passages):
+    serial = AnalectsTracingPDF(CONFIG, font_path).generate_bytes(passages)
+    merged = render_sharded(passages, CONFIG, font_path, workers=2)
+    assert count_pages(merged) == count_pages(serial)
+    assert merged.count(b"/FontFile") == serial.count(b"/FontFile") == 1
+
+
+def test_subset_mismatch_falls_back_to_serial(font_path: str, passages, monkeypatch, capsys):
+    # 글자 목록에서 원문 글자 하나를 빼면 워커의 서브셋이 늘어나 SubsetMismatchError가 납니다.
+    dropped = passages[0].original[0]
+    monkeypatch.setattr(
+        parallel_render, "seed_characters", lambda ps, cfg: seed_characters(ps, cfg).replace(dropped, ""),
+    )
+    with pytest.raises(SubsetMismatchError):
+        render_shard(passages[:4], CONFIG, font_path, parallel_render.seed_characters(passages, CONFIG))
+
+    with ThreadPoolExecutor(2) as executor:
+        pdf_bytes = render_sharded(passages, CONFIG, font_path, workers=2, executor=executor)
+    assert "한 프로세스로 렌더링합니다" in capsys.readouterr().out
+    assert count_pages(pdf_bytes) == count_pages(AnalectsTracingPDF(CONFIG, font_path).generate_bytes(passages))
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else FONT_PATH
+    if not Path(path).exists():
+        print(f"skip: 폰트 파일을 찾을 수 없습니다: {path}")
+        sys.exit(0)
+    sample = corpus_passages(long_passages=False)[:12]
+    test_merged_shards_match_serial_pages(path, sample)
+    test_render_sharded_writes_one_pdf_with_one_font(path, sample)
+    print("ok")
@@ -0,0 +1,62 @@
+"""
+다음자(多音字) 훈음 선택과 두음법칙 규칙표(hanja_dictionary.py) 테스트 스크립트
+
+훈음 표(hanjadict 데이터) 없이 후보 목록을 직접 넘겨 음 색인과 규칙을 확인합니다.
+
+    python tests/polyphone_test.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hanja_dictionary import _select_candidate, initial_sound_form  # noqa: E402
+
+樂 = ("즐거울 락", "노래 악", "좋아할 요")
+
+
+def test_initial_sound_law():
+    cases = {
+        "락": "낙", "로": "노", "뢰": "뇌", "릉": "능",  # ㄹ → ㄴ
+        "례": "예", "륙": "육", "리": "이", "량": "양", "률": "율",  # ㄹ + ㅑㅕㅖㅛㅠㅣ → ㅇ
+        "녀": "여", "뇨": "요", "닉": "익",  # ㄴ + ㅑㅕㅖㅛㅠㅣ → ㅇ
+        "낙": "낙", "가": "가", "a": "a", "": "",  # 바뀌지 않음
+    }
+    for sound, expected in cases.items():
+        assert initial_sound_form(sound) == expected, (sound, initial_sound_form(sound))
+
+
+def test_exact_sound_is_preferred():
+    assert _select_candidate(樂, "락") == "즐거울 락"
+    assert _select_candidate(樂, "악") == "노래 악"
+    assert _select_candidate(樂, "요") == "좋아할 요"
+    assert _select_candidate(("아닐 불", "아닐 부"), "부") == "아닐 부"
+
+
+def test_initial_sound_variants_match():
+    assert _select_candidate(樂, "낙") == "즐거울 락"  # 낙원(樂園)
+    assert _select_candidate(("여섯 륙",), "육") == "여섯 륙"
+    assert _select_candidate(("예도 례",), "예") == "예도 례"
+    assert _select_candidate(("계집 녀",), "여") == "계집 녀"
+    assert _select_candidate(("허락할 낙",), "락") == "허락할 낙"  # 본음이 ㄴ이고 읽기가 ㄹ인 경우
+    assert _select_candidate(("거느릴 솔", "비율 률"), "율") == "비율 률"
+
+
+def test_sound_alias():
+    assert _select_candidate(("아닐 불",), "부") == "아닐 불"
+    assert _select_candidate(("아닐 부",), "불") == "아닐 부"
+
+
+def test_unknown_sound_falls_back_to_first():
+    assert _select_candidate(樂, "학") == "즐거울 락"
+    assert _select_candidate(樂, None) == "즐거울 락"
+    assert _select_candidate(("말씀 설", "기쁠 열", "달랠 세"), "설") == "말씀 설"
+
+
+if __name__ == "__main__":
+    test_initial_sound_law()
+    test_exact_sound_is_preferred()
+    test_initial_sound_variants_match()
+    test_sound_alias()
+    test_unknown_sound_falls_back_to_first()
+    print("ok")
@@ -0,0 +1,94 @@
+"""
+렌더링 작업 큐(render_queue.RenderQueue)의 대기 순번 알림 테스트 스크립트
+
+실행 슬롯 하나에 작업 셋을 넣고, 앞 작업이 끝날 때마다 뒤 작업의 순번 알림이 갱신되는지,
+시작 알림(0)을 보내는 동안 작업이 기다리지 않는지 확인합니다.
+작업은 스레드 풀에서 시간만 끄므로 폰트나 poppler가 필요 없습니다.
+
+    python tests/render_queue_test.py
+"""
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from render_queue import RenderQueue  # noqa: E402
+
+
+def test_positions_are_updated_as_jobs_ahead_finish():
+    positions: dict[int, list[int]] = {1: [], 2: [], 3: []}
+
+    def recorder(chat_id: int):
+        async def on_queued(position: int):
+            await asyncio.sleep(0.01)  # 텔레그램 메시지 수정처럼 시간이 걸리는 알림
+            positions[chat_id].append(position)
+        return on_queued
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            queue = RenderQueue(executor, 1, 4, 1)
+            jobs = []
+            for chat_id in (1, 2, 3):
+                jobs.append(asyncio.create_task(
+                    queue.submit(chat_id, time.sleep, 0.1, on_queued=recorder(chat_id))))
+                await asyncio.sleep(0)  # 제출 순서 고정
+            await asyncio.gather(*jobs)
+            assert queue.queue_depth == 0
+
+    asyncio.run(main())
+    assert positions == {1: [], 2: [1, 0], 3: [2, 1, 0]}, positions
+
+
+def test_cancelled_job_moves_later_jobs_up():
+    positions: list[int] = []
+
+    async def on_queued(position: int):
+        positions.append(position)
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            queue = RenderQueue(executor, 1, 4, 1)
+            first = asyncio.create_task(queue.submit(1, time.sleep, 0.2))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(queue.submit(2, time.sleep, 0.01))
+            await asyncio.sleep(0)
+            third = asyncio.create_task(queue.submit(3, time.sleep, 0.01, on_queued=on_queued))
+            await asyncio.sleep(0.05)
+            second.cancel()  # 사용자가 떠난 경우
+            await asyncio.gather(first, third)
+
+    asyncio.run(main())
+    assert positions == [2, 1, 0], positions
+
+
+def test_job_starts_without_waiting_for_started_notice():
+    events: list[str] = []
+
+    async def on_queued(position: int):
+        if position == 0:
+            await asyncio.sleep(0.2)  # 느린 시작 알림
+        events.append(f"notice {position}")
+
+    def job():
+        events.append("job")
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            queue = RenderQueue(executor, 1, 4, 1)
+            first = asyncio.create_task(queue.submit(1, time.sleep, 0.05))
+            await asyncio.sleep(0)
+            await asyncio.gather(first, queue.submit(2, job, on_queued=on_queued))
+
+    asyncio.run(main())
+    # 작업은 시작 알림을 기다리지 않고, submit은 시작 알림이 끝난 뒤 반환합니다.
+    assert events == ["notice 1", "job", "notice 0"], events
+
+
+if __name__ == "__main__":
+    test_positions_are_updated_as_jobs_ahead_finish()
+    test_cancelled_job_moves_later_jobs_up()
+    test_job_starts_without_waiting_for_started_notice()
+    print("ok")
@@ -0,0 +1,73 @@
+"""
+세션별 미리보기 저장소(session_store.py) 테스트 스크립트
+
+크기 제한을 넘을 때 오래 사용되지 않은 항목부터 지우는지와, 프로세스 전체 보고가
+살아 있는 세션만 합산하는지 확인합니다. Streamlit이나 폰트가 필요 없습니다.
+
+    python tests/session_store_test.py
+"""
+import gc
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_store import SessionStore, memory_report, process_rss_bytes  # noqa: E402
+
+
+def test_least_recently_used_is_evicted():
+    store = SessionStore(max_bytes=300)
+    for page in (1, 2, 3):
+        assert store.put((page, 100), bytes([page]) * 100)
+    assert store.get((1, 100)) is not None  # 1페이지를 다시 봄 → 2페이지가 가장 오래됨
+    store.put((4, 100), b"4" * 100)
+    assert (2, 100) not in store
+    assert [(p, 100) in store for p in (1, 3, 4)] == [True, True, True]
+    assert store.stats() == {"entries": 3, "bytes": 300, "max_bytes": 300, "evictions": 1}
+
+
+def test_replacing_an_entry_updates_size():
+    store = SessionStore(max_bytes=300)
+    store.put("a", b"x" * 200)
+    store.put("a", b"y" * 50)
+    assert store.nbytes == 50 and store.get("a") == b"y" * 50
+
+
+def test_oversized_entry_is_not_stored():
+    store = SessionStore(max_bytes=100)
+    store.put("small", b"s" * 10)
+    assert not store.put("big", b"b" * 101)
+    assert "big" not in store and "small" in store
+
+
+def test_clear():
+    store = SessionStore(max_bytes=100)
+    store.put("a", b"a" * 10)
+    store.clear()
+    assert len(store) == 0 and store.nbytes == 0
+
+
+def test_report_sums_live_sessions():
+    gc.collect()
+    before = memory_report()
+    stores = [SessionStore(max_bytes=1000) for _ in range(3)]
+    for store in stores:
+        store.put("page", b"p" * 100)
+    report = memory_report()
+    assert report["sessions"] == before["sessions"] + 3
+    assert report["bytes"] == before["bytes"] + 300
+    del stores, store
+    gc.collect()
+    after = memory_report()
+    assert after["sessions"] == before["sessions"] and after["bytes"] == before["bytes"]
+    rss = process_rss_bytes()
+    assert rss is None or rss > 0
+
+
+if __name__ == "__main__":
+    test_least_recently_used_is_evicted()
+    test_replacing_an_entry_updates_size()
+    test_oversized_entry_is_not_stored()
+    test_clear()
+    test_report_sums_live_sessions()
+    print("ok")
@@ -0,0 +1,130 @@
+"""
+텔레그램 봇 두 단계 응답(첫 구절 미리보기 → 전체 PDF) 테스트 스크립트
+
+가짜 context.bot과 메시지 객체로 handle_message를 실행합니다. 렌더링 작업은 시간만 끄는
+대역 함수로 바꾸고 스레드 풀에서 실행하므로 폰트, poppler, 텔레그램 토큰이 필요 없습니다.
+
+    python tests/telegram_preview_test.py
+    python -m pytest tests/telegram_preview_test.py
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import telegram_bot  # noqa: E402
+from metrics import FIRST_IMAGE_SECONDS, REQUESTS, STAGE_ERRORS, stage  # noqa: E402
+from render_queue import RenderQueue, RenderResult  # noqa: E402
+from upload_cache import FileIdCache  # noqa: E402
+
+PREVIEW_DELAY = 0.05
+FULL_DELAY = 0.4
+
+
+class FakeBot:
+    """보낸 순서와 시각을 기록하는 context.bot 대역"""
+
+    def __init__(self):
+        self.sent: list[tuple[str, float, dict]] = []
+
+    async def send_photo(self, **kwargs):
+        self.sent.append(("photo", time.perf_counter(), kwargs))
+
+    async def send_document(self, **kwargs):
+        self.sent.append(("document", time.perf_counter(), kwargs))
+
+
+class FakeStatus:
+    def __init__(self, text: str):
+        self.texts = [text]
+        self.deleted = False
+
+    async def edit_text(self, text: str):
+        self.texts.append(text)
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeMessage:
+    def __init__(self, text: str):
+        self.text = text
+        self.message_id = 7
+        self.status = None
+
+    async def reply_text(self, text: str):
+        self.status = FakeStatus(text)
+        return self.status
+
+
+def fake_first_page(text: str, font_path: str):
+    time.sleep(PREVIEW_DELAY)
+    return RenderResult(None, b"png", stage_seconds={"render": PREVIEW_DELAY}) if text != "empty" else None
+
+
+def fake_notebook(text: str, font_path: str):
+    if text == "fail":
+        with stage("render"):
+            raise RuntimeError("render failed")
+    time.sleep(FULL_DELAY)
+    return RenderResult(b"%PDF", b"png", stage_seconds={"render": FULL_DELAY}) if text != "empty" else None
+
+
+def run(text: str) -> tuple[FakeBot, FakeMessage, float]:
+    # 스크립트로 실행해도, pytest로 실행해도 같은 대역을 쓰도록 실행할 때마다 바꿔 끼웁니다.
+    telegram_bot.render_first_page = fake_first_page
+    telegram_bot.render_notebook = fake_notebook
+    telegram_bot.file_id_cache = FileIdCache(str(Path(tempfile.mkdtemp()) / "file_ids.jsonl"))
+    message = FakeMessage(text)
+    update = SimpleNamespace(message=message, effective_chat=SimpleNamespace(id=1))
+    context = SimpleNamespace(bot=FakeBot())
+
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            telegram_bot.render_queue = RenderQueue(executor, 1, 4, 1)
+            await telegram_bot.handle_message(update, context)
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return context.bot, message, start
+
+
+def test_preview_is_sent_before_full_pdf():
+    first_images = FIRST_IMAGE_SECONDS.count(source="bot")
+    bot, message, start = run("子曰學而時習之")
+    kinds = [kind for kind, _, _ in bot.sent]
+    assert kinds == ["photo", "document"], kinds
+    photo_at, document_at = bot.sent[0][1] - start, bot.sent[1][1] - start
+    # 미리보기는 전체 PDF 작업이 끝나기 전에 나가야 합니다.
+    assert photo_at < PREVIEW_DELAY + FULL_DELAY / 2, photo_at
+    assert document_at >= PREVIEW_DELAY + FULL_DELAY, document_at
+    assert FIRST_IMAGE_SECONDS.count(source="bot") == first_images + 1
+    assert message.status.deleted
+
+
+def test_empty_input_sends_nothing():
+    empty = REQUESTS.value(source="bot", outcome="empty")
+    bot, message, _ = run("empty")
+    assert bot.sent == []
+    assert "구절을 찾을 수 없습니다" in message.status.texts[-1]
+    assert REQUESTS.value(source="bot", outcome="empty") == empty + 1
+
+
+def test_full_pdf_failure_keeps_preview_and_counts_stage_error():
+    errors = STAGE_ERRORS.value(source="bot", stage="render")
+    bot, message, _ = run("fail")
+    assert [kind for kind, _, _ in bot.sent] == ["photo"]
+    assert "오류" in message.status.texts[-1]
+    assert STAGE_ERRORS.value(source="bot", stage="render") == errors + 1
+
+
+if __name__ == "__main__":
+    test_preview_is_sent_before_full_pdf()
+    test_empty_input_sends_nothing()
+    test_full_pdf_failure_keeps_preview_and_counts_stage_error()
+    print("ok")
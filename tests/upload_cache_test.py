@@ -0,0 +1,155 @@
+"""
+텔레그램 file_id 재사용 캐시(upload_cache.py) 테스트 스크립트
+
+텔레그램 대신 보낸 내용을 기록하고 file_id를 돌려주는 대역 봇으로 send_cached를 실행합니다.
+캐시 파일은 임시 디렉토리에 만들고, 시각은 직접 넘기는 시계로 조절합니다. 토큰이나 네트워크가 필요 없습니다.
+
+    python tests/upload_cache_test.py
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from telegram.error import BadRequest  # noqa: E402
+
+import upload_cache  # noqa: E402
+from metrics import TELEGRAM_UPLOAD_BYTES  # noqa: E402
+from upload_cache import FileIdCache, send_cached  # noqa: E402
+
+PNG = b"\x89PNG preview" * 100
+PDF = b"%PDF notebook" * 1000
+
+
+class StubBot:
+    """보낸 내용을 기록하고, 바이트를 받으면 새 file_id를 붙인 메시지를 돌려주는 봇 대역"""
+
+    def __init__(self, rejected: tuple = ()):
+        self.sent: list[tuple[str, object]] = []
+        self.rejected = set(rejected)  # 거절할 file_id (텔레그램에서 사라진 파일)
+        self._next = 0
+
+    def _message(self, kind: str, payload):
+        self.sent.append((kind, payload))
+        if isinstance(payload, str):
+            if payload in self.rejected:
+                raise BadRequest("Wrong file identifier/http url specified")
+            file_id = payload
+        else:
+            self._next += 1
+            file_id = f"{kind}-{self._next}"
+        if kind == "photo":
+            # 텔레그램은 사진을 여러 크기로 저장하고 작은 것부터 돌려줍니다.
+            return SimpleNamespace(photo=[SimpleNamespace(file_id=f"{file_id}-small"), SimpleNamespace(file_id=file_id)])
+        return SimpleNamespace(document=SimpleNamespace(file_id=file_id))
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        return self._message("photo", photo)
+
+    async def send_document(self, chat_id, document, **kwargs):
+        return self._message("document", document)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache_path() -> str:
+    return str(Path(tempfile.mkdtemp()) / "file_ids.jsonl")
+
+
+def send(bot, cache, kind, data):
+    return asyncio.run(send_cached(bot, cache, kind, 1, data, caption="x"))
+
+
+def test_second_send_reuses_file_id():
+    bot, cache = StubBot(), FileIdCache(_cache_path())
+    uploaded = TELEGRAM_UPLOAD_BYTES.value(kind="document")
+    send(bot, cache, "document", PDF)
+    send(bot, cache, "document", PDF)
+    send(bot, cache, "photo", PNG)
+    send(bot, cache, "photo", PNG)
+    assert bot.sent == [("document", PDF), ("document", "document-1"), ("photo", PNG), ("photo", "photo-2")], bot.sent
+    assert TELEGRAM_UPLOAD_BYTES.value(kind="document") == uploaded + len(PDF)
+    assert cache.stats()["hits"] == 2
+
+
+def test_different_content_is_uploaded():
+    bot, cache = StubBot(), FileIdCache(_cache_path())
+    send(bot, cache, "document", PDF)
+    send(bot, cache, "document", PDF + b"!")
+    assert [payload for _, payload in bot.sent] == [PDF, PDF + b"!"]
+
+
+def test_cache_survives_restart():
+    path = _cache_path()
+    send(StubBot(), FileIdCache(path), "photo", PNG)
+    bot = StubBot()
+    send(bot, FileIdCache(path), "photo", PNG)
+    assert bot.sent == [("photo", "photo-1")], bot.sent
+
+
+def test_entries_expire():
+    path, clock = _cache_path(), Clock()
+    cache = FileIdCache(path, ttl=60, clock=clock)
+    send(StubBot(), cache, "photo", PNG)
+    clock.now += 61
+    bot = StubBot()
+    send(bot, cache, "photo", PNG)
+    assert bot.sent == [("photo", PNG)]
+    # 다시 올린 file_id는 새 시각으로 저장되어 재시작 후에도 유효합니다.
+    assert FileIdCache(path, ttl=60, clock=clock).get("photo", PNG) == "photo-1"
+    clock.now += 61
+    assert FileIdCache(path, ttl=60, clock=clock).get("photo", PNG) is None
+
+
+def test_rejected_file_id_is_replaced():
+    path = _cache_path()
+    send(StubBot(), FileIdCache(path), "document", PDF)
+    bot, cache = StubBot(rejected=("document-1",)), FileIdCache(path)
+    send(bot, cache, "document", PDF)
+    assert bot.sent == [("document", "document-1"), ("document", PDF)], bot.sent
+    assert FileIdCache(path).get("document", PDF) == "document-1"  # 새로 올린 대역 봇의 첫 file_id
+
+
+def test_log_is_compacted():
+    path, clock = _cache_path(), Clock()
+    upload_cache.COMPACT_MIN_LINES = 10
+    try:
+        cache = FileIdCache(path, clock=clock)
+        for i in range(30):
+            cache.put("photo", PNG, f"id-{i}")
+        lines = Path(path).read_text().splitlines()
+        assert len(lines) < 10, len(lines)
+        assert FileIdCache(path, clock=clock).get("photo", PNG) == "id-29"
+    finally:
+        upload_cache.COMPACT_MIN_LINES = 1000
+
+
+def test_torn_last_line_is_ignored():
+    path = _cache_path()
+    FileIdCache(path).put("photo", PNG, "ok")
+    with open(path, "a") as f:
+        f.write('{"kind": "photo", "ha')
+    cache = FileIdCache(path)
+    assert cache.get("photo", PNG) == "ok"
+    cache.put("document", PDF, "after")  # 끊긴 줄 뒤에 이어 쓰지 않고 새 줄에 씁니다.
+    assert FileIdCache(path).get("document", PDF) == "after"
+
+
+if __name__ == "__main__":
+    test_second_send_reuses_file_id()
+    test_different_content_is_uploaded()
+    test_cache_survives_restart()
+    test_entries_expire()
+    test_rejected_file_id_is_replaced()
+    test_log_is_compacted()
+    test_torn_last_line_is_ignored()
+    print("ok")
@@ -0,0 +1,200 @@
+"""
+텔레그램 file_id 재사용 캐시 모듈
+
+텔레그램은 한 번 올린 파일에 file_id를 붙여 주고, 같은 봇은 이후 바이트 대신 file_id만 보내
+같은 파일을 다시 보낼 수 있습니다. 자주 쓰이는 구절은 같은 미리보기 PNG와 PDF가 반복해서 나오므로
+내용의 SHA-256 해시별로 file_id를 기억해 두고, 같은 내용이면 다시 업로드하지 않습니다.
+
+- 저장: 추가 전용 JSON Lines 파일 (한 줄에 {"kind", "hash", "file_id", "at"}), 봇을 다시 시작해도 유지됩니다.
+  같은 (종류, 해시)는 나중 줄이 앞 줄을 덮어쓰고, file_id가 null인 줄은 항목 삭제입니다.
+- 만료: 저장한 지 ttl초가 지난 항목은 쓰지 않습니다. (텔레그램 쪽 파일이 사라졌을 수 있음)
+- 텔레그램이 file_id를 거절하면(BadRequest) 항목을 지우고 바이트로 다시 올립니다.
+- 파일의 줄 수가 유효한 항목 수보다 충분히 많아지면 유효한 항목만 새 파일에 써서 원자적으로 교체합니다.
+- file_id는 봇마다 다르므로 봇 토큰을 바꾸면 캐시 파일도 새로 쓰십시오.
+
+file_id로 보낸 문서의 파일 이름은 처음 올릴 때의 이름입니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from telegram.error import BadRequest
+
+from metrics import TELEGRAM_SENDS, TELEGRAM_UPLOAD_BYTES
+
+DEFAULT_UPLOAD_CACHE_PATH = os.getenv("UPLOAD_CACHE_PATH", ".cache/telegram_file_ids.jsonl")
+DEFAULT_UPLOAD_CACHE_TTL = float(os.getenv("UPLOAD_CACHE_TTL_DAYS", "30")) * 86400
+
+COMPACT_MIN_LINES = 1000  # 이보다 줄이 적으면 정리하지 않음
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileIdCache:
+    """(종류, 내용 해시) → 텔레그램 file_id. 만료 시간이 있고 파일에 저장됩니다."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_UPLOAD_CACHE_PATH,
+        ttl: float = DEFAULT_UPLOAD_CACHE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], tuple[str, float]] = {}  # (종류, 해시) → (file_id, 저장 시각)
+        self._lines = 0
+        self._torn = False  # 파일이 줄바꿈 없이 끝남 (쓰다가 끊김) → 다음 줄 앞에 줄바꿈을 붙임
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return
+        self._torn = bool(data) and not data.endswith(b"\n")
+        for line in data.splitlines():
+            try:
+                row = json.loads(line)
+                key = (row["kind"], row["hash"])
+            except (ValueError, KeyError, TypeError):
+                continue  # 쓰다가 끊긴 마지막 줄 등
+            self._lines += 1
+            if row.get("file_id"):
+                self._entries[key] = (row["file_id"], float(row.get("at", 0)))
+            else:
+                self._entries.pop(key, None)
+        self._drop_expired()
+        self._maybe_compact()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self._clock() - stored_at > self.ttl
+
+    def _drop_expired(self) -> None:
+        for key in [key for key, (_, at) in self._entries.items() if self._expired(at)]:
+            del self._entries[key]
+
+    def _append(self, row: dict) -> None:
+        """한 줄을 파일 끝에 덧붙입니다. (잠금을 잡은 상태에서 호출)"""
+        line = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+        if self._torn:
+            line = b"\n" + line
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            # 캐시는 최선 노력(best-effort): 저장 실패가 전송 실패로 이어지지 않게 합니다.
+            logging.warning(f"file_id 캐시 저장 실패: {e}")
+            return
+        self._torn = False
+        self._lines += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """지워지거나 덮어쓴 줄이 많으면 유효한 항목만 새 파일에 써서 교체합니다."""
+        if self._lines < COMPACT_MIN_LINES or self._lines < 2 * len(self._entries):
+            return
+        self._drop_expired()
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        rows = [
+            {"kind": kind, "hash": digest, "file_id": file_id, "at": at}
+            for (kind, digest), (file_id, at) in self._entries.items()
+        ]
+        try:
+            tmp.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"file_id 캐시 정리 실패: {e}")
+            return
+        self._torn = False
+        self._lines = len(rows)
+
+    def get(self, kind: str, data: bytes) -> Optional[str]:
+        """같은 내용을 보낸 적이 있고 만료되지 않았으면 file_id를 반환합니다."""
+        key = (kind, content_hash(data))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, kind: str, data: bytes, file_id: str) -> None:
+        digest = content_hash(data)
+        at = self._clock()
+        with self._lock:
+            self._entries[(kind, digest)] = (file_id, at)
+            self._append({"kind": kind, "hash": digest, "file_id": file_id, "at": at})
+
+    def discard(self, kind: str, data: bytes) -> None:
+        """텔레그램이 거절한 file_id를 지웁니다."""
+        digest = content_hash(data)
+        with self._lock:
+            if self._entries.pop((kind, digest), None) is not None:
+                self._append({"kind": kind, "hash": digest, "file_id": None, "at": self._clock()})
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+
+def _sent_file_id(message, kind: str) -> Optional[str]:
+    """보낸 메시지에서 file_id를 꺼냅니다. 사진은 가장 큰 크기의 file_id를 씁니다."""
+    if kind == "photo":
+        sizes = getattr(message, "photo", None)
+        return sizes[-1].file_id if sizes else None
+    attachment = getattr(message, kind, None)
+    return getattr(attachment, "file_id", None)
+
+
+async def send_cached(bot, cache: FileIdCache, kind: str, chat_id: int, data: bytes, **kwargs):
+    """
+    bot.send_photo / bot.send_document (kind = "photo" | "document")로 data를 보냅니다.
+    같은 내용의 file_id가 캐시에 있으면 바이트 대신 file_id를 보내고, 없으면 올린 뒤 file_id를 저장합니다.
+    """
+    send = getattr(bot, f"send_{kind}")
+    file_id = cache.get(kind, data)
+    if file_id is not None:
+        try:
+            message = await send(chat_id=chat_id, **{kind: file_id}, **kwargs)
+            TELEGRAM_SENDS.inc(kind=kind, via="file_id")
+            return message
+        except BadRequest as e:
+            logging.warning(f"file_id 재사용 실패, 다시 업로드합니다: {e}")
+            cache.discard(kind, data)
+
+    message = await send(chat_id=chat_id, **{kind: data}, **kwargs)
+    TELEGRAM_SENDS.inc(kind=kind, via="upload")
+    TELEGRAM_UPLOAD_BYTES.inc(len(data), kind=kind)
+    file_id = _sent_file_id(message, kind)
+    if file_id:
+        cache.put(kind, data, file_id)
+    return message
+